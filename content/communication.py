@@ -41,6 +41,23 @@ Communication = {
                 source = MidiRouting.APPLICATION,
                 target = _USB_MIDI
             ),
-        ]
+        ],
+
+        # Max. number of messages forwarded per source in each tick, for routings not involving the application.
+        # Raise this if you route fast input (like SysEx dumps or MIDI clock) through. Optional, default is 1.
+        #"maxThruMessages": 10,
+
+        # Max. milliseconds spent forwarding messages in each tick, for routings not involving the application. 
+        # Optional, default is 0 (no limit).
+        #"thruBudgetMillis": 2,
+
+        # Only deliver MIDI messages to the application which are of interest for it (the filter is derived from the
+        # registered mappings and the protocol). Messages from devices using the PySwitch MIDI parser (use_parser = True) 
+        # are dropped before being decoded. Optional, default is False.
+        #"filterMessages": True,
+
+        # Records all MIDI messages sent and received by the application to this file, which can be replayed later
+        # on a computer with the replay driver (see test/benchmark/replay.py). The file system must be writable. Optional.
+        #"recordFile": "/midi_recording.bin",
     }
 }
@@ -8,11 +8,38 @@
 
 Config = {
     
-    # Max. number of MIDI messages being parsed before the next switch state evaluation
-    # is triggered. If set to 0, only one message is parsed per tick, which leads to 
-    # flickering states sometimes. If set too high, switch states will not be read for too long.
-    # A good value is the maximum amount of switches. Default is 10.
-    #"maxConsecutiveMidiMessages": 10,
+    # Time budget for one tick of the processing loop (milliseconds). The budget is split among scanning the inputs,
+    # parsing MIDI messages and updating the displays/client. Work which does not fit (for example a flood of 
+    # incoming MIDI messages) is continued in the next tick, so the switches are scanned regularly in any case.
+    # Overruns are shown with "debugStats". Optional, default is 15.
+    #"tickBudgetMillis": 15,
+
+    # Shares of the tick budget (percent) for scanning inputs, parsing MIDI and updating. Optional, default is (20, 40, 40).
+    #"tickBudgetSplit": (20, 40, 40),
+
+    # Spread the updates of the displays, actions etc. over at least this number of ticks per update interval. The update 
+    # time of every item is tracked, and the items are grouped so that every tick gets about the same share. Reduces the 
+    # max. tick time on large configurations. Optional, default is 1 (only limited by the tick budget).
+    #"updateSlices": 4,
+
+    # Run the processing as separate asyncio tasks (input scanning, MIDI, updates and display refresh) instead of the 
+    # tick loop. The controller sleeps when idle. Needs the asyncio and adafruit_ticks libraries from the CircuitPython 
+    # bundle in the lib folder. Optional, default is False.
+    #"asyncController": True,
+
+    # Interval (milliseconds) and priority (higher wins) of the asyncio tasks, if asyncController is enabled. Optional,
+    # defaults are shown here ("update" and "display" default to the updateInterval). The MIDI ports cannot wake up a 
+    # task when data arrives, so the "midi" task polls them in its interval. The tick budget options above are not 
+    # used in async mode.
+    #"asyncTasks": {
+    #    "inputs":  { "interval": 5, "priority": 3 },
+    #    "midi":    { "interval": 1, "priority": 2 },
+    #    "update":  { "interval": 200, "priority": 1 },
+    #    "display": { "interval": 200, "priority": 0 }
+    #},
+
+    # Number of MIDI messages the asyncio MIDI task parses before letting more important tasks run. Optional, default is 10.
+    #"asyncMidiBatch": 10,
 
     # Clear MIDI buffer before starting processing. Default is True.
     #"clearBuffers": True,                 
@@ -21,18 +48,54 @@ Config = {
     # assumed that the Kemper device is offline. Optional, default is 2 seconds.
     #"maxRequestLifetimeMillis": 2000,
 
+    # Use precompiled response matchers to parse incoming messages. These compare the messages in place and 
+    # decode the values without creating intermediate lists or slices, which reduces garbage collection. 
+    # Optional, default is False.
+    #"compileResponseMatchers": True,
+
     # Update interval, for updating the rig date (which triggers all other data to update when changed) (milliseconds)
     # and other displays if assigned. 200 is the default.
     #"updateInterval": 200,
 
+    # Limits the amount of bytes sent to the client per tick. If set, value changes triggered by the user are 
+    # always sent before the polling requests, and the polling requests are spread evenly over the update interval
+    # instead of being sent in one burst. Useful for slow connections like DIN MIDI. Optional, default is 0 (no limit).
+    #"clientSendBudgetBytes": 30,
+
+    # Adaptive polling: Parameters whose values did not change are polled less frequently. Every time the same value
+    # is received again, the polling interval is doubled, up to this maximum. Setting a value, or a change of a 
+    # dependency, resets the interval to "updateInterval". Optional, default is 0 (always poll at "updateInterval").
+    #"adaptivePollingMaxIntervalMillis": 3200,
+
+    # Only notify the actions/displays when a received value differs from the last one. This saves a lot of LED and 
+    # display updates when the device resends unchanged values. Can also be set per mapping with the changes_only 
+    # parameter of ClientParameterMapping.get(). Optional, default is False.
+    #"notifyChangesOnly": True,
+
+    # Values set by continuous controllers (expression pedals, encoders) are collected and sent in this interval (milliseconds). 
+    # If a new value for the same parameter comes in before the last one has been sent, only the new one is sent. This 
+    # cuts MIDI traffic on slow connections. Optional, default is 0 (send immediately).
+    #"coalesceIntervalMillis": 20,
+
     # Amount of bytes that must at least be free at the time processing starts (normally the program requires anther about
     # 10kB for character loading etc., default threshold for the warning is 15kB).
     #"memoryWarnLimitBytes": 1024 * 15,
 
     # Enables file transfer via MIDI from and to the device using PyMidiBridge (https://github.com/Tunetown/PyMidiBridge).
-    # This costs about 11kB of RAM, so if you run into memory issues, disable this.
+    # The bridge itself (about 11kB of RAM) is only loaded when the first transfer starts, other MIDI messages are
+    # passed to the application directly. If you run into memory issues, disable this.
     "enableMidiBridge": True,
 
+    # Max. chunk size (bytes) for files sent to the device in windowed transfer mode (used by the web configurator).
+    # Larger chunks need a larger MIDI input buffer: The in_buf_size of the USB MIDI device (or its sysex_size, if the 
+    # device uses the PySwitch MIDI parser with use_parser = True) must be at least chunk size * 8 / 7 + 16. Both are 
+    # parameters of PA_MIDICAPTAIN_USB_MIDI in communication.py. Optional, default is 65 (fits the default in_buf_size 
+    # of 100 and the default sysex_size of 128).
+    #"midiBridgeChunkSize": 240,
+
+    # Number of chunks the sender may send in windowed transfer mode before waiting for acknowledgements. Optional, default is 4.
+    #"midiBridgeWindowSize": 4,
+
     # Globally used dim factors for the DisplayLabels. 
     #"displayDimFactorOn": 1,
     #"displayDimFactorOff": 0.2,
@@ -56,6 +119,8 @@ Config = {
     #"debugSentMessages": True,                       # Shows all sent messages
     #"excludeMessageTypes": [ "SystemExclusive" ],    # Types to excude from "debugUnparsedMessage"
     #"debugClientStats": True,                        # Periodically shows client information (pending requests etc.). "debugStatsInterval" is used as period.
+    #"debugClientLatency": True,                      # Records request/response latency histograms and timeouts per mapping, shown periodically 
+                                                      # ("debugStatsInterval" is used as period)
 
     # When a ClientParameterMapping instance is set here, incoming messages for this mapping will be shown.
     #"debugMapping": MAPPING_MORPH_PEDAL(),
@@ -88,6 +88,11 @@ class KemperRigNameCallback(Callback):
 
         self.__preselect_initialized = None    
 
+        # Last rendered state (to skip rendering when nothing changed)
+        self.__last_name = None
+        self.__last_rig_id = None
+        self.__last_text = None
+
     def init(self, appl, listener = None):
         super().init(appl, listener)
         self.__appl = appl
@@ -111,12 +116,19 @@ class KemperRigNameCallback(Callback):
             label.text = f"Bank { str(self.__appl.shared["preselectedBank"] + 1) }"
             return
         
+        name = None
         if self.__show_name:
             name = self.__mapping_name.value if self.__mapping_name.value else self.DEFAULT_TEXT
 
-        if self.__show_rig_id and self.__mapping_id.value != None:
-            bank = int(self.__mapping_id.value / NUM_RIGS_PER_BANK)
-            rig = self.__mapping_id.value % NUM_RIGS_PER_BANK
+        rig_id = self.__mapping_id.value if self.__show_rig_id else None
+
+        # Nothing changed: The client returns identical rig names as the same string object, so this is an identity check.
+        if name is self.__last_name and rig_id == self.__last_rig_id and self.__last_text != None and label.text is self.__last_text:
+            return
+
+        if rig_id != None:
+            bank = int(rig_id / NUM_RIGS_PER_BANK)
+            rig = rig_id % NUM_RIGS_PER_BANK
 
             if self.__show_name:
                 label.text = f"{ repr(bank + 1) }-{ repr(rig + 1) } { name }"
@@ -126,6 +138,13 @@ class KemperRigNameCallback(Callback):
         elif self.__show_name:
             label.text = name
 
+        else:
+            return
+
+        self.__last_name = name
+        self.__last_rig_id = rig_id
+        self.__last_text = label.text
+
 
 ####################################################################################################################
 
@@ -610,6 +629,9 @@ class KemperBidirectionalProtocol: #(BidirectionalProtocol):
         self.__midi = midi  
         self.__client = client
 
+        # Let the sensing messages pass the MIDI message filter (if any)
+        client.accept(self.__mapping_sense)
+
     # Must return (boolean) if the passed mapping is handled in the bidirectional protocol
     def is_bidirectional(self, mapping):
         return mapping in _SELECTED_PARAMETER_SET
@@ -108,7 +108,7 @@ class KemperBankSelectCallback(Callback):
 
         if self.__preselect and "preselectedBank" in self.__appl.shared and self.__appl.shared["preselectedBank"] == self.__bank - 1 and self.__preselect_blink_period.exceeded:
             self.__appl.shared["preselectBlinkState"] = not self.__appl.shared["preselectBlinkState"]
-            self.update_displays()
+            self.__appl.mark_dirty(self.action)
 
     def push(self):
         if self.__mapping.value == None:
@@ -165,7 +165,7 @@ class KemperBankChangeCallback(Callback):
         if self.__preselect and "preselectedBank" in self.__appl.shared and self.__appl.shared["preselectCallback"] == self and self.__preselect_blink_period.exceeded:
             self.__appl.shared["preselectBlinkState"] = not self.__appl.shared["preselectBlinkState"]
             
-            self.update_displays()
+            self.__appl.mark_dirty(self.action)
 
     def reset(self):
         # TODO this should not be necessary: Normally this just resets the memory, which this class doesnt have.
@@ -215,7 +215,7 @@ class _KemperRigSelectCallback(Callback):
     
             if self.__last_blink_state != bs:
                 self.__last_blink_state = bs
-                self.update_displays()
+                self.__appl.mark_dirty(self.action)
 
 
     def update_displays(self):
@@ -117,7 +117,7 @@ class AnalogAction(Updateable):
             if self.__last_value != v:
                 # Update value on client
                 self.__last_value = v
-                self.__appl.client.set(self.__mapping, v)
+                self.__appl.client.set(self.__mapping, v, coalesce = True)
 
                 if self.__preview:
                     if not self.__convert_value:
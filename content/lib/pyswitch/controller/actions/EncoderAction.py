@@ -190,7 +190,7 @@ class EncoderAction(Updateable):
             return
         
         # Send message
-        self._appl.client.set(self._mapping, self._last_value)
+        self._appl.client.set(self._mapping, self._last_value, coalesce = True)
         self._set_value(self._last_value)
 
         self.cancel(immediately = False)
@@ -9,17 +9,18 @@ from ...misc import get_option, Updateable, PeriodCounter
 # inheriting from Action.
 class Action(Updateable):
     
+    # Marks the action dirty when a mapping of the callback changes (the displays are updated once per tick)
     class _CallbackListener:
         def __init__(self, cb):
             self.__cb = cb
 
         def parameter_changed(self, mapping):
             if self.__cb.enabled:
-                self.__cb.update_displays()
+                self.__cb.appl.mark_dirty(self.__cb)
 
         def request_terminated(self, mapping):
             if self.__cb.enabled:
-                self.__cb.update_displays()
+                self.__cb.appl.mark_dirty(self.__cb)
 
     # config: {
     #      "callback":             Callback instance to update the display and LEDs. Must contain an update_displays(action) function. Optional. 
@@ -50,6 +51,9 @@ class Action(Updateable):
 
         self.__last_enabled = -1
 
+        # Set while the action is waiting for the flush stage of the controller (see Controller.mark_dirty())
+        self.dirty = False
+
     # Must be called before usage
     def init(self, appl, switch):
         self.appl = appl
@@ -117,7 +121,8 @@ class Action(Updateable):
 
         self.switch.brightnesses = tmp
 
-    # Called regularly every update interval to update status of effects etc.
+    # Called regularly every update interval to update status of effects etc. Does not render anything itself: When
+    # the enabled state changed, the action is marked dirty and updated in the flush stage of the controller.
     def update(self):
         if self.__last_enabled != self.enabled:
             self.__last_enabled = self.enabled
@@ -125,7 +130,7 @@ class Action(Updateable):
             if self.callback:
                 self.callback.reset()
 
-            self.update_displays()
+            self.appl.mark_dirty(self)
 
     # Called when the switch is pushed down
     def push(self):
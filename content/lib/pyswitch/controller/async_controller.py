@@ -0,0 +1,261 @@
+from micropython import const
+
+from .controller import Controller
+from ..misc import Updater, get_option, get_current_millis, fill_up_to, do_print
+
+
+# Tasks of the AsyncController (indexes for the task settings and statistics)
+ASYNC_TASK_INPUTS = const(0)      # Scanning the switches and continuous inputs
+ASYNC_TASK_MIDI = const(1)        # Receiving and parsing MIDI messages, sending scheduled messages
+ASYNC_TASK_UPDATE = const(2)      # Updating the Updateables except the display elements (client, actions, ...)
+ASYNC_TASK_DISPLAY = const(3)     # Updating the display elements
+
+_TASK_NAMES = ("inputs", "midi", "update", "display")
+
+
+# Alternative to the Controller's processing loop, running the parts of a tick as separate asyncio tasks. Every task
+# has its own period (milliseconds) and priority (higher number wins). The tasks are cooperative: The update and display
+# tasks yield after every Updateable, and wait as long as a task with higher priority is due, so input scanning is not
+# blocked by a long update sweep. When no task has work to do, the controller sleeps instead of spinning.
+#
+# The asyncio library (and adafruit_ticks, which it depends on) is not part of CircuitPython itself: Copy both from the
+# CircuitPython library bundle to the lib folder of the device. Use the "asyncController" option in config.py to enable
+# it. Everything else (actions, callbacks, clients) stays the same as with the Controller.
+class AsyncController(Controller):
+
+    # The tasks are scheduled by asyncio, tick() is not used
+    uses_tick_scheduler = False
+
+    # Same parameters as Controller. Additional config options:
+    #
+    # "asyncTasks": {      Optional, settings per task. Tasks not set here keep their defaults.
+    #     "inputs":  { "interval": 5, "priority": 3 },      Scan inputs every 5ms
+    #     "midi":    { "interval": 1, "priority": 2 },      Look for new MIDI messages every 1ms when idle
+    #     "update":  { "interval": 200, "priority": 1 },    Update sweep (default is the updateInterval option)
+    #     "display": { "interval": 200, "priority": 0 }     Display refresh (default is the updateInterval option)
+    # }
+    def __init__(self, led_driver, midi, protocol = None, config = {}, inputs = [], ui = None, period_counter = None):
+        Controller.__init__(
+            self,
+            led_driver = led_driver,
+            midi = midi,
+            protocol = protocol,
+            config = config,
+            inputs = inputs,
+            ui = ui,
+            period_counter = period_counter
+        )
+
+        self.__midi = midi
+
+        update_interval = get_option(config, "updateInterval", 200)
+        task_config = get_option(config, "asyncTasks", {})
+
+        defaults = (
+            (5, 3),
+            (1, 2),
+            (update_interval, 1),
+            (update_interval, 0)
+        )
+
+        # Interval (milliseconds) and priority per task
+        self.intervals = [get_option(get_option(task_config, _TASK_NAMES[task], {}), "interval", defaults[task][0]) for task in range(4)]
+        self.priorities = [get_option(get_option(task_config, _TASK_NAMES[task], {}), "priority", defaults[task][1]) for task in range(4)]
+
+        # Next time the tasks are due (milliseconds)
+        self.__due = [0, 0, 0, 0]
+
+        # Statistics per task: Number of runs, and the max. time a run was late (milliseconds)
+        self.runs = [0, 0, 0, 0]
+        self.max_delay = [0, 0, 0, 0]
+
+        # Max. number of MIDI messages parsed in one go before other tasks get a chance
+        self.__midi_batch = get_option(config, "asyncMidiBatch", 10)
+
+        # Updateables of the update and display tasks, built when the Controller's Updateables change or the UiController 
+        # shows another splash (which replaces its list of Updateables)
+        self.__task_updateables = [None, None, None, None]
+        self.__built_for_ui_updateables = None
+        self.__built_for_num_updateables = -1
+
+        self.__asyncio = None
+        self.running = False
+
+    # Runs the tasks until stop() is called. Call init() before:
+    #
+    #     asyncio.run(controller.run())
+    #
+    async def run(self):
+        import asyncio
+        self.__asyncio = asyncio
+
+        self.running = True
+
+        now = get_current_millis()
+        for task in range(4):
+            self.__due[task] = now
+
+        await asyncio.gather(
+            self.__run_inputs(),
+            self.__run_midi(),
+            self.__run_updates(ASYNC_TASK_UPDATE),
+            self.__run_updates(ASYNC_TASK_DISPLAY)
+        )
+
+    # Lets all tasks end after their current run
+    def stop(self):
+        self.running = False
+
+    # Input scanning at a fixed rate. With debugStats, the time between the input scans is measured (like the tick 
+    # time of the Controller).
+    async def __run_inputs(self):
+        jitter = self.measurement_process_jitter
+
+        while self.running:
+            self.__started(ASYNC_TASK_INPUTS)
+
+            if jitter:
+                jitter.finish()
+
+            for input in self.inputs:
+                input.process()
+
+            if jitter:
+                jitter.start()
+
+            await self.__sleep(ASYNC_TASK_INPUTS)
+
+    # MIDI ingest: Parses all available messages (yielding to more important tasks in between), updates the displays
+    # and LEDs of everything changed, and looks for new messages in short intervals when the buffers are empty.
+    #
+    # Note that this task polls: The MIDI ports of CircuitPython cannot wake up a task when data arrives, so the task
+    # runs every "interval" milliseconds (default 1) and checks the buffers. An idle run only costs one receive() call.
+    async def __run_midi(self):
+        midi = self.__midi
+        client = self.client
+        batch = self.__midi_batch
+
+        while self.running:
+            self.__started(ASYNC_TASK_MIDI)
+
+            while True:
+                num = 0
+                while num < batch:
+                    midimsg = midi.receive()
+                    client.receive(midimsg)
+
+                    if not midimsg:
+                        break
+
+                    num += 1
+
+                if num < batch:
+                    break
+
+                # More messages waiting
+                await self.__yield(ASYNC_TASK_MIDI)
+
+            self.flush_dirty()
+            client.process_send_queue()
+
+            await self.__sleep(ASYNC_TASK_MIDI)
+
+    # Updateable sweep (also used for the display refresh): Updates the Updateables of the task one by one, yielding
+    # to more important tasks in between.
+    async def __run_updates(self, task):
+        while self.running:
+            self.__started(task)
+
+            if task == ASYNC_TASK_UPDATE:
+                self.client.begin_update_cycle()
+
+            for u in self.__get_updateables(task):
+                u.update()
+                await self.__yield(task)
+
+            await self.__sleep(task)
+
+    # Returns the Updateables of the update or display task. Display elements are the Updateables of the UiController.
+    def __get_updateables(self, task):
+        ui_updateables = self.ui.updateables if self.ui else None
+
+        if ui_updateables is not self.__built_for_ui_updateables or len(self.updateables) != self.__built_for_num_updateables:
+            self.__build_updateables()
+
+        return self.__task_updateables[task]
+
+    # Builds the lists of Updateables for the update and display tasks. New lists are created, as the other task
+    # might still be iterating the old ones.
+    def __build_updateables(self):
+        update = []
+        display = []
+
+        for u in self.updateables:
+            if u == self.ui:
+                display.extend(u.updateables)
+
+            elif isinstance(u, Updater):
+                update.extend(u.updateables)
+            else:
+                update.append(u)
+
+        self.__task_updateables[ASYNC_TASK_UPDATE] = update
+        self.__task_updateables[ASYNC_TASK_DISPLAY] = display
+
+        self.__built_for_ui_updateables = self.ui.updateables if self.ui else None
+        self.__built_for_num_updateables = len(self.updateables)
+
+    # Called at the beginning of a task run (statistics)
+    def __started(self, task):
+        delay = get_current_millis() - self.__due[task]
+        if delay > self.max_delay[task]:
+            self.max_delay[task] = delay
+
+        self.runs[task] += 1
+
+    # Sleeps until the next run of the task is due. The due times advance by the interval from the previous due time, 
+    # so the period does not drift by the run time of the task. If the task is late by more than one interval, it 
+    # continues from now instead of catching up with several runs in a row.
+    async def __sleep(self, task):
+        now = get_current_millis()
+        interval = self.intervals[task]
+
+        due = self.__due[task] + interval
+        if due < now - interval:
+            due = now
+
+        self.__due[task] = due
+
+        await self.__asyncio.sleep((due - now) / 1000 if due > now else 0)
+
+    # Lets other tasks run, and waits as long as a task with higher priority is due
+    async def __yield(self, task):
+        sleep = self.__asyncio.sleep
+        await sleep(0)
+
+        priority = self.priorities[task]
+        due = self.__due
+
+        while self.running:
+            now = get_current_millis()
+
+            waiting = False
+            for other in range(4):
+                if self.priorities[other] > priority and due[other] <= now:
+                    waiting = True
+                    break
+
+            if not waiting:
+                return
+
+            await sleep(0)
+
+    # Callback called when the measurement wants to show something
+    def measurement_updated(self, measurement):
+        Controller.measurement_updated(self, measurement)
+
+        for task in range(4):
+            do_print(f"{ fill_up_to('Task ' + _TASK_NAMES[task], 30, '.') }: Runs: { self.runs[task] }, Max. delay: { self.max_delay[task] }ms")
+
+            self.runs[task] = 0
+            self.max_delay[task] = 0
@@ -1,26 +1,87 @@
 from math import floor
 from micropython import const
-from ..misc import EventEmitter, PeriodCounter, Updateable, get_option, do_print
+from ..misc import EventEmitter, PeriodCounter, Updateable, get_option, do_print, get_current_millis
+from .midi import get_message_size
 
 from adafruit_midi.control_change import ControlChange
 from adafruit_midi.system_exclusive import SystemExclusive
 from adafruit_midi.program_change import ProgramChange
 
 
+# Dispatch key used for all program change messages (these are not distinguished by content)
+_DISPATCH_KEY_PROGRAM_CHANGE = const(-1)
+
+# Mask applied before shifting the SysEx key, so it stays a small int (28 bits) and needs no allocation
+_DISPATCH_KEY_SHIFT_MASK = const(0x1FFFFF)
+
+# Returns the dispatch key for a MIDI message or response template, or None if the message type
+# cannot be dispatched by key. The key is built from what parse_against() compares, so a message
+# can only be parsed by mappings having a response template with the same key:
+#   - ControlChange: Control number
+#   - ProgramChange: One common key
+#   - SystemExclusive: Negative small int built from data[2:6] (for Kemper NRPN: function code, instance, address 
+#                      page and number), folded with the manufacturer ID. Different messages can share a key, which 
+#                      only costs an unsuccessful parse, but messages with different keys never match.
+def _dispatch_key(midi_message):
+    if isinstance(midi_message, SystemExclusive):
+        data = midi_message.data
+        end = len(data) if len(data) < 6 else 6
+
+        key = 0
+        for i in range(2, end):
+            key = ((key & _DISPATCH_KEY_SHIFT_MASK) << 7) ^ data[i]
+
+        shift = 0
+        for b in midi_message.manufacturer_id:
+            key ^= b << shift
+            shift += 7
+
+        return -2 - key
+    
+    elif isinstance(midi_message, ControlChange):
+        return midi_message.control
+    
+    elif isinstance(midi_message, ProgramChange):
+        return _DISPATCH_KEY_PROGRAM_CHANGE
+    
+    return None
+
+
+# SysEx SET message which keeps its complete wire packet (F0, manufacturer ID, data, F7) in a persistent buffer, so 
+# sending it does not build a new packet every time. ClientParameterMapping.set_value() replaces SysEx SET messages
+# by this on the first call, and then only patches the value bytes (in the data and the packet).
+class ClientSysExSetMessage(SystemExclusive):
+    def __init__(self, manufacturer_id, data):
+        super().__init__(manufacturer_id, data)
+
+        self.packet = bytearray([0xF0]) + bytearray(manufacturer_id) + data + bytearray([0xF7])
+        self.__offset = 1 + len(manufacturer_id)
+
+    # Sets a data byte
+    def set_data_byte(self, index, value):
+        self.data[index] = value
+        self.packet[self.__offset + index] = value
+
+    # Called by adafruit_midi when sending
+    def __bytes__(self):
+        return self.packet
+
+
 # Midi mapping for a client command. Contains commands to set or request a parameter
 class ClientParameterMapping:
     
-    _mappings = []
+    # Registry of all mappings by name
+    _mappings = {}
 
     # Singleton factory
     @staticmethod
-    def get(name, set = None, request = None, response = None, value = None, type = 0, depends = None):
+    def get(name, set = None, request = None, response = None, value = None, type = 0, depends = None, changes_only = None):
         if not name:
             raise Exception() # You must provide an unique name!
         
-        for m in ClientParameterMapping._mappings:
-            if m.name == name:
-                return m
+        m = ClientParameterMapping._mappings.get(name, None)
+        if m:
+            return m
             
         m = ClientParameterMapping(
             name = name,
@@ -30,10 +91,11 @@ class ClientParameterMapping:
             response = response,
             value = value,
             type = type,
-            depends = depends
+            depends = depends,
+            changes_only = changes_only
         )
 
-        ClientParameterMapping._mappings.append(m)
+        ClientParameterMapping._mappings[name] = m
         return m
             
     ##########################################################################################################################
@@ -43,7 +105,7 @@ class ClientParameterMapping:
     PARAMETER_TYPE_STRING = const(1)
 
     # Takes MIDI messages as argument (ControlChange or SystemExclusive)
-    def __init__(self, name, create_key, set = None, request = None, response = None, value = None, type = 0, depends = None):
+    def __init__(self, name, create_key, set = None, request = None, response = None, value = None, type = 0, depends = None, changes_only = None):
         if create_key != ClientParameterMapping:
             raise Exception() # Use the get method exclusively to create mappings!
         
@@ -56,12 +118,27 @@ class ClientParameterMapping:
         self.type = type          # Numeric or string
         self.depends = depends    # If another mapping is set here, this mapping will only be requested when the dependency has changed value
                                   # NOTE: In 2.4.1, this is prepared but not realized already
+        self.matchers = None      # Precompiled response matchers (see compile()). If not set, parse_against() is used.
+        self.changes_only = changes_only  # Only notify listeners when the received value has changed. If None, the client's
+                                          # "notifyChangesOnly" option is used. Use this for mappings whose listeners do not
+                                          # need to be called again with the same value.
+        
+        self.notified_value = None        # Last value the listeners have been notified with (change-only mode)
+        self.notified_listeners = None    # Listeners which have been notified with notified_value (change-only mode)
+
+    # Compiles the response template into a ClientResponseMatcher, which is used for parsing from then on.
+    def compile(self):
+        self.matchers = [ClientResponseMatcher(self.response, self.type)]
 
     # Parse the incoming MIDI message and set its value on the mapping.
     # If the response template does not match, returns False, and
     # vice versa. Returns True to notify the listeners of a value change.
     def parse(self, midi_message):     
-        result = self.parse_against(midi_message, self.response)
+        if self.matchers:
+            result = self.matchers[0].match(midi_message)
+        else:
+            result = self.parse_against(midi_message, self.response)
+
         if result != None:
             self.value = result
             return True
@@ -93,7 +170,7 @@ class ClientParameterMapping:
             # The values starting from index 6 are the value of the response.
             if self.type == self.PARAMETER_TYPE_STRING:
                 # Take as string
-                return ''.join(chr(int(c)) for c in list(midi_message.data[6:-1]))
+                return string_cache.decode(midi_message.data)
             else:
                 # Decode 14-bit value to int
                 return midi_message.data[-2] * 128 + midi_message.data[-1]
@@ -141,10 +218,11 @@ class ClientParameterMapping:
     def set_value(self, value):
         if isinstance(self.set, list):
             for i in range(len(self.set)):
-                self.__set_value(self.set[i], value[i])
+                self.set[i] = self.__set_value(self.set[i], value[i])
         else:
-            self.__set_value(self.set, value)
+            self.set = self.__set_value(self.set, value)
 
+    # Sets the value on the message. Returns the message (which is replaced for SysEx on the first call).
     def __set_value(self, midi_message, value):
         if self.type == self.PARAMETER_TYPE_STRING:
             raise Exception() # Setting strings is not implemented yet
@@ -154,26 +232,60 @@ class ClientParameterMapping:
             midi_message.value = value
 
         elif isinstance(midi_message, SystemExclusive):            
-            # Fill up message to appropriate length for the specification
-            data = list(midi_message.data)
-            while len(data) < 8:
-                data.append(0)
+            if not isinstance(midi_message, ClientSysExSetMessage):
+                # First call: Replace the message by one with a persistent packet, with the data filled up to the 
+                # appropriate length for the specification. From then on, only the value bytes are patched in place.
+                data = bytearray(midi_message.data)
+                while len(data) < 8:
+                    data.append(0)
+
+                midi_message = ClientSysExSetMessage(midi_message.manufacturer_id, data)
             
             # Set value as 14 bit
-            data[6] = int(floor(value / 128))
-            data[7] = int(value % 128)
-
-            midi_message.data = bytes(data)
+            midi_message.set_data_byte(6, int(floor(value / 128)))
+            midi_message.set_data_byte(7, int(value % 128))
 
         elif isinstance(midi_message, ProgramChange):
             # Set patch
             midi_message.patch = value
 
+        return midi_message
+
     # Returns if the mapping has finished receiving a result. Per default,
     # this returns True which is valid for mappings with one response.
     def result_finished(self):
         return True
     
+    # Returns a list of dispatch keys for the response template(s) of the mapping (see _dispatch_key()).
+    # The client only offers incoming messages with one of these keys to the mapping. If None is returned,
+    # all messages are offered: This is the case for mappings of classes overriding parse() with custom 
+    # matching logic. If the custom parse() only accepts messages matching the response templates, override 
+    # this method to return response_dispatch_keys().
+    def dispatch_keys(self):
+        parse = self.__class__.parse
+        if parse is not ClientParameterMapping.parse and parse is not ClientTwoPartParameterMapping.parse:
+            return None
+
+        return self.response_dispatch_keys()
+
+    # Returns a list of dispatch keys for the response template(s), or None if a template cannot be dispatched by key
+    def response_dispatch_keys(self):
+        responses = self.response if isinstance(self.response, list) else [self.response]
+
+        ret = []
+        for response in responses:
+            if not response:
+                continue
+
+            key = _dispatch_key(response)
+            if key == None:
+                return None
+            
+            if not key in ret:
+                ret.append(key)
+
+        return ret
+    
     # def __repr__(self):
     #     return self.name
     
@@ -184,10 +296,10 @@ class ClientTwoPartParameterMapping(ClientParameterMapping):
 
     # Singleton factory
     @staticmethod
-    def get(name, set = None, request = None, response = None, value = None, type = 0, depends = None):
-        for m in ClientParameterMapping._mappings:
-            if m.name == name:
-                return m
+    def get(name, set = None, request = None, response = None, value = None, type = 0, depends = None, changes_only = None):
+        m = ClientParameterMapping._mappings.get(name, None)
+        if m:
+            return m
             
         m = ClientTwoPartParameterMapping(
             name = name,
@@ -197,26 +309,32 @@ class ClientTwoPartParameterMapping(ClientParameterMapping):
             response = response,
             value = value,
             type = type,
-            depends = depends
+            depends = depends,
+            changes_only = changes_only
         )
 
-        ClientParameterMapping._mappings.append(m)
+        ClientParameterMapping._mappings[name] = m
         return m
 
     ##########################################################################################################################
 
-    def __init__(self, name, create_key, set = None, request = None, response = None, value = None, type = 0, depends = None):
-        super().__init__(name = name, create_key = create_key, set = set, request = request, response = response, value = value, type = type, depends = depends)
+    def __init__(self, name, create_key, set = None, request = None, response = None, value = None, type = 0, depends = None, changes_only = None):
+        super().__init__(name = name, create_key = create_key, set = set, request = request, response = response, value = value, type = type, depends = depends, changes_only = changes_only)
 
         self.__value_1 = None
+
+    def compile(self):
+        self.matchers = [ClientResponseMatcher(r, self.type) for r in self.response]
     
     def parse(self, midi_message): 
-        value_1 = self.parse_against(midi_message, self.response[0])
+        matchers = self.matchers
+
+        value_1 = matchers[0].match(midi_message) if matchers else self.parse_against(midi_message, self.response[0])
         if value_1 != None:
             self.__value_1 = value_1
             return True
         
-        value_2 = self.parse_against(midi_message, self.response[1])
+        value_2 = matchers[1].match(midi_message) if matchers else self.parse_against(midi_message, self.response[1])
 
         if value_2 != None and self.__value_1 != None:
             self.value = 128 * self.__value_1 + value_2
@@ -232,6 +350,174 @@ class ClientTwoPartParameterMapping(ClientParameterMapping):
 ############################################################################################################
 
 
+# Bounded cache for decoding string parameters from SysEx data (value starting at index 6, terminated by one byte).
+# Devices resend string parameters (like rig names) regularly, so identical payloads are returned as the same 
+# string object without decoding again. This also lets consumers detect unchanged strings by identity.
+# The cache is keyed by the raw data, so only hashable data (bytes, as delivered by adafruit_midi) is cached.
+class ClientStringCache:
+    
+    def __init__(self, size = 16):
+        self.__size = size
+        self.__strings = {}
+
+        # Keys in order of insertion (ring buffer, the oldest entry is replaced when the cache is full)
+        self.__keys = [None for i in range(size)]
+        self.__pos = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    # Returns the string contained in the passed SysEx data
+    def decode(self, data):
+        if not isinstance(data, bytes):
+            return self.__decode(data)
+        
+        ret = self.__strings.get(data, None)
+        if ret != None:
+            self.hits += 1
+            return ret
+        
+        self.misses += 1
+        ret = self.__decode(data)
+
+        # Replace the oldest entry
+        oldest = self.__keys[self.__pos]
+        if oldest != None:
+            del self.__strings[oldest]
+
+        self.__strings[data] = ret
+        self.__keys[self.__pos] = data
+        self.__pos = (self.__pos + 1) % self.__size
+
+        return ret
+
+    def __decode(self, data):
+        if isinstance(data, (bytes, bytearray)):
+            return str(memoryview(data)[6:-1], "ascii")
+        
+        return ''.join(chr(int(c)) for c in data[6:-1])
+    
+    # Clears the cache
+    def clear(self):
+        self.__strings.clear()
+        
+        for i in range(self.__size):
+            self.__keys[i] = None
+        
+        self.__pos = 0
+
+# Global string cache used by all mappings
+string_cache = ClientStringCache()
+
+
+############################################################################################################
+
+
+# Matcher kinds
+_MATCH_NONE = const(0)
+_MATCH_SYSEX = const(1)
+_MATCH_CONTROL_CHANGE = const(2)
+_MATCH_PROGRAM_CHANGE = const(3)
+
+# Precompiled response template (alternative backend to ClientParameterMapping.parse_against(), enabled with the
+# "compileResponseMatchers" option or by calling compile() on a mapping). The template is reduced to the values 
+# which have to be compared, so incoming messages are checked in place and decoded without creating intermediate 
+# slices or lists. Results are the same as for parse_against().
+class ClientResponseMatcher:
+
+    def __init__(self, response, type = 0):
+        self.__string = (type == ClientParameterMapping.PARAMETER_TYPE_STRING)
+
+        if isinstance(response, SystemExclusive):
+            self.__kind = _MATCH_SYSEX
+            self.__manufacturer_id = bytes(response.manufacturer_id)
+            self.__address = bytes(response.data[2:6])             # Function code, instance ID, address page and number
+
+        elif isinstance(response, ControlChange):
+            self.__kind = _MATCH_CONTROL_CHANGE
+            self.__control = response.control
+
+        elif isinstance(response, ProgramChange):
+            self.__kind = _MATCH_PROGRAM_CHANGE
+
+        else:
+            self.__kind = _MATCH_NONE
+
+    # Returns the value contained in the message, or None if the message does not match the template.
+    def match(self, midi_message):
+        kind = self.__kind
+
+        if kind == _MATCH_SYSEX:
+            if not isinstance(midi_message, SystemExclusive):
+                return None
+            
+            # Compare manufacturer IDs
+            manufacturer_id = midi_message.manufacturer_id
+            expected = self.__manufacturer_id
+
+            i = len(expected)
+            if len(manufacturer_id) != i:
+                return None
+            
+            while i > 0:
+                i -= 1
+                if manufacturer_id[i] != expected[i]:
+                    return None
+
+            # Compare data[2:6] (the message can be shorter, in this case the template must be shorter, too)
+            data = midi_message.data
+            expected = self.__address
+
+            i = len(data) - 2
+            if i > 4:
+                i = 4
+            if i < 0:
+                i = 0
+            
+            if i != len(expected):
+                return None
+            
+            if i == 4:
+                # Common case, unrolled
+                if data[2] != expected[0] or data[3] != expected[1] or data[4] != expected[2] or data[5] != expected[3]:
+                    return None
+            else:
+                while i > 0:
+                    i -= 1
+                    if data[i + 2] != expected[i]:
+                        return None
+
+            # The values starting from index 6 are the value of the response.
+            if self.__string:
+                return self.__decode_string(data)
+            
+            # Decode 14-bit value to int
+            return data[-2] * 128 + data[-1]
+
+        elif kind == _MATCH_CONTROL_CHANGE:
+            if not isinstance(midi_message, ControlChange):
+                return None
+            
+            if midi_message.control == self.__control:
+                return midi_message.value
+
+        elif kind == _MATCH_PROGRAM_CHANGE:
+            if not isinstance(midi_message, ProgramChange):
+                return None
+            
+            return midi_message.patch
+
+        return None
+    
+    # Decode the string contained in data[6:-1]. Buffers are decoded via a memoryview without copying.
+    def __decode_string(self, data):
+        return string_cache.decode(data)
+
+
+############################################################################################################
+
+
 # Implements all MIDI communication to and from the client device
 class Client: #(ClientRequestListener):
 
@@ -247,11 +533,21 @@ class Client: #(ClientRequestListener):
             if mapping.value != self.__last_value:
                 self.__last_value = mapping.value
 
+                self.__client._reset_polling(self.__orig_mapping)
                 self.__client._register_mapping(self.__orig_mapping, self.__listener, True)           
         
         def request_terminated(self, mapping):
             pass
 
+    # Adaptive polling state of a mapping
+    class _PollingState:
+        def __init__(self, value):
+            self.value = value   # Last received value
+            self.factor = 1      # Current polling interval (in update cycles)
+            self.skip = 0        # Update cycles left to skip
+            self.cycle = -1      # Update cycle of the last decision (all listeners get the same decision per cycle)
+            self.skipped = False # Decision for that cycle
+
     ##########################################################################################################
 
     def __init__(self, midi, config):
@@ -269,13 +565,64 @@ class Client: #(ClientRequestListener):
         # List of ClientRequest objects    
         self.__requests = []
 
+        # Requests by mapping (for fast lookup of pending requests)
+        self.__requests_by_mapping = {}
+
+        # Dispatch index: Lists of requests by the dispatch keys of the messages they are able to parse. Requests
+        # which do not provide dispatch keys are offered all incoming messages.
+        self.__dispatch = {}
+        self.__dispatch_all = []
+        self.__do_cleanup = False
+
         # Dict of dependency listeners
         self.__dependencies = {}
 
         self.__max_request_lifetime = get_option(config, "maxRequestLifetimeMillis", 2000)
-
-        # Helper to only clean up hanging requests from time to time as this is not urgent at all
-        self.__cleanup_terminated_period = PeriodCounter(self.__max_request_lifetime / 2)    
+        update_interval = get_option(config, "updateInterval", 200)
+
+        # Optional send scheduler: Limits the bytes sent per tick, and spreads the polling requests over the update interval
+        send_budget = get_option(config, "clientSendBudgetBytes", 0)
+        self.__sender = ClientSendScheduler(self.midi, send_budget, update_interval) if send_budget > 0 else None
+
+        # Coalescing of values set by continuous controllers (see set()): Pending values are sent in this interval,
+        # newer values replace older ones not sent yet.
+        coalesce_millis = get_option(config, "coalesceIntervalMillis", 0)
+        self.__coalesce_period = PeriodCounter(coalesce_millis) if coalesce_millis > 0 else None
+        self.__coalesced = {}
+        self.__coalesced_mappings = []
+        self.num_coalesced = 0          # Number of values replaced before being sent
+
+        # Adaptive polling: Mappings with stable values are polled less frequently (the interval is doubled 
+        # every time the same value is received again, up to this maximum)
+        self.__max_polling_factor = int(get_option(config, "adaptivePollingMaxIntervalMillis", 0) / update_interval)
+        self.__polling = {}
+        self.__polls_skipped = 0
+        self.__update_cycle = 0
+
+        # Only notify listeners if a received value differs from the last one (can be overridden per mapping)
+        self.notify_changes_only = get_option(config, "notifyChangesOnly", False)
+        self.num_notifications = 0
+        self.num_notifications_saved = 0
+
+        # Round trip latency histograms by mapping (LatencyHistogram instances, can also be read by other code)
+        self.latency = None
+        if get_option(config, "debugClientLatency", False):
+            self.latency = {}
+            self.__latency_period = PeriodCounter(get_option(config, "debugStatsInterval", 2000))
+
+        # Use precompiled response matchers for parsing (see ClientResponseMatcher)
+        self.__compile_matchers = get_option(config, "compileResponseMatchers", False)
+
+        # MIDI message filter of the MIDI controller, if enabled (see MidiFilter)
+        self.__filter = getattr(midi, "filter", None)
+
+        # Expiry queue: Requests with a lifetime, ordered by deadline (all requests share the same lifetime, so
+        # appending keeps the order). Finished requests are skipped when they reach the head of the queue.
+        self.__expiry = []
+        self.__expiry_pos = 0
+
+        # Deadline of the head of the expiry queue (0 if empty), checked once per tick in process_send_queue()
+        self.__next_deadline = 0
 
     @property
     def requests(self):
@@ -288,11 +635,36 @@ class Client: #(ClientRequestListener):
             self._register_mapping(mapping, listener, False)
 
     # Sends the SET message of a mapping. Value has to be a list if the mapping's set field is a list, too!
-    def set(self, mapping, value):
+    # If coalesce is True and coalescing is enabled, the value is sent with the next flush, and only the 
+    # last value set for the mapping until then is sent (use this for continuous controllers). Also, messages
+    # still waiting in the send scheduler queue are not enqueued again then.
+    def set(self, mapping, value, coalesce = False):
         if not mapping.set:
             return
         
+        if self.__coalesce_period:
+            if coalesce:
+                if mapping in self.__coalesced:
+                    self.num_coalesced += 1
+                else:
+                    self.__coalesced_mappings.append(mapping)
+
+                self.__coalesced[mapping] = value
+                return
+            
+            elif mapping in self.__coalesced:
+                # This value is newer than the pending one
+                del self.__coalesced[mapping]
+                self.__coalesced_mappings.remove(mapping)
+
+        self.__set(mapping, value, coalesce)
+
+    # Sends the SET message(s) of a mapping
+    def __set(self, mapping, value, coalesce = False):
         mapping.set_value(value)
+
+        # Poll the mapping at full rate again
+        self._reset_polling(mapping)
                 
         if isinstance(mapping.set, list):
             for m in mapping.set:
@@ -302,12 +674,52 @@ class Client: #(ClientRequestListener):
                 if self.__debug_sent_messages:   # pragma: no cover
                     self.print_message(m)
 
-                self.midi.send(m)
+                self.__send(m, coalesce)
         else:
             if self.__debug_sent_messages:       # pragma: no cover
                 self.print_message(mapping.set)
                 
-            self.midi.send(mapping.set)
+            self.__send(mapping.set, coalesce)
+
+    # Sends a message with high priority (directly if no send scheduler is used)
+    def __send(self, midi_message, coalesce = False):
+        if self.__sender:
+            self.__sender.send(midi_message, coalesce)
+        else:
+            self.midi.send(midi_message)
+
+    # Sends a polling request message (directly if no send scheduler is used). Internal use only.
+    # If a request is passed, its sent_time is set when the message is actually sent (for latency measurement).
+    def _send_request(self, midi_message, request = None):
+        if self.__sender:
+            self.__sender.request(midi_message, request)
+        else:
+            self.midi.send(midi_message)
+
+            if request:
+                request.sent_time = get_current_millis()
+
+    # Sends the messages scheduled for this tick, and terminates the requests which took too long. Must be called 
+    # once every tick.
+    def process_send_queue(self):
+        if self.__next_deadline:
+            now = get_current_millis()
+            if now >= self.__next_deadline:
+                self.__cleanup_hanging_requests(now)
+
+        if self.__coalesced_mappings and self.__coalesce_period.exceeded:
+            self.__flush_coalesced()
+
+        if self.__sender:
+            self.__sender.process()
+
+    # Sends the pending coalesced values
+    def __flush_coalesced(self):
+        for mapping in self.__coalesced_mappings:
+            self.__set(mapping, self.__coalesced[mapping], True)
+
+        self.__coalesced_mappings.clear()
+        self.__coalesced.clear()
 
     # Send the request message of a mapping. Calls the passed listener when the answer has arrived.
     #@RuntimeStatistics.measure
@@ -319,11 +731,74 @@ class Client: #(ClientRequestListener):
             if not mapping in self.__dependencies:
                 self.__dependencies[mapping] = self._DependencyListener(self, mapping, listener)
 
+            if self.__max_polling_factor > 1 and self.__skip_polling(mapping.depends):
+                return
+
             # Register the dependency rather than the mapping itself
             self._register_mapping(mapping.depends, self.__dependencies[mapping], True)
         else:
+            if self.__max_polling_factor > 1 and self.__skip_polling(mapping):
+                return
+            
             self._register_mapping(mapping, listener, True)
+
+    # Must be called at the beginning of every update cycle (the Controller does this). Adaptive polling counts
+    # the skipped cycles of a mapping once per cycle, no matter how many listeners request it.
+    def begin_update_cycle(self):
+        self.__update_cycle += 1
+
+    # Returns if the polling of the mapping shall be skipped in this update cycle (adaptive polling)
+    def __skip_polling(self, mapping):
+        state = self.__polling.get(mapping, None)
+        if not state:
+            return False
+        
+        if state.cycle == self.__update_cycle:
+            return state.skipped
         
+        state.cycle = self.__update_cycle
+
+        if state.skip <= 0:
+            state.skipped = False
+            return False
+        
+        state.skip -= 1
+        self.__polls_skipped += 1
+        
+        state.skipped = True
+        return True
+
+    # Adapts the polling interval of the mapping after a value has been received: If the value did not change,
+    # the interval is doubled (up to the maximum), else the mapping is polled at full rate again.
+    def __adapt_polling(self, mapping):
+        state = self.__polling.get(mapping, None)
+        if not state:
+            self.__polling[mapping] = self._PollingState(mapping.value)
+            return
+
+        if state.value == mapping.value:
+            state.factor = min(state.factor * 2, self.__max_polling_factor)
+        else:
+            state.value = mapping.value
+            state.factor = 1
+
+        state.skip = state.factor - 1
+
+    # Resets the polling interval of the mapping to the update interval (adaptive polling). Internal use only.
+    def _reset_polling(self, mapping):
+        state = self.__polling.get(mapping, None)
+        if state:
+            state.factor = 1
+            state.skip = 0
+            state.cycle = -1
+        
+    # Lets the messages matching the response template(s) of the mapping pass the MIDI message filter, if any. 
+    # This is done automatically for all registered and requested mappings, protocols have to call this for 
+    # the messages they need to receive.
+    def accept(self, mapping):
+        if self.__filter:
+            self.__filter.add_mapping(mapping)
+
     # Registers a mapping request or adds the listener to an existing one. Optionally sends the
     # request message. Internal use only.
     def _register_mapping(self, mapping, listener, send):
@@ -331,6 +806,9 @@ class Client: #(ClientRequestListener):
         req = self.get_matching_request(mapping)
         if not req:
             # New request
+            if self.__filter:
+                self.__filter.add_mapping(mapping)
+
             req = self.__create_request(mapping)
             
             if listener:
@@ -338,6 +816,11 @@ class Client: #(ClientRequestListener):
 
             # Add to list
             self.__requests.append(req)
+            self.__requests_by_mapping[mapping] = req
+            self.__index_request(req)
+
+            if req.deadline:
+                self.__schedule_expiry(req)
             
             # Send 
             if send:           
@@ -350,6 +833,9 @@ class Client: #(ClientRequestListener):
 
     # Create a new request
     def __create_request(self, mapping):
+        if self.__compile_matchers and not mapping.matchers:
+            mapping.compile()
+
         return ClientRequest(              
             self,
             mapping,
@@ -359,30 +845,52 @@ class Client: #(ClientRequestListener):
     # Receive MIDI messages
     #@RuntimeStatistics.measure
     def receive(self, midi_message):
-        if self.__cleanup_terminated_period.exceeded:
-            self.__cleanup_hanging_requests()
-
         if self.__debug_stats and self.__stats_period.exceeded:  # pragma: no cover 
             do_print(f"    { len(self.__requests) } requests pending:")
             for r in self.__requests:
                 do_print(f"{ r.mapping.name }: { repr([l.__class__.__name__ for l in r.listeners]) }")
 
+            do_print(f"    String cache: { string_cache.hits } hits, { string_cache.misses } misses")
+            do_print(f"    Notifications: { self.num_notifications } sent, { self.num_notifications_saved } saved (unchanged values)")
+
+            if self.__max_polling_factor > 1:
+                do_print(f"    Adaptive polling: { self.__polls_skipped } polls skipped")
+
+            if self.__sender:
+                do_print(f"    Send queue: { self.__sender.num_pending } pending, { self.__sender.num_deferred } deferred by budget, { self.__sender.num_coalesced } coalesced")
+
+            if self.__coalesce_period:
+                do_print(f"    Coalescing: { self.num_coalesced } values replaced before being sent")
+
+            for t in getattr(self.midi, "transmitters", []):
+                do_print(f"    Transmit queue: { t.num_pending } pending (max. { t.max_depth }), { t.num_queued } queued, { t.num_merged } merged, { t.num_dropped } dropped, wait avg. { round(t.wait_average_millis) }ms, max. { t.wait_max_millis }ms")
+
+            thru_backlog = getattr(self.midi, "thru_backlog", None)
+            if thru_backlog != None:
+                do_print(f"    MIDI thru: { thru_backlog } times messages left for the next tick (maxThruMessages/thruBudgetMillis)")
+
+            if self.__filter:
+                do_print(f"    MIDI filter: { self.__filter.dropped } messages dropped ({ len(self.__filter.kinds) } kinds, { len(self.__filter.manufacturers) } manufacturers accepted)")
+
+        if self.latency != None and self.__latency_period.exceeded:  # pragma: no cover 
+            self.print_latency()
+
         if not midi_message:
             return False
         
-        # See if one of the waiting requests matches
-        do_cleanup = False
-
+        # See if one of the waiting requests matches (only the requests which are able to parse the message are asked)
+        self.__do_cleanup = False
         parsed = False
-        for request in self.__requests:
-            if request.parse(midi_message):
-                parsed = True
 
-            if request.finished:
-                do_cleanup = True
+        requests = self.__dispatch.get(_dispatch_key(midi_message), None)
+        if requests and self.__parse_requests(requests, midi_message):
+            parsed = True
+
+        if self.__dispatch_all and self.__parse_requests(self.__dispatch_all, midi_message):
+            parsed = True
 
         # Check for finished requests
-        if do_cleanup:
+        if self.__do_cleanup:
             self.__cleanup_requests()
 
         # Debug unparsed messages
@@ -391,28 +899,139 @@ class Client: #(ClientRequestListener):
 
         return parsed
             
+    # Let the passed requests parse the message. Returns if any of them parsed it.
+    def __parse_requests(self, requests, midi_message):
+        parsed = False
+
+        for request in requests:
+            if request.parse(midi_message):
+                parsed = True
+
+                if self.__max_polling_factor > 1 and request.deadline:
+                    self.__adapt_polling(request.mapping)
+
+            if request.finished:
+                self.__do_cleanup = True
+
+        return parsed
+
     # Returns a matching request from the list if any, or None if no matching
     # request has been found.
     #@RuntimeStatistics.measure
     def get_matching_request(self, mapping):
-        for request in self.__requests:
-            if request.mapping == mapping:
-                return request
-            
-        return None
+        return self.__requests_by_mapping.get(mapping, None)
+
+    # Adds a request to the dispatch index
+    def __index_request(self, request):
+        keys = request.dispatch_keys
+
+        if keys == None:
+            self.__dispatch_all.append(request)
+            return
+
+        for key in keys:
+            if key in self.__dispatch:
+                self.__dispatch[key].append(request)
+            else:
+                self.__dispatch[key] = [request]
+
+    # Removes a request from the dispatch index
+    def __unindex_request(self, request):
+        keys = request.dispatch_keys
+
+        if keys == None:
+            self.__dispatch_all.remove(request)
+            return
+
+        for key in keys:
+            requests = self.__dispatch[key]
+            requests.remove(request)
 
-    # Remove all finished requests, and terminate the ones which took too long already
+            if not requests:
+                del self.__dispatch[key]
+
+    # Remove all finished requests (in place, the list is not re-allocated)
     def __cleanup_requests(self):
-        self.__requests = [i for i in self.__requests if not i.finished]
+        requests = self.__requests
+        num = 0
+        
+        for request in requests:
+            if request.finished:
+                del self.__requests_by_mapping[request.mapping]
+                self.__unindex_request(request)
+            else:
+                requests[num] = request
+                num += 1
+
+        del requests[num:]
+
+    # Adds a request to the expiry queue, ordered by deadline
+    def __schedule_expiry(self, request):
+        queue = self.__expiry
+        pos = len(queue)
+
+        # Deadlines are normally added in order, so this loop does not iterate in practice
+        while pos > self.__expiry_pos and queue[pos - 1].deadline > request.deadline:
+            pos -= 1
+
+        queue.insert(pos, request)
+
+        if not self.__next_deadline or request.deadline < self.__next_deadline:
+            self.__next_deadline = request.deadline
             
-    # Terminate any requests which took too long from time to time
-    def __cleanup_hanging_requests(self):
-        # Terminate requests if they waited too long
-        for request in self.__requests:
-            if request.lifetime and request.lifetime.exceeded:
+    # Terminate the requests which took too long. Only the expired requests at the head of the queue are visited.
+    def __cleanup_hanging_requests(self, now):
+        queue = self.__expiry
+        pos = self.__expiry_pos
+        terminated = False
+
+        while pos < len(queue):
+            request = queue[pos]
+
+            if not request.finished:
+                if request.deadline > now:
+                    break
+
                 request.terminate()
+                self._reset_polling(request.mapping)
+
+                if self.latency != None:
+                    self.get_latency(request.mapping).timeout()
+                terminated = True
+            
+            pos += 1
 
-        self.__cleanup_requests()
+        # Remove the visited requests from the queue when they make up half of it (in place)
+        if pos >= len(queue):
+            queue.clear()
+            pos = 0
+        elif pos > len(queue) / 2:
+            del queue[:pos]
+            pos = 0
+
+        self.__expiry_pos = pos
+        self.__next_deadline = queue[pos].deadline if pos < len(queue) else 0
+
+        if terminated:
+            self.__cleanup_requests()
+
+    # Returns the latency histogram for the mapping (only if the debugClientLatency option is set)
+    def get_latency(self, mapping):
+        histogram = self.latency.get(mapping, None)
+        if not histogram:
+            from .measure import LatencyHistogram
+            
+            histogram = self.latency[mapping] = LatencyHistogram(mapping.name)
+
+        return histogram
+
+    # Print the latency histograms
+    def print_latency(self):  # pragma: no cover
+        from .measure import LatencyHistogram
+
+        do_print(f"    Request latencies (buckets up to { repr(LatencyHistogram.BUCKETS) }ms):")
+        for histogram in self.latency.values():
+            do_print(f"{ histogram.name }: Avg { histogram.average }ms, Min { histogram.min }ms, Max { histogram.max }ms, Calls: { histogram.calls }, Timeouts: { histogram.timeouts }, { repr(histogram.counts) }")
 
     # Print info about the passed message
     def print_message(self, midi_message):  # pragma: no cover
@@ -426,6 +1045,144 @@ class Client: #(ClientRequestListener):
 #######################################################################################################################
 
 
+# Outbound message scheduler for the Client. High priority messages (set by the user) are always sent before
+# the polling requests. The polling requests of one update cycle (which are all issued in the same tick) are 
+# spread evenly over the update interval instead of being sent in one burst. The amount of bytes sent per tick 
+# is limited by the budget (at least one message is sent per tick, so messages larger than the budget do not block).
+class ClientSendScheduler:
+    
+    # budget_bytes:         Max. bytes sent per tick
+    # interval_millis:      Polling requests are spread over this interval (normally the update interval)
+    # poll_period:          PeriodCounter used to time the polling requests (for testing)
+    def __init__(self, midi, budget_bytes, interval_millis, poll_period = None):
+        self.__midi = midi
+        self.__budget = budget_bytes
+        self.__interval = interval_millis
+
+        self.__poll_period = poll_period if poll_period else PeriodCounter(interval_millis)
+        
+        # Queues (the lists are only cleared when empty, to avoid re-allocations)
+        self.__queue = []
+        self.__queue_pos = 0
+        self.__poll_queue = []
+        self.__poll_queue_pos = 0
+        self.__poll_started = False
+        self.__poll_elapsed = 0   # Milliseconds passed in the current polling cycle up to the last sent request
+
+        # ClientRequest for each polling message (or None), whose sent_time is set when the message is sent
+        self.__poll_requests = []
+
+        # Number of ticks in which messages had to be deferred because of the budget (for statistics)
+        self.num_deferred = 0
+
+        # Number of high priority messages which were still pending when enqueued again (for statistics)
+        self.num_coalesced = 0
+
+    # Number of messages waiting to be sent
+    @property
+    def num_pending(self):
+        return len(self.__queue) - self.__queue_pos + len(self.__poll_queue) - self.__poll_queue_pos
+
+    # Enqueue a high priority message. If coalesce is True and the message is still pending, it is not enqueued 
+    # again (mappings change their set messages in place, so the pending message already contains the new value).
+    def send(self, midi_message, coalesce = False):
+        queue = self.__queue
+
+        if coalesce:
+            for i in range(self.__queue_pos, len(queue)):
+                if queue[i] is midi_message:
+                    self.num_coalesced += 1
+                    return
+            
+        queue.append(midi_message)
+
+    # Enqueue a polling request message. If a ClientRequest is passed, its sent_time is set when the message is sent.
+    def request(self, midi_message, request = None):
+        self.__poll_queue.append(midi_message)
+        self.__poll_requests.append(request)
+
+    # Sends the messages due in this tick
+    def process(self):
+        sent = 0
+
+        # High priority messages
+        queue = self.__queue
+        pos = self.__queue_pos
+        
+        while pos < len(queue):
+            size = get_message_size(queue[pos])
+            if sent > 0 and sent + size > self.__budget:
+                break
+
+            self.__midi.send(queue[pos])
+            sent += size
+            pos += 1
+
+        if pos < len(queue):
+            self.__queue_pos = pos
+            self.num_deferred += 1
+            return
+        
+        if pos > 0:
+            queue.clear()
+            self.__queue_pos = 0
+        
+        # Polling requests
+        queue = self.__poll_queue
+        pos = self.__poll_queue_pos
+        
+        if pos >= len(queue):
+            return
+        
+        period = self.__poll_period
+
+        if not self.__poll_started:
+            # New polling cycle: Send the first request, and determine the interval between the requests
+            self.__poll_started = True
+            self.__poll_elapsed = 0
+            period.interval = max(1, int(self.__interval / (len(queue) - pos)))
+            period.reset()
+            due = 1
+        else:
+            # Spread the remaining requests over the rest of the cycle. This is recomputed on every call, as requests
+            # can be added while the cycle is running.
+            passed = period.passed
+            period.interval = max(1, int((self.__interval - self.__poll_elapsed) / (len(queue) - pos + 1)))
+
+            # Send all requests which are due (if the ticks take longer than the interval, more than one per tick)
+            due = int(passed / period.interval)
+            if due > 0:
+                self.__poll_elapsed += passed
+                period.reset()
+
+        while due > 0 and pos < len(queue):
+            size = get_message_size(queue[pos])
+            if sent > 0 and sent + size > self.__budget:
+                self.num_deferred += 1
+                break
+
+            self.__midi.send(queue[pos])
+
+            request = self.__poll_requests[pos]
+            if request:
+                request.sent_time = get_current_millis()
+
+            sent += size
+            pos += 1
+            due -= 1
+
+        if pos < len(queue):
+            self.__poll_queue_pos = pos
+        else:
+            queue.clear()
+            self.__poll_requests.clear()
+            self.__poll_queue_pos = 0
+            self.__poll_started = False
+
+
+#######################################################################################################################
+
+
 # Model for a request for a value
 class ClientRequest(EventEmitter):
 
@@ -434,31 +1191,33 @@ class ClientRequest(EventEmitter):
         
         self.client = client
         self.mapping = mapping
-        
-        self.lifetime = self.__init_lifetime(max_request_lifetime)
 
-    # Sets up the lifetime for mappings not belonging to a bidirectional protocol
-    def __init_lifetime(self, max_request_lifetime):
-        if not max_request_lifetime > 0:            
-            return None
-            
-        lifetime = PeriodCounter(max_request_lifetime)
-        lifetime.reset()
+        # Keys of the messages this request can parse (see Client dispatch index)
+        self.dispatch_keys = mapping.dispatch_keys()
+        
+        # Time (milliseconds) when the request will be terminated if no answer came in. Only for mappings 
+        # not belonging to a bidirectional protocol, else zero.
+        self.deadline = get_current_millis() + max_request_lifetime if max_request_lifetime > 0 else 0
 
-        return lifetime
+        # Time the request has actually been sent, which is later than send() if the client uses a send scheduler 
+        # (only if the client records latencies)
+        self.sent_time = 0
 
     # Sends the request
     def send(self):
         if not self.mapping.request:
             return
 
+        # Let the client set the sent time
+        request = self if self.client.latency != None else None
+
         if isinstance(self.mapping.request, list):
             for m in self.mapping.request:
                 if not m:
                     continue
-                self.client.midi.send(m)    
+                self.client._send_request(m, request)
         else:
-            self.client.midi.send(self.mapping.request)
+            self.client._send_request(self.mapping.request, request)
 
     # Returns if the request is finished
     @property
@@ -498,21 +1257,73 @@ class ClientRequest(EventEmitter):
             from ..debug_tools import stringify_midi_message
             do_print(f"{ mapping.name }: Received value '{ repr(mapping.value) }' from { stringify_midi_message(midi_message) }")
 
+        client = self.client
+
+        if self.sent_time:
+            client.get_latency(mapping).add(get_current_millis() - self.sent_time)
+            self.sent_time = 0
+
         # Call the listeners (the mapping has the values set already). Do not use notify_listeners() to keep the stack short.
-        for listener in self.listeners:
-            listener.parameter_changed(self.mapping)
+        
+        if mapping.changes_only or (mapping.changes_only == None and client.notify_changes_only):
+            self.__notify_changes(mapping)
+        else:
+            for listener in self.listeners:
+                listener.parameter_changed(mapping)
+
+            client.num_notifications += len(self.listeners)
 
         # Clear listeners (only if the request has a restricted life time)
-        if self.lifetime:
+        if self.deadline:
             self.listeners = None
 
         return True
 
+    # Change-only mode: Only calls the listeners which have not been notified with the current value yet
+    def __notify_changes(self, mapping):
+        client = self.client
+        notified = mapping.notified_listeners
+
+        if notified == None:
+            notified = mapping.notified_listeners = []
+
+        elif mapping.value != mapping.notified_value:
+            notified.clear()
+
+        mapping.notified_value = mapping.value
+
+        for listener in self.listeners:
+            if listener in notified:
+                client.num_notifications_saved += 1
+                continue
+
+            notified.append(listener)
+            listener.parameter_changed(mapping)
+
+            client.num_notifications += 1
+
+    # Notifies all listeners with the current value of the mapping. In change-only mode, this is remembered like any
+    # other notification, so a following message with a different value (for example the device echoing the old 
+    # value after a set) is passed on.
     def notify_listeners(self):
+        mapping = self.mapping
+        notified = mapping.notified_listeners
+
+        if notified != None:
+            notified.clear()
+            mapping.notified_value = mapping.value
+
         for listener in self.listeners:
-            listener.parameter_changed(self.mapping)
+            listener.parameter_changed(mapping)
+
+            if notified != None:
+                notified.append(listener)
 
     def notify_terminated(self):
+        # The listeners have to be notified with the next value in change-only mode, whatever it is
+        if self.mapping.notified_listeners:
+            self.mapping.notified_listeners.clear()
+
         for listener in self.listeners:
             listener.request_terminated(self.mapping)
 
@@ -561,8 +1372,8 @@ class BidirectionalClient(Client, Updateable):
         return parsed
 
     # In case of bidirectional parammeters, "simulate" a parameter change directly after the MIDI message
-    def set(self, mapping, value):
-        Client.set(self, mapping, value)
+    def set(self, mapping, value, coalesce = False):
+        Client.set(self, mapping, value, coalesce)
 
         # Notify listeners of the mapping with the set value (we do not use echoing, so the actions
         # will not reflect the state change if we just do nothing)
@@ -608,7 +1419,8 @@ class BidirectionalClient(Client, Updateable):
 # Base class for bidirectional protocols
 #class BidirectionalProtocol:
 #
-#    # Called before usage, with a midi handler.
+#    # Called before usage, with a midi handler. If the protocol needs to receive messages which
+#    # are not parsed by any mapping, it has to call client.accept() for them here.
 #    def init(self, midi, client):
 #        pass
 #
@@ -2,7 +2,8 @@ from gc import collect, mem_free
 
 from .inputs import SwitchController, ContinuousController
 from .client import Client, BidirectionalClient
-from ..misc import Updater, PeriodCounter, get_option, do_print, format_size, fill_up_to
+from .scheduler import TickScheduler, TASK_INPUTS, TASK_MIDI, TASK_UPDATE
+from ..misc import Updater, PeriodCounter, get_option, do_print, format_size, fill_up_to, get_ticks_ms, ticks_diff
 from ..stats import Memory #, RuntimeStatistics
 
 
@@ -12,6 +13,9 @@ class Controller(Updater): #ClientRequestListener
     # IDs for all available measurements (for statistics)
     STAT_ID_TICK_TIME = 1             # Time one processing loop takes overall
 
+    # Whether tick() is used, which needs the TickScheduler for its time budgets
+    uses_tick_scheduler = True
+
     # config:   Configuration dictionary. 
     # inputs:  [           list of switch and input definitions
     #                {
@@ -47,13 +51,37 @@ class Controller(Updater): #ClientRequestListener
         self.config = config
         update_interval = get_option(config, "updateInterval", 200)
 
-        # Max. number of MIDI messages being parsed before the next switch state evaluation
-        self.__max_consecutive_midi_msgs = get_option(config, "maxConsecutiveMidiMessages", 10)   
+        # Time budget for the ticks, split among input scanning, MIDI parsing and updates (not used by controllers
+        # with their own scheduling)
+        self.scheduler = TickScheduler(
+            budget_millis = get_option(config, "tickBudgetMillis", 15),
+            split = get_option(config, "tickBudgetSplit", (20, 40, 40))
+        ) if self.uses_tick_scheduler else None
+
+        # Number of ticks the updates of one period are spread over (at least, the budget can require more)
+        self.__update_slices = get_option(config, "updateSlices", 1)
+
+        # Positions to continue at in the next tick, if the budget was used up
+        self.__input_pos = 0
+        self.__update_pos = 0
+
+        # Updateables of the current update round, and the budget for one tick of the round
+        self.__update_round = []
+        self.__update_round_due = False
+        self.__update_slice_budget = 0
+
+        # Actions and display labels to be updated in the flush stage of the current tick (see mark_dirty()), and 
+        # counters for the updates performed and the ones saved by merging several changes per tick
+        self.__dirty = []
+        self.num_updates_performed = 0
+        self.num_updates_skipped = 0
 
         # Print debug info        
         self.__debug_stats = get_option(config, "debugStats", False)        
 
         # Statistical measurement for tick time
+        self.__measurement_process_jitter = None
+
         if self.__debug_stats:
             from .measure import RuntimeMeasurement
 
@@ -139,57 +167,211 @@ class Controller(Updater): #ClientRequestListener
                 if not self.__midi.receive():
                     break
 
+    # Measurement of the time between the input scans (None if debugStats is not enabled)
+    @property
+    def measurement_process_jitter(self):
+        return self.__measurement_process_jitter
+
     # Single tick in the processing loop. Must return True to keep the loop alive. Call this in an endless loop.
     def tick(self):
-        # Update all Updateables in periodic intervals, less frequently than every tick.        
-        if self.period.exceeded:
-            for u in self.updateables:
-                # Receive MIDI messages in between updates, too
-                self.__receive_midi_messages()
+        if self.__debug_stats:
+            self.__measurement_process_jitter.finish()
 
-                u.update()
+        # Detect switch state changes
+        self.__process_inputs()
 
-            Memory.watch("Controller: update", only_if_changed = True)
+        if self.__debug_stats:
+            self.__measurement_process_jitter.start()
 
-        # Receive all available MIDI messages
+        # Receive available MIDI messages
         self.__receive_midi_messages()
 
+        # Update all Updateables in periodic intervals, less frequently than every tick.
+        self.__update()
+
+        # Update the displays and LEDs of everything which has changed in this tick
+        self.flush_dirty()
+
+        # Send scheduled messages
+        self.client.process_send_queue()
+
         return True
 
+    # Marks an action or display label (anything with an update_displays() method and a dirty attribute) to be 
+    # updated in the flush stage of the current tick. Several changes in one tick only lead to one update.
+    def mark_dirty(self, item):
+        if item.dirty:
+            self.num_updates_skipped += 1
+            return
+
+        item.dirty = True
+        self.__dirty.append(item)
+
+    # Updates all items marked dirty
+    def flush_dirty(self):
+        dirty = self.__dirty
+        if not dirty:
+            return
+
+        for item in dirty:
+            item.dirty = False
+            item.update_displays()
+
+        self.num_updates_performed += len(dirty)
+        dirty.clear()
+
     # Resets all actions (which refreshes their buffer memories, triggering re-rendering of LEDs and displays)
     def reset_actions(self):
         for input in self.inputs:
             for action in input.actions:
                 action.reset()
 
-    # Receive MIDI messages, and in between check for switch state changes
+    # Process all inputs once, or as many as the budget allows (the next tick continues with the remaining ones)
+    def __process_inputs(self):
+        inputs = self.inputs
+        num_inputs = len(inputs)
+        if not num_inputs:
+            return
+
+        scheduler = self.scheduler
+        scheduler.begin(TASK_INPUTS)
+
+        pos = self.__input_pos
+        done = 0
+
+        while done < num_inputs:
+            if pos >= num_inputs:
+                pos = 0
+
+            inputs[pos].process()
+
+            pos += 1
+            done += 1
+
+            if scheduler.expired:
+                break
+
+        self.__input_pos = pos
+        scheduler.end(TASK_INPUTS, done < num_inputs)
+
+    # Receive MIDI messages until there are no more, or the budget is used up (the rest stays in the MIDI buffers)
     def __receive_midi_messages(self):
-        cnt = 0
-        
-        while True:            
-            if self.__debug_stats:
-                self.__measurement_process_jitter.finish()
-            
-            # Detect switch state changes
-            for input in self.inputs:
-                input.process()
-            
-            if self.__debug_stats:
-                self.__measurement_process_jitter.start()
+        scheduler = self.scheduler
+        scheduler.begin(TASK_MIDI)
 
-            # Receive MIDI
+        while True:
             midimsg = self.__midi.receive()
             self.client.receive(midimsg)
 
-            # Break after a certain amount of messages to keep the device responsive
-            cnt = cnt + 1
-            if not midimsg or cnt > self.__max_consecutive_midi_msgs:
-                break  
+            if not midimsg:
+                scheduler.end(TASK_MIDI, False)
+                return
 
-        #self._measurement_midi_jitter.start()
+            if scheduler.expired:
+                scheduler.end(TASK_MIDI, True)
+                return
+
+    # Update all Updateables once per update period. The updates of a period (round) are spread over consecutive 
+    # ticks: Every tick runs the next Updateables in turn, as long as their estimated costs fit into the budget 
+    # (at least one per tick). A new round is started when the period has passed and the last round is finished.
+    def __update(self):
+        if self.period.exceeded:
+            self.__update_round_due = True
+
+        update_round = self.__update_round
+        pos = self.__update_pos
+
+        if pos >= len(update_round):
+            if not self.__update_round_due:
+                return
+
+            self.__start_update_round()
+            pos = 0
+
+        scheduler = self.scheduler
+        scheduler.begin(TASK_UPDATE)
+
+        budget = self.__update_slice_budget
+        spent = 0
+
+        while pos < len(update_round):
+            u = update_round[pos]
+            cost = u.update_cost
+
+            # Leave the item for the next tick if it would exceed the budget
+            if spent and spent + cost > budget:
+                break
+
+            start = get_ticks_ms()
+            u.update()
+            measured = ticks_diff(get_ticks_ms(), start)
+
+            # Estimated costs are stored on the Updateables (so they go away with them, for example when the splash is 
+            # replaced). They are raised to the measured time immediately, and decay slowly, so items which are only 
+            # expensive sometimes (for example redrawing a label) are planned with their worst case.
+            decayed = cost - ((cost + 7) >> 3)
+            u.update_cost = measured if measured > decayed else decayed
+
+            spent += measured
+            pos += 1
+
+            if spent >= budget:
+                break
+
+        self.__update_pos = pos
+        scheduler.end(TASK_UPDATE, pos < len(update_round))
+
+        if pos >= len(update_round):
+            Memory.watch("Controller: update", only_if_changed = True)
+
+    # Collects the Updateables for a new update round and determines the budget per tick. Updaters (like the 
+    # UiController) are expanded to their Updateables, so display elements are spread, too.
+    def __start_update_round(self):
+        self.client.begin_update_cycle()
+
+        update_round = self.__update_round
+        update_round.clear()
+
+        for u in self.updateables:
+            if isinstance(u, Updater):
+                update_round.extend(u.updateables)
+            else:
+                update_round.append(u)
+
+        budget = self.scheduler.budgets[TASK_UPDATE]
+
+        if self.__update_slices > 1:
+            per_slice = sum(u.update_cost for u in update_round) // self.__update_slices
+
+            # No costs known yet (first round): Budget only
+            if per_slice and per_slice < budget:
+                budget = per_slice
+
+        self.__update_slice_budget = budget
+        self.__update_round_due = False
+        self.__update_pos = 0
 
     # Callback called when the measurement wants to show something
     def measurement_updated(self, measurement):
         collect()
         do_print(f"{ fill_up_to(str(measurement.name), 30, '.') }: Max { repr(measurement.value) }ms, Avg { repr(measurement.average) }ms, Calls: { repr(measurement.calls) }, Free: { format_size(mem_free()) }")
 
+        # Budget overruns of the tick tasks since the last output
+        if self.scheduler:
+            for line in self.scheduler.report():
+                do_print(line)
+
+        # Display updates triggered by changes, and updates saved by merging changes
+        do_print(f"{ fill_up_to('Display updates', 30, '.') }: Performed: { self.num_updates_performed }, Skipped: { self.num_updates_skipped }")
+
+        self.num_updates_performed = 0
+        self.num_updates_skipped = 0
+
+        # Most expensive Updateable of the current round
+        if self.__update_round:
+            u = max(self.__update_round, key = lambda u: u.update_cost)
+            do_print(f"{ fill_up_to('Max. update cost', 30, '.') }: { u.update_cost }ms ({ u.__class__.__name__ })")
+
+        if self.scheduler:
+            self.scheduler.reset()
+
@@ -166,6 +166,11 @@ class ExploreModeController(Updater):
 
         return True
 
+    # Called by the actions when they have to be updated: There is no flush stage in explore mode, so this is done 
+    # immediately.
+    def mark_dirty(self, item):
+        item.update_displays()
+
     # Called by ExplorePixelAction: Enlightens the next switch according to the passed step value. 
     # Returns the pixels tuple of the switch currently enlightened.
     def show_next_switch(self, step):
@@ -11,6 +11,8 @@ class SwitchController:
     # { 
     #     "assignment": {
     #         "model":         Model instance for the switch hardware. Must implement an init() method and a .pushed property.
+    #                          If the model also implements next_event() (see AdafruitKeypadSwitch), its press/release 
+    #                          events are processed instead of polling the pushed property.
     #         "pixels":        List of indexes for the Neopixels that belong to this switch, for example (0, 1, 2)
     #     },
     #
@@ -30,6 +32,9 @@ class SwitchController:
         self.__switch = config["assignment"]["model"]
         self.__switch.init()
 
+        # Event based switch models (no polling)
+        self.__events = hasattr(self.__switch, "next_event")
+
         #self.id = get_option(config["assignment"], "name", repr(self.__switch))
 
         self.__appl = appl
@@ -69,8 +74,27 @@ class SwitchController:
         
     # Process the switch: Check if it is currently pushed, set state accordingly
     def process(self):
+        if not self.__events:
+            self.__process_state(self.pushed)
+            return
+
+        # Process all events of the switch, with the times they happened
+        while True:
+            event = self.__switch.next_event()
+            if not event:
+                break
+
+            self.__process_state(event[0], event[1])
+
+        # No new events: Only hold times have to be checked
+        if self.__hold_active:
+            self.__process_state(self.__pushed_state)
+
+    # Set the state of the switch. time is the time of the state change (milliseconds, see get_current_millis()), 
+    # if known. 
+    def __process_state(self, pushed, time = None):
         # Is the switch currently pushed?
-        if not self.pushed:
+        if not pushed:
             if self.__pushed_state:
                 self.__pushed_state = False
 
@@ -80,7 +104,7 @@ class SwitchController:
                         if not self.__hold_active:
                             return
                                                 
-                        if self.__check_hold():
+                        if self.__check_hold(time):
                             return
 
                         if self.__hold_was_active:
@@ -123,7 +147,7 @@ class SwitchController:
 
         # Process all push actions assigned to the switch     
         if self.__actions_hold:        
-            self.__period_hold.reset()
+            self.__period_hold.reset(time)
             self.__hold_active = True
             return
         
@@ -133,9 +157,9 @@ class SwitchController:
 
             action.push()
 
-    # Checks hold time and triggers hold action if exceeded.
-    def __check_hold(self):
-        if self.__period_hold.exceeded:
+    # Checks hold time (at the passed time, or now) and triggers hold action if exceeded.
+    def __check_hold(self, time = None):
+        if self.__period_hold.exceeded if time == None else self.__period_hold.exceeded_at(time):
             if self.__hold_repeat:
                 self.__hold_was_active = True
             else:
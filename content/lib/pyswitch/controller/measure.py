@@ -71,6 +71,61 @@ class RuntimeMeasurement(EventEmitter, Updateable):
 ################################################################################
 
 
+# Histogram of latencies (milliseconds), for example request/response round trips. Also counts timeouts.
+class LatencyHistogram:
+
+    # Upper bounds of the buckets (milliseconds). The last bucket holds all latencies above the last bound.
+    BUCKETS = (5, 10, 20, 50, 100, 200, 500, 1000)
+
+    def __init__(self, name = None):
+        self.name = name
+
+        self.reset()
+
+    # Average latency
+    @property
+    def average(self):
+        if self.calls == 0:
+            return 0
+        return int(self.__sum / self.calls)
+
+    # Initialize the instance
+    def reset(self):
+        self.counts = [0 for i in range(len(self.BUCKETS) + 1)]   # Number of latencies per bucket
+        self.min = 0        # Minimum latency
+        self.max = 0        # Maximum latency
+        self.calls = 0      # Number of latencies added
+        self.timeouts = 0   # Number of timeouts
+
+        self.__sum = 0
+
+    # Adds a latency
+    def add(self, latency):
+        bucket = 0
+        for bound in self.BUCKETS:
+            if latency <= bound:
+                break
+            bucket += 1
+
+        self.counts[bucket] += 1
+
+        if self.calls == 0 or latency < self.min:
+            self.min = latency
+
+        if latency > self.max:
+            self.max = latency
+
+        self.__sum += latency
+        self.calls += 1
+
+    # Adds a timeout
+    def timeout(self):
+        self.timeouts += 1
+
+
+################################################################################
+
+
 # Listener for runtime measurement changes
 #class RuntimeMeasurementListener:
 #    def measurement_updated(self, measurement):
@@ -1,3 +1,5 @@
+from ..misc import get_option, get_current_millis
+
 # MIDI Message types: These are all needed to be imported, despite not used: If not, no messages
 # will go through the MIDI routings. If you encounter that messages are not forwarded, the type 
 # might perhaps miss here. (not all are enabled by default to minimize RAM usage).
@@ -37,7 +39,7 @@ class MidiRouting:
     # Used as source/target for routings to/from the application itself
     APPLICATION = 1
 
-    def __init__(self, source, target):
+    def __init__(self, source, target, raw = False, filter = None):
         # Source MIDI device (can be either a AdafruitXXXMidiDevice or 
         # MidiController.PYSWITCH for the application itself)
         self.source = source    
@@ -45,6 +47,39 @@ class MidiRouting:
         # Target MIDI device (can be either a AdafruitXXXMidiDevice or 
         # MidiController.PYSWITCH for the application itself)
         self.target = target    
+
+        # Raw mode: Forward the bytes read from the source directly to the target, without decoding them to 
+        # MIDI messages. This is faster and also passes message types which are not known to adafruit_midi. 
+        # Only possible for routings without APPLICATION. The source must not be routed to APPLICATION, and no 
+        # other source (neither APPLICATION nor another device) must send to the target (else their messages could 
+        # land between the parts of a SysEx message, or change the running status). Both devices must support read_raw()/write_raw(), like 
+        # the AdafruitXXXMidiDevice classes.
+        self.raw = raw
+
+        # Optional MidiRouteFilter instance to filter/transform the messages on the way (raw routings only)
+        self.filter = filter
+
+
+##################################################################################################
+
+
+# Declarative filter and transformation rules for a raw MidiRouting. MidiController compiles these into lookup 
+# tables, so the data read from the source is processed with one table lookup per byte.
+class MidiRouteFilter:
+
+    # statuses:         List of message kinds to forward (status bytes, with channel bits zero for channel 
+    #                   messages, for example 0xB0 for Control Change or 0xF8 for Clock). None to forward all kinds.
+    # channels:         Channel map for channel messages (zero based): { <source channel>: <target channel> }. 
+    #                   Map channels to None to drop them, channels not contained are forwarded unchanged.
+    # control_changes:  Control number map for Control Change messages: List of tuples (first, last, target_first), 
+    #                   mapping controls first..last to target_first..(target_first + last - first). Use None as target 
+    #                   to drop the range, controls not contained in any range are forwarded unchanged.
+    # manufacturers:    List of SysEx manufacturer IDs to forward. None to forward all SysEx messages.
+    def __init__(self, statuses = None, channels = None, control_changes = None, manufacturers = None):
+        self.statuses = statuses
+        self.channels = channels
+        self.control_changes = control_changes
+        self.manufacturers = manufacturers
         
 
 ##################################################################################################
@@ -55,11 +90,116 @@ class MidiRouting:
 # the application manually!
 class MidiController:
 
-    # routings must be a list of MidiRouting instances
-    def __init__(self, routings):
+    # Raw routings: Max. number of consecutive reads from a source to complete a SysEx message which spans multiple reads
+    MAX_RAW_SYSEX_READS = 8
+
+    # routings must be a list of MidiRouting instances.
+    # config: {
+    #     "maxThruMessages":   Max. number of messages forwarded per source and receive() call for routings without 
+    #                          APPLICATION. Raise this to keep up with fast input (SysEx dumps, MIDI clock). Optional, default is 1.
+    #     "thruBudgetMillis":  Max. milliseconds spent forwarding messages for routings without APPLICATION per receive() 
+    #                          call. Optional, default is 0 (no limit).
+    #     "rawBufferSize":     Buffer size for raw routings (bytes). Optional, default is 64.
+    #     "filterMessages":    Only deliver messages to the application which can be parsed by any of the registered 
+    #                          mappings (or are needed by the protocol), see MidiFilter. Optional, default is False.
+    # }
+    def __init__(self, routings, config = None):
         self.__routings_from_appl = [x for x in routings if x.source == MidiRouting.APPLICATION]
-        self.__routings_to_appl = [x for x in routings if x.target == MidiRouting.APPLICATION]
-        self.__routings_external = [x for x in routings if x.source != MidiRouting.APPLICATION and x.target != MidiRouting.APPLICATION]
+
+        self.__max_thru_messages = get_option(config, "maxThruMessages", 1)
+        self.__thru_budget_millis = get_option(config, "thruBudgetMillis", 0)
+
+        # Number of times forwarding stopped at one of the limits above while more messages were waiting (this is 
+        # detected in the next receive() call, when the source delivers a message right away)
+        self.thru_backlog = 0
+
+        # Routing tables: Targets grouped by source
+        self.__appl_routes = []      # Sources routed to APPLICATION (with the external targets of these sources)
+        self.__thru_routes = []      # Sources only routed to external targets
+        self.__raw_routes = []       # Sources of raw routings
+
+        for r in routings:
+            if r.target == MidiRouting.APPLICATION:
+                if r.raw or r.filter:
+                    raise Exception() # Raw routings and filters cannot be used with APPLICATION
+                
+                self.__get_route(self.__appl_routes, r.source)
+
+        for r in routings:
+            if r.source == MidiRouting.APPLICATION or r.target == MidiRouting.APPLICATION:
+                continue
+            
+            if r.raw:
+                if self.__find_route(self.__appl_routes, r.source):
+                    raise Exception() # Raw routing sources cannot be routed to APPLICATION at the same time
+
+                for ra in routings:
+                    if ra.target == r.target and ra.source != r.source:
+                        raise Exception() # Raw routing targets cannot be sent to by other sources (including APPLICATION) at the same time
+
+                route = self.__get_route(self.__raw_routes, r.source)
+                route.targets.append(r.target)
+                route.filters.append(_RouteFilter(r.filter) if r.filter else None)
+            else:
+                if r.filter:
+                    raise Exception() # Filters can only be used with raw routings
+                
+                # Messages from sources routed to APPLICATION are forwarded when the application receives them
+                route = self.__find_route(self.__appl_routes, r.source)
+                if not route:
+                    route = self.__get_route(self.__thru_routes, r.source)
+
+                route.targets.append(r.target)
+
+        # Messages of sources with external targets are kept by the targets (transmit queues, send schedulers), so the
+        # parsers of these sources must not reuse their message instances (see MidiParser)
+        for route in self.__appl_routes + self.__thru_routes:
+            parser = getattr(route.source, "parser", None)
+            if parser and route.targets:
+                parser.reuse_messages = False
+
+        # Transmit schedulers of all targets (see MidiTransmitScheduler), which are drained on every receive() call
+        self.transmitters = []
+        for r in routings:
+            transmitter = getattr(r.target, "transmitter", None)
+            if transmitter and not transmitter in self.transmitters:
+                self.transmitters.append(transmitter)
+
+        # All raw routings share one buffer (and one output buffer for filtered routings, which can hold twice as many
+        # bytes plus some more: Filters write the status byte for every message, so a program change using running status
+        # grows from one to two bytes, and messages from earlier reads are completed)
+        raw_buffer_size = get_option(config, "rawBufferSize", 64)
+        self.__raw_buffer = bytearray(raw_buffer_size) if self.__raw_routes else None
+        self.__raw_out_buffer = bytearray(raw_buffer_size * 2 + 8) if [r for r in routings if r.filter] else None
+
+        # Optional filter for messages to the application. Sources only routed to APPLICATION which use a MidiParser
+        # get the filter applied in the parser (before any message is created), all others are filtered after decoding.
+        self.filter = None
+        if get_option(config, "filterMessages", False):
+            self.filter = MidiFilter()
+
+            for route in self.__appl_routes:
+                parser = getattr(route.source, "parser", None)
+
+                if parser and not route.targets:
+                    self.filter.attach(parser)
+                else:
+                    route.filtered = True
+
+    # Returns the route for the source from the passed table, or None if not found
+    def __find_route(self, routes, source):
+        for route in routes:
+            if route.source == source:
+                return route
+        return None
+
+    # Returns the route for the source from the passed table, and creates it if not yet existing
+    def __get_route(self, routes, source):
+        route = self.__find_route(routes, source)
+        if not route:
+            route = _Route(source)
+            routes.append(route)
+        return route
 
     def send(self, midi_message):
         # Send to all routings which have APPLICATION as source
@@ -67,51 +207,429 @@ class MidiController:
             r.target.send(midi_message)
 
     def receive(self):
+        # Send messages waiting in the transmit queues
+        for transmitter in self.transmitters:
+            if transmitter.num_pending:
+                transmitter.process()
+
         # Process routings without APPLICATION involved 
-        self.__process_external_routings()
+        if self.__raw_routes:
+            self.__process_raw_routings()
+
+        if self.__thru_routes:
+            self.__process_thru_routings()
 
         # Process routings targeting APPLICATION
-        for r in self.__routings_to_appl:
-            msg = r.source.receive()
+        for route in self.__appl_routes:
+            msg = route.source.receive()
+
+            while msg:
+                # Forward to the external targets of the source, if any
+                if route.targets:
+                    _forward(msg, route.targets)
 
-            if msg:
-                # Return first message for APPLICATION in the queue (next ticks will deliver the next messages)
-                return msg                
+                if not route.filtered or self.filter.accepts(msg):
+                    # Return first message for APPLICATION in the queue (next ticks will deliver the next messages)
+                    return msg
+                
+                msg = route.source.receive()
     
-    # Process all routings where APPLICATION is not involved (this processes one message of each source every time)
-    def __process_external_routings(self):
-        routings = self.__routings_external
-        if not routings:
-            return
-        
-        # Get all sources messages
-        sources = []
-        results = []
+    # Process all routings where APPLICATION is not involved. Forwards up to maxThruMessages messages of each 
+    # source, and stops when the time budget is used up.
+    def __process_thru_routings(self):
+        max_messages = self.__max_thru_messages
+        budget = self.__thru_budget_millis
+        start = get_current_millis() if budget else 0
 
-        for r in routings:
-            if r.source in sources:
-                continue
+        for route in self.__thru_routes:
+            cnt = 0
 
-            sources.append(r.source)
-            results.append(r.source.receive())
-            
-        # Distribute messages
-        for r in routings:
-            for i in range(len(sources)):
-                if sources[i] != r.source:
-                    continue
+            limited = route.limited
+            route.limited = False
 
-                msg = results[i]
-        
+            while True:
+                msg = route.source.receive()
                 if not msg:
-                    continue
+                    break
+
+                # The last call stopped at a limit and this message has been left waiting
+                if limited:
+                    self.thru_backlog += 1
+                    limited = False
+
+                _forward(msg, route.targets)
+                cnt += 1
+
+                if budget and get_current_millis() - start >= budget:
+                    route.limited = True
+                    return
                 
-                if isinstance(msg, MIDIUnknownEvent):
+                if cnt >= max_messages:
+                    route.limited = True
+                    break
+
+    # Process all raw routings: Reads available bytes from the sources and writes them to the targets as-is.
+    # If the data read ends inside a SysEx message, reading continues (up to MAX_RAW_SYSEX_READS times) so 
+    # the targets get the message in one piece without anything sent by the application in between.
+    def __process_raw_routings(self):
+        buffer = self.__raw_buffer
+
+        for route in self.__raw_routes:
+            reads = 0
+
+            while True:
+                num = route.source.read_raw(buffer)
+                if not num:
+                    break
+
+                for i in range(len(route.targets)):
+                    filter = route.filters[i]
+
+                    if not filter:
+                        route.targets[i].write_raw(buffer, num)
+                    else:
+                        num_out = filter.process(buffer, num, self.__raw_out_buffer)
+                        if num_out:
+                            route.targets[i].write_raw(self.__raw_out_buffer, num_out)
+
+                route.in_sysex = _ends_in_sysex(buffer, num, route.in_sysex)
+
+                reads += 1
+                if not route.in_sysex or reads >= self.MAX_RAW_SYSEX_READS:
+                    break
+
+
+##################################################################################################
+
+
+# Routing table entry: Targets of one source
+class _Route:
+    def __init__(self, source):
+        self.source = source
+        self.targets = []
+        self.in_sysex = False      # Raw routings only: The last data read from the source ended inside a SysEx message
+        self.filters = []          # Raw routings only: Compiled filters for the targets (_RouteFilter or None)
+        self.filtered = False      # Messages to APPLICATION have to be checked against the MidiFilter after decoding
+        self.limited = False       # Routings without APPLICATION: Forwarding stopped at a limit in the last receive() call
+
+
+# Compiled MidiRouteFilter, with the parser state of one raw routing
+class _RouteFilter:
+
+    _DROP = 0xFF
+
+    def __init__(self, filter):
+        # Output status by input status (0: drop)
+        self.__status_table = bytearray(256)
+
+        for status in range(0x80, 0x100):
+            kind = status & 0xF0 if status < 0xF0 else status
+            if filter.statuses != None and not kind in filter.statuses:
+                continue
+
+            out_status = status
+
+            if status < 0xF0 and filter.channels:
+                channel = filter.channels.get(status & 0x0F, status & 0x0F)
+                if channel == None:
                     continue
                 
-                if getattr(msg, "_STATUS", None) is None:
+                out_status = kind | channel
+
+            self.__status_table[status] = out_status
+
+        # Output control number by input control number (_DROP: drop)
+        self.__cc_table = bytearray(range(128))
+
+        for (first, last, target_first) in (filter.control_changes if filter.control_changes else []):
+            for control in range(first, last + 1):
+                self.__cc_table[control] = self._DROP if target_first == None else target_first + control - first
+
+        self.__manufacturers = [bytes(m) for m in filter.manufacturers] if filter.manufacturers != None else None
+
+        # Parser state
+        self.__status = 0              # Output status of the current message (0: Drop the message, -1: no status)
+        self.__expected = 0            # Number of data bytes of the current message
+        self.__data = bytearray(3)     # Data bytes of the current message / manufacturer ID of the current SysEx message
+        self.__num_data = 0
+        self.__sysex = 0               # 0: No SysEx, 1: Reading manufacturer ID, 2: Forwarding, 3: Dropping
+
+    # Processes the first num bytes of the buffer and writes the output to out. Returns the number of bytes written.
+    def process(self, buffer, num, out):
+        pos = 0
+
+        for i in range(num):
+            b = buffer[i]
+
+            if b >= 0xF8:
+                # Real time messages can occur anywhere
+                if self.__status_table[b]:
+                    out[pos] = b
+                    pos += 1
+                continue
+
+            if b >= 0x80:
+                pos = self.__process_status(b, out, pos)
+                continue
+
+            # Data bytes
+            sysex = self.__sysex
+            if sysex:
+                if sysex == 2:
+                    out[pos] = b
+                    pos += 1
+
+                elif sysex == 1:
+                    self.__data[self.__num_data] = b
+                    self.__num_data += 1
+
+                    if self.__num_data == 3 or (self.__num_data == 1 and b != 0):
+                        pos = self.__process_manufacturer(out, pos)
+
+                continue
+
+            status = self.__status
+            if status < 0:
+                continue
+
+            self.__data[self.__num_data] = b
+            self.__num_data += 1
+            
+            if self.__num_data < self.__expected:
+                continue
+
+            # Message complete
+            self.__num_data = 0
+            
+            if not status:
+                continue
+
+            if status & 0xF0 == 0xB0:
+                control = self.__cc_table[self.__data[0]]
+                if control == self._DROP:
                     continue
-                
-                r.target.send(msg)
 
-                break
+                self.__data[0] = control
+
+            # The status byte is always written (no running status), as the target might have been written to by 
+            # others (unfiltered routings from other sources) since the last message
+            out[pos] = status
+            pos += 1
+
+            for j in range(self.__expected):
+                out[pos] = self.__data[j]
+                pos += 1
+
+            if status >= 0xF0:
+                # No running status for system common messages
+                self.__status = -1
+
+        return pos
+
+    # Processes a status byte (no real time status)
+    def __process_status(self, b, out, pos):
+        if b == 0xF7:
+            if self.__sysex == 2:
+                out[pos] = b
+                pos += 1
+            
+            self.__sysex = 0
+            return pos
+        
+        self.__sysex = 0
+        self.__num_data = 0
+
+        if b == 0xF0:
+            self.__status = -1
+            
+            if self.__status_table[b]:
+                self.__sysex = 1
+            else:
+                self.__sysex = 3
+
+            return pos
+        
+        self.__status = self.__status_table[b]
+
+        if b < 0xF0:
+            kind = b & 0xF0
+            self.__expected = 1 if kind == 0xC0 or kind == 0xD0 else 2
+        else:
+            self.__expected = 2 if b == 0xF2 else (1 if b == 0xF1 or b == 0xF3 else 0)
+
+            if self.__expected == 0:
+                # Tune request (or undefined): No data
+                if self.__status:
+                    out[pos] = b
+                    pos += 1
+
+                self.__status = -1
+
+        return pos
+    
+    # The manufacturer ID of the current SysEx message is complete: Decide if it is forwarded
+    def __process_manufacturer(self, out, pos):
+        length = self.__num_data
+
+        if self.__manufacturers != None:
+            data = self.__data
+            found = False
+
+            for m in self.__manufacturers:
+                if len(m) == length and m[0] == data[0] and (length == 1 or (m[1] == data[1] and m[2] == data[2])):
+                    found = True
+                    break
+            
+            if not found:
+                self.__sysex = 3
+                return pos
+            
+        self.__sysex = 2
+
+        out[pos] = 0xF0
+        pos += 1
+
+        for j in range(length):
+            out[pos] = self.__data[j]
+            pos += 1
+
+        return pos
+
+
+##################################################################################################
+
+
+# Accept filter for messages to the application: Only message kinds (and SysEx manufacturer IDs) which have been 
+# added are let through. The Client adds the response templates of all mappings it registers or requests, protocols
+# add what they need additionally (see Client.accept()). 
+#
+# Filtering is done in the attached MidiParser instances where possible, so dropped messages are not even created.
+class MidiFilter:
+
+    def __init__(self):
+        self.kinds = []              # Status bytes (with channel bits zero for channel messages)
+        self.manufacturers = []      # SysEx manufacturer IDs (bytes)
+
+        self.__mappings = {}
+        self.__parsers = []
+
+        # Number of messages dropped after decoding (see dropped for the overall count)
+        self.num_dropped = 0
+
+    # Overall number of dropped messages (including the ones skipped by the attached parsers)
+    @property
+    def dropped(self):
+        ret = self.num_dropped
+        for parser in self.__parsers:
+            ret += parser.num_skipped
+        return ret
+
+    # Apply the filter in the passed MidiParser
+    def attach(self, parser):
+        self.__parsers.append(parser)
+        
+        parser.set_accept(self.kinds)
+        parser.set_accept_manufacturers(self.manufacturers)
+
+    # Let all messages pass which can be parsed by the response template(s) of the mapping
+    def add_mapping(self, mapping):
+        if mapping in self.__mappings:
+            return
+        
+        self.__mappings[mapping] = True
+
+        responses = mapping.response if isinstance(mapping.response, list) else [mapping.response]
+        for response in responses:
+            if response:
+                self.add_message(response)
+
+    # Let all messages pass which are of the same kind as the passed one (for SysEx: same manufacturer ID)
+    def add_message(self, midi_message):
+        if isinstance(midi_message, SystemExclusive):
+            self.add_manufacturer(midi_message.manufacturer_id)
+
+        self.add_kind(_message_kind(midi_message))
+
+    # Let all messages of the passed kind pass (status byte, with channel bits zero for channel messages)
+    def add_kind(self, kind):
+        if kind == None or kind in self.kinds:
+            return
+        
+        self.kinds.append(kind)
+
+        for parser in self.__parsers:
+            parser.set_accept(self.kinds)
+
+    # Let all SysEx messages with the passed manufacturer ID pass
+    def add_manufacturer(self, manufacturer_id):
+        self.add_kind(0xF0)
+
+        manufacturer_id = bytes(manufacturer_id)
+        if manufacturer_id in self.manufacturers:
+            return
+        
+        self.manufacturers.append(manufacturer_id)
+
+        for parser in self.__parsers:
+            parser.set_accept_manufacturers(self.manufacturers)
+
+    # Returns if the passed (decoded) message passes the filter. Counts the dropped messages.
+    def accepts(self, midi_message):
+        kind = _message_kind(midi_message)
+        
+        if kind in self.kinds:
+            if kind != 0xF0 or bytes(midi_message.manufacturer_id) in self.manufacturers:
+                return True
+        
+        self.num_dropped += 1
+        return False
+    
+
+# Returns the kind of a MIDI message: Status byte, with channel bits zero for channel messages (None if unknown)
+def _message_kind(midi_message):
+    if isinstance(midi_message, MIDIUnknownEvent):
+        status = midi_message.status
+    else:
+        status = getattr(midi_message, "_STATUS", None)
+
+    if status == None:
+        return None
+    
+    return status & 0xF0 if status < 0xF0 else status
+
+
+# Returns the amount of bytes a MIDI message takes on the wire
+def get_message_size(midi_message):
+    if isinstance(midi_message, SystemExclusive):
+        return len(midi_message.manufacturer_id) + len(midi_message.data) + 2   # Including start and end bytes
+    
+    elif isinstance(midi_message, ProgramChange):
+        return 2
+    
+    return 3
+
+
+# Sends a received message to the passed targets (unknown messages cannot be sent)
+def _forward(msg, targets):
+    if isinstance(msg, MIDIUnknownEvent):
+        return
+    
+    if getattr(msg, "_STATUS", None) is None:
+        return
+    
+    for target in targets:
+        target.send(msg)
+
+
+# Returns if the first num bytes of the buffer end inside a SysEx message. in_sysex is the state before the data.
+def _ends_in_sysex(buffer, num, in_sysex):
+    # Search the last status byte (real time messages can occur anywhere, also inside SysEx, so they are skipped)
+    i = num - 1
+    while i >= 0:
+        b = buffer[i]
+        if b >= 0x80 and b < 0xF8:
+            return b == 0xF0
+        i -= 1
+
+    # Only data bytes: State did not change
+    return in_sysex
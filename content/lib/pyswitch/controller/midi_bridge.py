@@ -0,0 +1,179 @@
+from micropython import const
+from time import sleep
+
+from ..misc import do_print
+
+from adafruit_midi.system_exclusive import SystemExclusive
+
+
+# Manufacturer ID of the MIDI bridge SysEx messages (see PyMidiBridge / JsMidiBridge)
+MIDI_BRIDGE_MANUFACTURER_ID = [0x00, 0x7c, 0x7d]
+
+# Second byte of the bridge manufacturer ID. Three-byte IDs always start with zero, so this is the first byte
+# distinguishing the bridge messages from others (for example Kemper: 0x00 0x20 0x33)
+_BRIDGE_SIGNATURE = const(0x7c)
+
+# Bit set in the commands of the windowed transfer mode (see WindowedTransferReceiver)
+_WINDOWED_COMMAND = const(0x10)
+
+# Pause between the receive calls of the error loop (seconds)
+_ERROR_LOOP_SLEEP = 0.001
+
+
+# Wraps the MIDI controller to enable file transfers via the PyMidiBridge (used by the web editor). Only SysEx
+# messages carrying the bridge signature are passed to the bridge, which is checked with a single byte comparison.
+# All other messages go straight to the application. The bridge itself (and its storage provider) is only loaded
+# when the first bridge message comes in, so it does not use any RAM as long as no file transfer is done.
+#
+# Files sent in windowed transfer mode (larger chunks, several chunks in flight) are received by a
+# WindowedTransferReceiver instead of the bridge, which is also loaded on demand.
+class MidiBridgeWrapper:
+
+    # midi:             MIDI controller to be wrapped (for example a MidiController)
+    # temp_file_path:   Path for temporary files during transfers
+    # storage_factory:  Optional callback creating the storage for the bridge: () => storage provider.
+    #                   Default is a MidiBridgeStorageProvider.
+    # max_chunk_size:   Max. chunk size for the windowed transfer mode (bytes). The MIDI input buffer 
+    #                   must be able to hold about chunk size * 8 / 7 + 16 bytes.
+    # window_size:      Number of chunks the sender may send without waiting for acknowledgements in windowed transfer mode
+    def __init__(self, midi, temp_file_path, storage_factory = None, max_chunk_size = 65, window_size = 4):
+        self.__midi = midi
+        self.__temp_file_path = temp_file_path
+        self.__storage_factory = storage_factory
+        self.__max_chunk_size = max_chunk_size
+        self.__window_size = window_size
+        self.__bridge = None
+        self.__windowed = None
+
+        # Outgoing messages do not pass the wrapper at all
+        self.send = midi.send
+
+        # Let the bridge messages pass the MIDI message filter (if any)
+        filter = getattr(midi, "filter", None)
+        if filter:
+            filter.add_manufacturer(MIDI_BRIDGE_MANUFACTURER_ID)
+
+        # Statistics
+        self.num_bridge_messages = 0
+
+    # MIDI message filter of the wrapped controller (see MidiFilter)
+    @property
+    def filter(self):
+        return getattr(self.__midi, "filter", None)
+
+    # Transmit schedulers of the wrapped controller (see MidiTransmitScheduler)
+    @property
+    def transmitters(self):
+        return getattr(self.__midi, "transmitters", [])
+
+    # Thru backlog counter of the wrapped controller (see MidiController)
+    @property
+    def thru_backlog(self):
+        return getattr(self.__midi, "thru_backlog", None)
+
+    # The PyMidiBridge instance, which is created on first access
+    @property
+    def bridge(self):
+        if not self.__bridge:
+            from pymidibridge.PyMidiBridge import PyMidiBridge
+
+            self.__bridge = PyMidiBridge(
+                midi = self,
+                storage_factory = self,
+                event_handler = self
+            )
+
+        return self.__bridge
+
+    # Returns if the bridge has been loaded
+    @property
+    def bridge_loaded(self):
+        return self.__bridge != None
+
+    # Receiver for the windowed transfer mode, which is created on first access
+    @property
+    def windowed(self):
+        if not self.__windowed:
+            from .midi_bridge_transfer import WindowedTransferReceiver
+
+            self.__windowed = WindowedTransferReceiver(
+                send = self.send_system_exclusive,
+                manufacturer_id = MIDI_BRIDGE_MANUFACTURER_ID,
+                temp_file_path = self.__temp_file_path + "_w",
+                max_chunk_size = self.__max_chunk_size,
+                window_size = self.__window_size
+            )
+
+        return self.__windowed
+
+    def receive(self):
+        midi_message = self.__midi.receive()
+
+        # Cheapest checks first: Type (an attribute lookup and identity check, which also covers None), length of the 
+        # manufacturer ID, and only then the signature byte
+        if midi_message.__class__ is not SystemExclusive:
+            return midi_message
+
+        manufacturer_id = midi_message.manufacturer_id
+        if len(manufacturer_id) != 3 or manufacturer_id[1] != _BRIDGE_SIGNATURE:
+            return midi_message
+
+        if manufacturer_id[0] != MIDI_BRIDGE_MANUFACTURER_ID[0] or manufacturer_id[2] != MIDI_BRIDGE_MANUFACTURER_ID[2]:
+            return midi_message
+
+        # Bridge message: Not passed to the application
+        self.num_bridge_messages += 1
+
+        data = midi_message.data
+        if data and data[0] & _WINDOWED_COMMAND:
+            self.windowed.receive(data)
+        else:
+            self.bridge.receive(midi_message)
+
+        return None
+
+    # Called by the bridge to send its messages
+    def send_system_exclusive(self, manufacturer_id, data):
+        self.__midi.send(
+            SystemExclusive(
+                manufacturer_id = manufacturer_id,
+                data = data
+            )
+        )
+
+    # Reports an error (string or exception) via the bridge and keeps receiving, so the configuration can
+    # still be fixed with the web editor. Does not return.
+    def error(self, message_or_exception):
+        if isinstance(message_or_exception, Exception):
+            message = self.get_trace(message_or_exception)
+        else:
+            message = message_or_exception
+
+        do_print(message)
+
+        self.bridge.error(message)
+
+        while True:
+            self.receive()
+            sleep(_ERROR_LOOP_SLEEP)
+
+    # Event handler for the bridge: Log messages
+    def handle(self, message):
+        do_print(repr(message))
+
+    # Event handler for the bridge: Called when a file has been received completely
+    def transfer_finished(self, file_id_bytes):
+        pass
+
+    # Returns the stack trace of the exception as string
+    def get_trace(self, exception):
+        import traceback
+        return "".join(traceback.format_exception(None, exception, exception.__traceback__))
+
+    # Storage factory for the bridge: Called when a transfer starts
+    def get_storage(self):
+        if self.__storage_factory:
+            return self.__storage_factory()
+
+        from pymidibridge.MidiBridgeStorageProvider import MidiBridgeStorageProvider
+        return MidiBridgeStorageProvider(temp_file_path = self.__temp_file_path)
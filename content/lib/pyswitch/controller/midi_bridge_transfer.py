@@ -0,0 +1,332 @@
+from micropython import const
+from array import array
+from os import rename, remove
+
+
+# Commands of the windowed transfer mode (first data byte of the bridge SysEx messages). PyMidiBridge uses
+# 0x01 to 0x04, so all commands of this mode have bit 0x10 set. Syntax (numbers are 3 bytes packed to 4 MIDI
+# bytes, checksums are CRC-16 packed to 3 MIDI bytes, calculated over the rest of the message like PyMidiBridge does):
+#
+# Start (sender): [
+#     WINDOWED_START, <checksum>, <Transmission ID, 4>, <Proposed chunk size, 4>, <File size in bytes, 4>,
+#     <CRC-16 of the whole file, 3>, <Path, packed utf-8 bytes>
+# ]
+#
+# Data (sender): [
+#     WINDOWED_DATA, <checksum>, <Transmission ID, 4>, <Chunk index, 4>, <Payload, packed bytes>
+# ]
+#
+# Ack (receiver): [
+#     WINDOWED_ACK, <checksum>, <Transmission ID, 4>, <Index of the next expected chunk, 4>, <Chunk size, 4>, <Window size, 4>
+# ]
+#
+# Error (receiver): [
+#     WINDOWED_ERROR, <checksum>, <Transmission ID, 4>, <Message, packed utf-8 bytes>
+# ]
+WINDOWED_START = const(0x11)
+WINDOWED_DATA = const(0x12)
+WINDOWED_ACK = const(0x13)
+WINDOWED_ERROR = const(0x14)
+
+_CHECKSUM_LENGTH = const(3)
+_NUMBER_LENGTH = const(4)
+
+# Reversed CRC-16 polynomial of PyMidiBridge / JsMidiBridge
+_CRC_POLY = const(0x6756)
+
+
+# Receives files sent in windowed transfer mode. The sender may send a window of chunks without waiting for the
+# acknowledgements. Every chunk carries its own checksum. Chunks are only accepted in order and are written to a
+# temporary file directly, all others (also chunks with checksum errors) are answered with an ack containing the
+# index of the chunk expected next, so the sender goes back and repeats from there. The temporary file is renamed
+# to the target path when the CRC of the whole file matches.
+#
+# If a transfer is interrupted, it is resumed when the same file (same path, size and CRC) is sent again: The
+# ack for the start message then contains the index of the first chunk still missing.
+class WindowedTransferReceiver:
+
+    # send:             Callback sending SysEx messages: (manufacturer_id, data) => void
+    # manufacturer_id:  Manufacturer ID for the messages sent
+    # temp_file_path:   Path of the temporary file
+    # max_chunk_size:   Max. accepted chunk size in bytes (before packing). The SysEx messages of a chunk are
+    #                   about chunk size * 8 / 7 + 16 bytes long, the input buffer of the MIDI port must hold this.
+    # window_size:      Number of chunks the sender may send without waiting for acknowledgements
+    def __init__(self, send, manufacturer_id, temp_file_path, max_chunk_size = 65, window_size = 4):
+        self.__send = send
+        self.__manufacturer_id = manufacturer_id
+        self.__temp_file_path = temp_file_path
+        self.__max_chunk_size = max_chunk_size
+        self.__window_size = window_size
+
+        # Current transmission
+        self.__id = None
+        self.__path = None
+        self.__size = 0
+        self.__file_crc = 0
+        self.__chunk_size = 0
+        self.__num_chunks = 0
+        self.__next_chunk = 0
+        self.__crc = 0xFFFF
+        self.__file = None
+
+        # Statistics
+        self.num_files = 0
+        self.num_chunks = 0
+        self.num_rejected = 0       # Chunks not accepted (out of order or checksum mismatch)
+
+    # Process a bridge message of the windowed transfer mode (data of the SysEx message)
+    def receive(self, data):
+        command = data[0]
+        checksum_valid = _get_checksum(data, 1 + _CHECKSUM_LENGTH) == _bytes_to_number(data, 1, _CHECKSUM_LENGTH)
+
+        pos = 1 + _CHECKSUM_LENGTH
+        transmission_id = bytes(data[pos:pos + _NUMBER_LENGTH])
+        pos += _NUMBER_LENGTH
+
+        if command == WINDOWED_DATA:
+            if transmission_id != self.__id:
+                # Unknown or finished transmission (if the receiver state has been lost, the sender will
+                # start over after a timeout)
+                return
+
+            index = _bytes_to_number(data, pos, _NUMBER_LENGTH)
+
+            if not checksum_valid or index != self.__next_chunk:
+                # Let the sender repeat from the next expected chunk
+                self.num_rejected += 1
+                self.__ack()
+                return
+
+            self.__receive_chunk(data, pos + _NUMBER_LENGTH)
+
+        elif command == WINDOWED_START:
+            if not checksum_valid:
+                # The sender will repeat the start message after a timeout
+                return
+
+            self.__start(
+                transmission_id = transmission_id,
+                chunk_size = min(_bytes_to_number(data, pos, _NUMBER_LENGTH), self.__max_chunk_size),
+                size = _bytes_to_number(data, pos + _NUMBER_LENGTH, _NUMBER_LENGTH),
+                file_crc = _bytes_to_number(data, pos + 2 * _NUMBER_LENGTH, _CHECKSUM_LENGTH),
+                path = _unpack(data[pos + 2 * _NUMBER_LENGTH + _CHECKSUM_LENGTH:]).decode()
+            )
+
+    # Start (or resume) a transmission
+    def __start(self, transmission_id, chunk_size, size, file_crc, path):
+        if self.__file and path == self.__path and size == self.__size and file_crc == self.__file_crc and chunk_size == self.__chunk_size:
+            # Same file as the interrupted one: Resume
+            self.__id = transmission_id
+            self.__ack()
+            return
+
+        self.__close()
+
+        if chunk_size < 1:
+            self.__error(transmission_id, "Invalid chunk size")
+            return
+
+        self.__id = transmission_id
+        self.__path = path
+        self.__size = size
+        self.__file_crc = file_crc
+        self.__chunk_size = chunk_size
+        self.__num_chunks = (size + chunk_size - 1) // chunk_size
+        self.__next_chunk = 0
+        self.__crc = 0xFFFF
+
+        try:
+            self.__file = open(self.__temp_file_path, "wb")
+        except OSError as e:
+            self.__id = None
+            self.__error(transmission_id, repr(e))
+            return
+
+        if self.__num_chunks == 0:
+            self.__finish()
+        else:
+            self.__ack()
+
+    # Write the (packed) chunk payload starting at pos to the file
+    def __receive_chunk(self, data, pos):
+        chunk = _unpack(data[pos:])
+
+        # Only the last chunk can be shorter
+        if len(chunk) != min(self.__chunk_size, self.__size - self.__next_chunk * self.__chunk_size):
+            self.num_rejected += 1
+            self.__ack()
+            return
+
+        try:
+            self.__file.write(chunk)
+        except OSError as e:
+            self.__error(self.__id, repr(e))
+            self.__close()
+            return
+
+        self.__crc = _crc16_update(self.__crc, chunk)
+        self.__next_chunk += 1
+        self.num_chunks += 1
+
+        if self.__next_chunk == self.__num_chunks:
+            self.__finish()
+        else:
+            self.__ack()
+
+    # All chunks received: Check the CRC of the file and move it to the target path
+    def __finish(self):
+        transmission_id = self.__id
+
+        self.__file.close()
+        self.__file = None
+
+        if _crc16_final(self.__crc) != self.__file_crc:
+            self.__close()
+            self.__error(transmission_id, "File checksum mismatch")
+            return
+
+        try:
+            try:
+                remove(self.__path)
+            except OSError:
+                pass
+
+            rename(self.__temp_file_path, self.__path)
+
+        except OSError as e:
+            self.__close()
+            self.__error(transmission_id, repr(e))
+            return
+
+        self.num_files += 1
+
+        # Acknowledge the whole file
+        self.__ack()
+        self.__id = None
+
+    # Ends the current transmission, removing the temporary file
+    def __close(self):
+        if self.__file:
+            self.__file.close()
+            self.__file = None
+
+        if self.__id != None:
+            try:
+                remove(self.__temp_file_path)
+            except OSError:
+                pass
+
+        self.__id = None
+
+    # Send the ack message for the current transmission
+    def __ack(self):
+        self.__send_message(
+            WINDOWED_ACK,
+            self.__id + _number_to_bytes(self.__next_chunk) + _number_to_bytes(self.__chunk_size) + _number_to_bytes(self.__window_size)
+        )
+
+    def __error(self, transmission_id, message):
+        self.__send_message(
+            WINDOWED_ERROR,
+            transmission_id + _pack(message.encode())
+        )
+
+    def __send_message(self, command, payload):
+        self.__send(
+            self.__manufacturer_id,
+            bytes([command]) + _pack(_crc16_final(_crc16_update(0xFFFF, payload)).to_bytes(2, "big")) + payload
+        )
+
+
+####################################################################################################################
+
+
+# Lookup table for the CRC (created on first use)
+_crc_table = None
+
+def _get_crc_table():
+    global _crc_table
+
+    if not _crc_table:
+        _crc_table = array("H", [0] * 256)
+
+        for i in range(256):
+            crc = i
+            for x in range(8):
+                if crc & 0x0001:
+                    crc = (crc >> 1) ^ _CRC_POLY
+                else:
+                    crc >>= 1
+
+            _crc_table[i] = crc
+
+    return _crc_table
+
+# Updates the CRC register with the passed bytes (start with 0xFFFF)
+def _crc16_update(crc, data):
+    table = _get_crc_table()
+
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+
+    return crc
+
+# Returns the final CRC value for the register (like PyMidiBridge does: inverted, bytes swapped)
+def _crc16_final(crc):
+    crc = ~crc & 0xFFFF
+    return ((crc << 8) | (crc >> 8)) & 0xFFFF
+
+# Returns the CRC of the message data starting at pos
+def _get_checksum(data, pos):
+    return _crc16_final(_crc16_update(0xFFFF, data[pos:]))
+
+# Packs bytes to MIDI bytes (7 bits each, MSB first, the rest is padded with zeros)
+def _pack(data):
+    ret = bytearray((len(data) * 8 + 6) // 7)
+    acc = 0
+    bits = 0
+    pos = 0
+
+    for b in data:
+        acc = (acc << 8) | b
+        bits += 8
+
+        while bits >= 7:
+            bits -= 7
+            ret[pos] = (acc >> bits) & 0x7F
+            pos += 1
+
+        acc &= (1 << bits) - 1
+
+    if bits > 0:
+        ret[pos] = (acc << (7 - bits)) & 0x7F
+
+    return bytes(ret)
+
+# Unpacks MIDI bytes to bytes (padding bits are dropped)
+def _unpack(data):
+    ret = bytearray(len(data) * 7 // 8)
+    acc = 0
+    bits = 0
+    pos = 0
+
+    for b in data:
+        acc = (acc << 7) | b
+        bits += 7
+
+        if bits >= 8:
+            bits -= 8
+            ret[pos] = (acc >> bits) & 0xFF
+            pos += 1
+
+        acc &= (1 << bits) - 1
+
+    return ret
+
+# Packs a 3 byte number
+def _number_to_bytes(value):
+    return _pack(value.to_bytes(3, "big"))
+
+# Reads a packed number from length MIDI bytes at pos
+def _bytes_to_number(data, pos, length):
+    return int.from_bytes(_unpack(data[pos:pos + length]), "big")
@@ -0,0 +1,321 @@
+from micropython import const
+
+from adafruit_midi.midi_message import MIDIUnknownEvent
+from adafruit_midi.control_change import ControlChange
+from adafruit_midi.program_change import ProgramChange
+from adafruit_midi.system_exclusive import SystemExclusive
+
+
+# Status bytes
+_STATUS_SYSEX = const(0xF0)
+_STATUS_SYSEX_END = const(0xF7)
+_STATUS_REALTIME = const(0xF8)      # All status bytes from here are real time messages
+_STATUS_CONTROL_CHANGE = const(0xB0)
+_STATUS_PROGRAM_CHANGE = const(0xC0)
+
+
+# Incremental MIDI parser, as alternative to adafruit_midi.MIDI.receive() for the input of MIDI devices.
+# Bytes read from the port are kept in a ring buffer of fixed size and parsed one by one, so no buffer is
+# re-scanned or re-allocated. Supports running status and SysEx messages spanning several reads (which
+# are reassembled in a reusable buffer).
+#
+# Only message kinds which are accepted (see set_accept()) are emitted, all others are skipped without
+# creating any objects. ControlChange and ProgramChange messages are emitted as the same instance every time
+# (with the values changed), so the messages returned by receive() are only valid until the next call! Set
+# reuse_messages to False if messages are kept longer (for example when forwarded to other MIDI devices which
+# might queue them, see MidiController).
+# Accepted kinds which are not supported are emitted as MIDIUnknownEvent, like adafruit_midi does.
+class MidiParser:
+
+    # Message kinds which are accepted per default
+    DEFAULT_ACCEPT = (_STATUS_CONTROL_CHANGE, _STATUS_PROGRAM_CHANGE, _STATUS_SYSEX)
+
+    # buffer_size:  Size of the ring buffer for incoming bytes
+    # sysex_size:   Max. size of SysEx messages (including manufacturer ID). Longer messages are dropped.
+    # in_channel:   Channel(s) to receive channel messages from (int or tuple, zero based). None for all channels.
+    # accept:       List of message kinds to emit (status bytes, with channel bits zero for channel messages).
+    #               If None, DEFAULT_ACCEPT is used.
+    def __init__(self, buffer_size = 100, sysex_size = 128, in_channel = None, accept = None):
+        self.__buffer = bytearray(buffer_size)
+        self.__read_pos = 0
+        self.__num_bytes = 0
+
+        self.__sysex = bytearray(sysex_size)
+        self.__sysex_len = -1                   # -1: Not in a SysEx message
+        self.__manufacturer_id = b""
+
+        self.__status = 0                       # Running status (0: None)
+        self.__data_1 = 0
+        self.__num_data = 0
+        self.__expected_data = 0
+
+        self.__channels = bytearray(16)
+        self.in_channel = in_channel
+
+        self.__accept = bytearray(256)
+        self.set_accept(accept if accept != None else self.DEFAULT_ACCEPT)
+
+        self.__manufacturers = None             # Accepted SysEx manufacturer IDs (None: All)
+
+        # Reused message instances
+        self.__control_change = ControlChange(0, 0)
+        self.__program_change = ProgramChange(0)
+
+        # If False, every ControlChange and ProgramChange message is a new instance
+        self.reuse_messages = True
+
+        # Statistics
+        self.num_messages = 0       # Emitted messages
+        self.num_skipped = 0        # Messages skipped because their kind (or SysEx manufacturer ID) is not accepted (or wrong channel)
+        self.num_overflows = 0      # SysEx messages dropped because they were too long
+
+    # Set the channels to receive channel messages from
+    @property
+    def in_channel(self):
+        return self.__in_channel
+
+    @in_channel.setter
+    def in_channel(self, in_channel):
+        self.__in_channel = in_channel
+
+        for i in range(16):
+            if in_channel == None:
+                self.__channels[i] = 1
+            elif isinstance(in_channel, int):
+                self.__channels[i] = 1 if in_channel == i else 0
+            else:
+                self.__channels[i] = 1 if i in in_channel else 0
+
+    # Set the message kinds to be emitted (status bytes, with channel bits zero for channel messages)
+    def set_accept(self, kinds):
+        for i in range(256):
+            self.__accept[i] = 0
+
+        for kind in kinds:
+            self.__accept[kind] = 1
+
+    # Returns if the passed message kind is accepted
+    def accepts(self, kind):
+        return self.__accept[kind] == 1
+
+    # Set the SysEx manufacturer IDs to be emitted (list of bytes, None for all). SysEx messages of other
+    # manufacturers are skipped as soon as their manufacturer ID has been read.
+    def set_accept_manufacturers(self, manufacturer_ids):
+        self.__manufacturers = [bytes(m) for m in manufacturer_ids] if manufacturer_ids != None else None
+
+    # Returns the next accepted message, or None if no complete message is available. Buffered bytes
+    # are parsed first, the port is only read when the buffer is empty. The port must provide
+    # readinto(buffer) (like usb_midi.PortIn and busio.UART do).
+    def receive(self, port):
+        msg = self.parse()
+        if msg:
+            return msg
+        
+        self.__fill(port)
+
+        return self.parse()
+
+    # Adds the passed bytes to the ring buffer, as far as there is space. Returns the number of bytes added.
+    def feed(self, data):
+        buffer = self.__buffer
+        size = len(buffer)
+        pos = (self.__read_pos + self.__num_bytes) % size
+
+        num = 0
+        for b in data:
+            if self.__num_bytes == size:
+                break
+
+            buffer[pos] = b
+            pos = (pos + 1) % size
+
+            self.__num_bytes += 1
+            num += 1
+
+        return num
+
+    # Parses the bytes in the ring buffer until the next accepted message is complete, and returns it.
+    # Returns None if no complete message is available.
+    def parse(self):
+        buffer = self.__buffer
+        size = len(buffer)
+
+        while self.__num_bytes > 0:
+            b = buffer[self.__read_pos]
+
+            self.__read_pos = (self.__read_pos + 1) % size
+            self.__num_bytes -= 1
+
+            msg = self.__parse_byte(b)
+            if msg:
+                self.num_messages += 1
+                return msg
+
+        return None
+
+    # Read from the port into the ring buffer, which must be empty (parse() always consumes all bytes
+    # when no message is complete). The whole buffer is passed, so no slice has to be created.
+    def __fill(self, port):
+        self.__read_pos = 0
+
+        num = port.readinto(self.__buffer)
+        if num:
+            self.__num_bytes = num
+
+    # Processes one byte. Returns a message if one is complete and accepted.
+    def __parse_byte(self, b):
+        if b >= _STATUS_REALTIME:
+            # Real time messages can occur anywhere (even inside other messages) and do not change the state
+            if self.__accept[b]:
+                return MIDIUnknownEvent(b)
+
+            self.num_skipped += 1
+            return None
+
+        if b >= 0x80:
+            return self.__parse_status(b)
+
+        # Data bytes
+        if self.__sysex_len >= 0:
+            if self.__sysex_len < len(self.__sysex):
+                self.__sysex[self.__sysex_len] = b
+                self.__sysex_len += 1
+
+                if self.__manufacturers != None and (self.__sysex_len == 3 or (self.__sysex_len == 1 and b != 0)):
+                    if not self.__accepts_manufacturer(self.__sysex_len):
+                        # Skip the rest of the message (data bytes without status are ignored)
+                        self.__sysex_len = -1
+                        self.num_skipped += 1
+            else:
+                # Too long: Drop the message
+                self.__sysex_len = -1
+                self.num_overflows += 1
+
+            return None
+
+        status = self.__status
+        if not status:
+            # No status known (yet): Ignore
+            return None
+
+        if self.__num_data == 0 and self.__expected_data == 2:
+            self.__data_1 = b
+            self.__num_data = 1
+            return None
+
+        # Message complete
+        self.__num_data = 0
+
+        if status >= _STATUS_SYSEX:
+            # System common messages do not set running status
+            self.__status = 0
+
+        return self.__emit(status, b)
+
+    # Processes a status byte (no real time status)
+    def __parse_status(self, b):
+        if b == _STATUS_SYSEX_END:
+            if self.__sysex_len < 0:
+                return None
+
+            length = self.__sysex_len
+            self.__sysex_len = -1
+
+            if not self.__accept[_STATUS_SYSEX]:
+                self.num_skipped += 1
+                return None
+
+            return self.__emit_sysex(length)
+
+        # Any other status ends a SysEx message (unterminated messages are dropped) and running status
+        self.__sysex_len = -1
+        self.__num_data = 0
+        self.__status = 0
+
+        if b == _STATUS_SYSEX:
+            self.__sysex_len = 0
+            return None
+
+        if b < _STATUS_SYSEX:
+            # Channel messages
+            kind = b & 0xF0
+            self.__expected_data = 1 if kind == _STATUS_PROGRAM_CHANGE or kind == 0xD0 else 2
+        else:
+            # System common messages
+            if b == 0xF2:
+                self.__expected_data = 2
+            elif b == 0xF1 or b == 0xF3:
+                self.__expected_data = 1
+            else:
+                # No data (tune request) or undefined
+                if self.__accept[b]:
+                    return MIDIUnknownEvent(b)
+
+                self.num_skipped += 1
+                return None
+
+        self.__status = b
+        return None
+
+    # Returns the message for a complete channel or system common message, if accepted
+    def __emit(self, status, data_last):
+        if status < _STATUS_SYSEX:
+            kind = status & 0xF0
+            channel = status & 0x0F
+
+            if not self.__accept[kind] or not self.__channels[channel]:
+                self.num_skipped += 1
+                return None
+
+            if kind == _STATUS_CONTROL_CHANGE:
+                msg = self.__control_change if self.reuse_messages else ControlChange(0, 0)
+                msg.control = self.__data_1
+                msg.value = data_last
+                msg.channel = channel
+                return msg
+
+            if kind == _STATUS_PROGRAM_CHANGE:
+                msg = self.__program_change if self.reuse_messages else ProgramChange(0)
+                msg.patch = data_last
+                msg.channel = channel
+                return msg
+
+            return MIDIUnknownEvent(status)
+
+        if not self.__accept[status]:
+            self.num_skipped += 1
+            return None
+
+        return MIDIUnknownEvent(status)
+
+    # Returns if the manufacturer ID (the first length bytes of the SysEx buffer) is accepted
+    def __accepts_manufacturer(self, length):
+        sysex = self.__sysex
+
+        for m in self.__manufacturers:
+            if len(m) != length:
+                continue
+
+            if m[0] == sysex[0] and (length == 1 or (m[1] == sysex[1] and m[2] == sysex[2])):
+                return True
+            
+        return False
+
+    # Returns a SysEx message with the contents of the SysEx buffer
+    def __emit_sysex(self, length):
+        sysex = self.__sysex
+
+        if length == 0:
+            return None
+
+        # Manufacturer ID: One byte, or three bytes if the first one is zero
+        id_len = 1 if sysex[0] != 0 else 3
+        if length < id_len:
+            return None
+
+        # The manufacturer ID is reused if the same as the last one
+        manufacturer_id = self.__manufacturer_id
+        if len(manufacturer_id) != id_len or manufacturer_id[0] != sysex[0] or (id_len == 3 and (manufacturer_id[1] != sysex[1] or manufacturer_id[2] != sysex[2])):
+            manufacturer_id = self.__manufacturer_id = bytes(sysex[0:id_len])
+
+        return SystemExclusive(manufacturer_id, bytes(sysex[id_len:length]))
@@ -0,0 +1,246 @@
+from ..misc import get_current_millis, do_print, PeriodCounter
+
+from adafruit_midi.midi_message import MIDIUnknownEvent
+from adafruit_midi.control_change import ControlChange
+from adafruit_midi.program_change import ProgramChange
+from adafruit_midi.system_exclusive import SystemExclusive
+
+
+# File header of MIDI recordings (including format version)
+RECORDING_HEADER = b"PSMR\x01"
+
+# Event directions
+RECORDING_IN = 0
+RECORDING_OUT = 1
+
+
+# Records all MIDI messages passing the wrapped MIDI controller (incoming as returned by receive(), outgoing as
+# passed to send()) with timestamps into a compact binary file, which can be replayed later. Events are buffered
+# in memory and appended to the file when the buffer is full or flush() is called.
+#
+# File format: RECORDING_HEADER, followed by the events, each consisting of:
+#   - Direction (RECORDING_IN or RECORDING_OUT), one byte
+#   - Time passed since the last event in milliseconds (variable length number, 7 bits per byte, MSB set for all but the last byte)
+#   - Number of bytes of the message (variable length number)
+#   - Raw MIDI message bytes
+class MidiRecorder:
+
+    # midi:           MIDI controller to be wrapped (for example a MidiController)
+    # file_path:      Path of the recording file (will be overwritten)
+    # buffer_size:    Size of the memory buffer for events (bytes)
+    # flush_interval_millis: The buffer is written to the file in this interval at least (0: only when full)
+    def __init__(self, midi, file_path, buffer_size = 4096, flush_interval_millis = 5000):
+        self.__midi = midi
+        self.__file_path = file_path
+        self.__buffer = bytearray(buffer_size)
+        self.__pos = 0
+        self.__flush_period = PeriodCounter(flush_interval_millis) if flush_interval_millis > 0 else None
+        self.__last_time = get_current_millis()
+        self.__enabled = True
+
+        self.num_events = 0
+        self.num_skipped = 0   # Messages too large for the buffer
+        self.num_bytes = 0     # Bytes written to the file
+
+        self.__write_file(RECORDING_HEADER, "wb")
+
+    # MIDI message filter of the wrapped controller (see MidiFilter)
+    @property
+    def filter(self):
+        return getattr(self.__midi, "filter", None)
+
+    # Transmit schedulers of the wrapped controller (see MidiTransmitScheduler)
+    @property
+    def transmitters(self):
+        return getattr(self.__midi, "transmitters", [])
+
+    # Thru backlog counter of the wrapped controller (see MidiController)
+    @property
+    def thru_backlog(self):
+        return getattr(self.__midi, "thru_backlog", None)
+
+    def send(self, midi_message):
+        self.__record(RECORDING_OUT, midi_message)
+        self.__midi.send(midi_message)
+
+    def receive(self):
+        midi_message = self.__midi.receive()
+
+        if midi_message:
+            self.__record(RECORDING_IN, midi_message)
+
+        elif self.__flush_period and self.__flush_period.exceeded:
+            # Flush when there is nothing to do
+            self.flush()
+
+        return midi_message
+
+    # Writes all buffered events to the file
+    def flush(self):
+        if self.__pos > 0:
+            self.__write_file(memoryview(self.__buffer)[:self.__pos], "ab")
+            self.__pos = 0
+
+    def __record(self, direction, midi_message):
+        if not self.__enabled:
+            return
+
+        # Other message types than CC, PC and SysEx are encoded by adafruit_midi (these are rare, so the allocation is ok)
+        raw = _raw_bytes(midi_message)
+
+        # Maximum header size: Direction, 4 bytes time and 4 bytes length
+        size = _encoded_size(midi_message, raw) + 9
+        if self.__pos + size > len(self.__buffer):
+            self.flush()
+
+            if size > len(self.__buffer):
+                self.num_skipped += 1
+                return
+
+        now = get_current_millis()
+
+        buffer = self.__buffer
+        buffer[self.__pos] = direction
+        pos = _write_number(buffer, self.__pos + 1, now - self.__last_time)
+        pos = _write_number(buffer, pos, size - 9)
+        self.__pos = _encode(midi_message, raw, buffer, pos)
+
+        self.__last_time = now
+        self.num_events += 1
+
+    def __write_file(self, data, mode):
+        if not self.__enabled:
+            return
+
+        try:
+            with open(self.__file_path, mode) as f:
+                f.write(data)
+
+            self.num_bytes += len(data)
+
+        except OSError as e:
+            # Filesystem not writable (or full): Stop recording
+            do_print(f"MIDI recording stopped: { repr(e) }")
+            self.__enabled = False
+
+
+# Reads the events of a recording (bytes). Returns a list of tuples (time, direction, data) with the time
+# in milliseconds relative to the start of the recording.
+def read_recording(data):
+    if data[:len(RECORDING_HEADER)] != RECORDING_HEADER:
+        raise Exception() # Invalid recording
+
+    ret = []
+    pos = len(RECORDING_HEADER)
+    time = 0
+
+    while pos < len(data):
+        direction = data[pos]
+        delta, pos = _read_number(data, pos + 1)
+        length, pos = _read_number(data, pos)
+
+        time += delta
+        ret.append((time, direction, bytes(data[pos:pos + length])))
+        pos += length
+
+    return ret
+
+
+# Returns the raw MIDI bytes for message types other than CC, PC and SysEx, as far as adafruit_midi can encode 
+# them (None for all others)
+def _raw_bytes(midi_message):
+    if isinstance(midi_message, (SystemExclusive, ControlChange, ProgramChange, MIDIUnknownEvent)):
+        return None
+    
+    if not hasattr(midi_message, "__bytes__"):
+        return None
+    
+    return bytes(midi_message)
+
+# Returns the number of bytes of the encoded message (raw: see _raw_bytes())
+def _encoded_size(midi_message, raw):
+    if raw != None:
+        return len(raw)
+
+    if isinstance(midi_message, SystemExclusive):
+        return len(midi_message.manufacturer_id) + len(midi_message.data) + 2
+
+    elif isinstance(midi_message, ControlChange):
+        return 3
+
+    elif isinstance(midi_message, ProgramChange):
+        return 2
+
+    return 1
+
+# Writes the raw MIDI bytes of the message to the buffer at the given position (raw: see _raw_bytes()). Returns the 
+# position after the message. For unknown messages (which cannot be encoded), only the status byte is recorded.
+def _encode(midi_message, raw, buffer, pos):
+    if raw != None:
+        for b in raw:
+            buffer[pos] = b
+            pos += 1
+
+        return pos
+
+    if isinstance(midi_message, SystemExclusive):
+        buffer[pos] = 0xF0
+        pos += 1
+
+        for b in midi_message.manufacturer_id:
+            buffer[pos] = b
+            pos += 1
+
+        for b in midi_message.data:
+            buffer[pos] = b
+            pos += 1
+
+        buffer[pos] = 0xF7
+        return pos + 1
+
+    channel = getattr(midi_message, "channel", None)
+    if channel == None:
+        channel = 0
+
+    if isinstance(midi_message, ControlChange):
+        buffer[pos] = 0xB0 | channel
+        buffer[pos + 1] = midi_message.control
+        buffer[pos + 2] = midi_message.value
+        return pos + 3
+
+    elif isinstance(midi_message, ProgramChange):
+        buffer[pos] = 0xC0 | channel
+        buffer[pos + 1] = midi_message.patch
+        return pos + 2
+
+    if isinstance(midi_message, MIDIUnknownEvent):
+        buffer[pos] = midi_message.status
+    else:
+        buffer[pos] = getattr(midi_message, "_STATUS", 0)
+
+    return pos + 1
+
+# Writes a variable length number (7 bits per byte, MSB set if more bytes follow). Returns the position after the number.
+def _write_number(buffer, pos, value):
+    while value > 0x7F:
+        buffer[pos] = (value & 0x7F) | 0x80
+        value >>= 7
+        pos += 1
+
+    buffer[pos] = value
+    return pos + 1
+
+# Reads a variable length number. Returns a tuple (value, position after the number).
+def _read_number(data, pos):
+    value = 0
+    shift = 0
+
+    while True:
+        b = data[pos]
+        pos += 1
+
+        value |= (b & 0x7F) << shift
+        shift += 7
+
+        if not b & 0x80:
+            return (value, pos)
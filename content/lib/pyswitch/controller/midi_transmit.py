@@ -0,0 +1,175 @@
+from ..misc import get_current_millis
+from .midi import get_message_size
+
+from adafruit_midi.control_change import ControlChange
+from adafruit_midi.program_change import ProgramChange
+from adafruit_midi.system_exclusive import SystemExclusive
+
+
+# Transmit scheduler for slow MIDI connections (DIN MIDI runs at 31250 baud, which is about 3125 bytes per second).
+# Keeps track of the bytes still being transmitted, based on the baud rate. Messages are only written when there
+# is enough room in the transmit buffer (so writing does not block), all others are held in a bounded queue which
+# is drained in the next calls to process() (MidiController does this on every receive() call).
+#
+# When the queue is full, a new message replaces a waiting message it supersedes (same control change number and 
+# channel, program change on the same channel, or an identical SysEx message like a repeated parameter request).
+# Only if there is none, the new message is dropped.
+class MidiTransmitScheduler:
+
+    # write:             Callback writing a message to the connection: (midi_message) => void
+    # baudrate:          Baud rate of the connection (one byte takes 10 bits including start and stop bits)
+    # buffer_bytes:      Bytes which can be written without blocking (size of the transmit FIFO)
+    # max_queue_size:    Max. number of waiting messages. If the queue is full, new messages are merged or dropped.
+    def __init__(self, write, baudrate = 31250, buffer_bytes = 32, max_queue_size = 32):
+        self.__write = write
+        self.__bytes_per_second = baudrate // 10
+        self.__buffer_bytes = buffer_bytes
+        self.__max_queue_size = max_queue_size
+
+        self.__in_flight = 0             # Bytes not transmitted yet
+        self.__last_update = get_current_millis()
+
+        # Queue of waiting messages and their enqueue times (the lists are only cleared when empty, to avoid re-allocations)
+        self.__queue = []
+        self.__times = []
+        self.__queue_pos = 0
+
+        # Statistics
+        self.num_sent = 0                # Messages sent overall
+        self.num_queued = 0              # Messages which had to wait in the queue
+        self.num_merged = 0              # Messages which replaced a superseded waiting message because the queue was full
+        self.num_dropped = 0             # Messages dropped because the queue was full
+        self.max_depth = 0               # Max. number of waiting messages
+        self.wait_max_millis = 0         # Max. time a message has been waiting
+        self.__wait_sum_millis = 0
+
+    # Number of messages waiting to be sent
+    @property
+    def num_pending(self):
+        return len(self.__queue) - self.__queue_pos
+
+    # Average time the queued messages have been waiting (milliseconds)
+    @property
+    def wait_average_millis(self):
+        return self.__wait_sum_millis / self.num_queued if self.num_queued else 0
+
+    # Sends the message if there is room in the transmit buffer and no other messages are waiting, else enqueues it.
+    def send(self, midi_message):
+        if self.__queue_pos < len(self.__queue):
+            self.__enqueue(midi_message)
+            return
+
+        self.__update()
+
+        size = get_message_size(midi_message)
+        if not self.__fits(size):
+            self.__enqueue(midi_message)
+            return
+
+        self.__send(midi_message, size)
+
+    # Registers bytes which have been written to the connection by other means (raw routings)
+    def written(self, num_bytes):
+        self.__update()
+        self.__in_flight += num_bytes
+
+    # Sends waiting messages as far as there is room in the transmit buffer
+    def process(self):
+        queue = self.__queue
+        pos = self.__queue_pos
+
+        if pos >= len(queue):
+            return
+
+        self.__update()
+        now = get_current_millis()
+
+        while pos < len(queue):
+            size = get_message_size(queue[pos])
+            if not self.__fits(size):
+                break
+
+            wait = now - self.__times[pos]
+            self.__wait_sum_millis += wait
+            if wait > self.wait_max_millis:
+                self.wait_max_millis = wait
+
+            self.__send(queue[pos], size)
+            pos += 1
+
+        if pos < len(queue):
+            self.__queue_pos = pos
+        else:
+            queue.clear()
+            self.__times.clear()
+            self.__queue_pos = 0
+
+    # Returns if a message of the given size can be written without blocking. If nothing is in flight,
+    # the message is always sent (messages larger than the buffer would never be sent otherwise).
+    def __fits(self, size):
+        return self.__in_flight == 0 or self.__in_flight + size <= self.__buffer_bytes
+
+    def __send(self, midi_message, size):
+        self.__write(midi_message)
+
+        self.__in_flight += size
+        self.num_sent += 1
+
+    def __enqueue(self, midi_message):
+        if self.num_pending >= self.__max_queue_size:
+            self.__merge(midi_message)
+            return
+
+        self.__queue.append(midi_message)
+        self.__times.append(get_current_millis())
+        self.num_queued += 1
+
+        if self.num_pending > self.max_depth:
+            self.max_depth = self.num_pending
+
+    # Replaces the oldest waiting message superseded by the passed one (the position in the queue is kept), or 
+    # drops the passed message if there is none.
+    def __merge(self, midi_message):
+        queue = self.__queue
+
+        for i in range(self.__queue_pos, len(queue)):
+            if _supersedes(midi_message, queue[i]):
+                queue[i] = midi_message
+                self.num_merged += 1
+                return
+
+        self.num_dropped += 1
+
+    # Updates the amount of bytes in flight according to the time passed since the last update
+    def __update(self):
+        now = get_current_millis()
+
+        if self.__in_flight > 0:
+            transmitted = (now - self.__last_update) * self.__bytes_per_second // 1000
+            if transmitted <= 0:
+                # Less than one byte transmitted: Keep the last update time so the time is not lost
+                return
+            
+            self.__in_flight = max(0, self.__in_flight - transmitted)
+
+        self.__last_update = now
+
+
+# Returns if sending message a makes sending the (earlier) message b unnecessary
+def _supersedes(a, b):
+    if a.__class__ != b.__class__:
+        return False
+    
+    if getattr(a, "channel", None) != getattr(b, "channel", None):
+        return False
+
+    if isinstance(a, ControlChange):
+        return a.control == b.control
+    
+    if isinstance(a, ProgramChange):
+        return True
+    
+    if isinstance(a, SystemExclusive):
+        return a.manufacturer_id == b.manufacturer_id and a.data == b.data
+    
+    return False
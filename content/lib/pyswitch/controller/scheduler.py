@@ -0,0 +1,83 @@
+from micropython import const
+
+from ..misc import get_ticks_ms, ticks_diff, fill_up_to
+
+
+# Tasks of the processing loop (indexes for the budgets and statistics)
+TASK_INPUTS = const(0)        # Scanning the switches and continuous inputs
+TASK_MIDI = const(1)          # Receiving and parsing MIDI messages
+TASK_UPDATE = const(2)        # Updating the Updateables (client, UI etc.)
+
+_TASK_NAMES = ("Inputs", "MIDI", "Update")
+
+
+# Cooperative scheduler for the ticks of the processing loop. Every tick has a time budget (milliseconds) which is
+# split among the tasks. A task works on its items (inputs, MIDI messages, Updateables) until its budget is used up,
+# the rest is left for the next tick. At least one item is processed per tick, so every task makes progress even if
+# single items take longer than the whole budget. The tick time (and with it the latency between pushing a switch
+# and sending the MIDI message) is thus bounded by the budget plus the time of the longest single item per task.
+#
+# The scheduler does not call the items itself, it only keeps track of the time:
+#
+#     scheduler.begin(TASK_MIDI)
+#     while not scheduler.expired:
+#         ...process one item...
+#     scheduler.end(TASK_MIDI, carry_over = <True if work is left>)
+#
+# The time is taken from get_ticks_ms(), which does not allocate memory on CircuitPython (expired is checked after 
+# every item). Budgets are thus whole milliseconds: A task gets at least one millisecond.
+class TickScheduler:
+
+    # budget_millis:   Time budget for one tick (milliseconds)
+    # split:           Shares of the tasks in percent (inputs, MIDI, update)
+    def __init__(self, budget_millis = 15, split = (20, 40, 40)):
+        if len(split) != 3:
+            raise Exception("Tick budget split must contain three values (inputs, MIDI, update)")
+
+        self.budget_millis = budget_millis
+        self.budgets = [max(1, budget_millis * share // 100) for share in split]
+
+        self.__start = 0
+        self.__budget = 0
+
+        # Statistics per task
+        self.overruns = [0, 0, 0]        # Number of ticks in which the task exceeded its budget
+        self.max_overrun = [0, 0, 0]     # Max. time the budget has been exceeded (milliseconds)
+        self.carry_overs = [0, 0, 0]     # Number of ticks in which work was left for the next tick
+
+    # Start working on a task
+    def begin(self, task):
+        self.__start = get_ticks_ms()
+        self.__budget = self.budgets[task]
+
+    # Returns if the budget of the current task has been used up
+    @property
+    def expired(self):
+        return ticks_diff(get_ticks_ms(), self.__start) >= self.__budget
+
+    # Finish working on a task. carry_over must be True if work has been left for the next tick.
+    def end(self, task, carry_over):
+        overrun = ticks_diff(get_ticks_ms(), self.__start) - self.__budget
+
+        if overrun > 0:
+            self.overruns[task] += 1
+
+            if overrun > self.max_overrun[task]:
+                self.max_overrun[task] = overrun
+
+        if carry_over:
+            self.carry_overs[task] += 1
+
+    # Resets the statistics
+    def reset(self):
+        for task in range(3):
+            self.overruns[task] = 0
+            self.max_overrun[task] = 0
+            self.carry_overs[task] = 0
+
+    # Returns a list of readable report lines (one per task)
+    def report(self):
+        return [
+            f"{ fill_up_to('Tick budget ' + _TASK_NAMES[task], 30, '.') }: { self.budgets[task] }ms, Overruns: { self.overruns[task] } (max. { self.max_overrun[task] }ms), Carry-overs: { self.carry_overs[task] }"
+            for task in range(3)
+        ]
@@ -12,6 +12,10 @@ class AdafruitDinMidiDevice:
                  timeout,
                  in_channel = None,   # All
                  out_channel = 0, 
+                 use_parser = False,  # Use the PySwitch MidiParser for receiving instead of adafruit_midi
+                 sysex_size = 128,    # Max. size of received SysEx messages when the MidiParser is used
+                 tx_queue_size = 0    # If > 0, messages are sent via a MidiTransmitScheduler which never blocks on 
+                                      # UART writes, holding up to this amount of messages until the link is free.
         ):
 
         midi_uart = _UART(
@@ -21,6 +25,8 @@ class AdafruitDinMidiDevice:
             timeout = timeout
         ) 
 
+        self.__uart = midi_uart
+
         self.__midi = _MIDI(
             midi_out = midi_uart, 
             out_channel = out_channel,
@@ -29,6 +35,28 @@ class AdafruitDinMidiDevice:
             in_buf_size = in_buf_size
         )
 
+        # Optional incremental parser for receiving (the adafruit_midi instance is still used for sending)
+        self.parser = None
+        if use_parser:
+            from ...controller.midi_parser import MidiParser
+            
+            self.parser = MidiParser(
+                buffer_size = in_buf_size,
+                sysex_size = sysex_size,
+                in_channel = in_channel
+            )
+
+        # Optional transmit scheduler (see MidiController, which drains the queue)
+        self.transmitter = None
+        if tx_queue_size > 0:
+            from ...controller.midi_transmit import MidiTransmitScheduler
+
+            self.transmitter = MidiTransmitScheduler(
+                write = self.__midi.send,
+                baudrate = baudrate,
+                max_queue_size = tx_queue_size
+            )
+
     # def __repr__(self):
     #     return "DIN"
 
@@ -36,7 +64,25 @@ class AdafruitDinMidiDevice:
         if isinstance(midi_message, _MIDIUnknownEvent):
             return
         
-        self.__midi.send(midi_message)
+        if self.transmitter:
+            self.transmitter.send(midi_message)
+        else:
+            self.__midi.send(midi_message)
 
     def receive(self):
-        return self.__midi.receive()
\ No newline at end of file
+        if self.parser:
+            return self.parser.receive(self.__uart)
+        
+        return self.__midi.receive()
+
+    # Reads raw bytes into the passed buffer, returns the number of bytes read (used by raw MIDI routings).
+    # Do not mix this with receive(), as the MIDI parser might hold some of the bytes already.
+    def read_raw(self, buffer):
+        return self.__uart.readinto(buffer)
+
+    # Writes the first num bytes of the buffer (used by raw MIDI routings)
+    def write_raw(self, buffer, num):
+        self.__uart.write(buffer, num)
+
+        if self.transmitter:
+            self.transmitter.written(num)
\ No newline at end of file
@@ -0,0 +1,142 @@
+from micropython import const
+from keypad import Keys as _Keys, Event as _Event
+from supervisor import ticks_ms as _ticks_ms
+
+from ...misc import get_current_millis
+
+# supervisor.ticks_ms() wraps around at 2^29
+_TICKS_MASK = const(0x1FFFFFFF)
+
+
+# Group of GPIO switches scanned in the background by the keypad module of CircuitPython. The keys are debounced
+# in hardware-timed scans, and every press/release is reported as timestamped event. Use the switch() method to get
+# the models for the single switches (see AdafruitKeypadSwitch), which are used like AdafruitSwitch:
+#
+#     _keys = AdafruitKeypad((board.GP1, board.GP25))
+#
+#     SWITCH_1 = { "model": _keys.switch(0), ... }
+#     SWITCH_2 = { "model": _keys.switch(1), ... }
+#
+# All switches of a device should be in one group: Checking an empty event queue is all that has to be done
+# in idle ticks, instead of reading every GPIO.
+class AdafruitKeypad:
+
+    # ports:            Tuple of board GPIO pin definitions (for example board.GP1)
+    # debounce_millis:  Scan interval. A switch must be stable for this time to be reported.
+    # max_events:       Size of the event queue. If the queue overflows, all switches are released and scanned again.
+    def __init__(self, ports, debounce_millis = 20, max_events = 64):
+        self.ports = ports
+        self.__debounce_millis = debounce_millis
+        self.__max_events = max_events
+
+        self.__keys = None
+        self.__event = None
+
+        # Per switch: Current state, and events not consumed yet (tuples (pressed, time))
+        self.__pressed = [False for p in ports]
+        self.__pending = [[] for p in ports]
+
+        # Number of event queue overflows
+        self.num_overflows = 0
+
+    # Returns the model for the switch with the passed index in the ports tuple
+    def switch(self, index):
+        return AdafruitKeypadSwitch(self, index)
+
+    # Starts scanning (called by all switches of the group, only the first call initializes)
+    def init(self):
+        if self.__keys:
+            return
+
+        self.__keys = _Keys(
+            self.ports,
+            value_when_pressed = False,     # Inverse logic!
+            pull = True,
+            interval = self.__debounce_millis / 1000,
+            max_events = self.__max_events
+        )
+
+        self.__event = _Event()
+
+    # Returns if the switch is currently pushed (state of the latest event)
+    def pushed(self, index):
+        self.poll()
+        return self.__pressed[index]
+
+    # Returns the next event for the switch as tuple (pressed, time), or None if there is none. The time is
+    # in milliseconds (like get_current_millis()).
+    def next_event(self, index):
+        pending = self.__pending[index]
+
+        if not pending:
+            self.poll()
+
+            if not pending:
+                return None
+
+        return pending.pop(0)
+
+    # Distributes the events of the hardware queue to the switches
+    def poll(self):
+        if not self.__keys:
+            return
+
+        events = self.__keys.events
+        if not events:
+            return
+
+        if events.overflowed:
+            self.__overflow()
+            return
+
+        # Convert the timestamps of the events to get_current_millis() time
+        now_ticks = _ticks_ms()
+        now = get_current_millis()
+
+        event = self.__event
+        while events.get_into(event):
+            index = event.key_number
+            pressed = event.pressed
+
+            self.__pressed[index] = pressed
+            self.__pending[index].append((pressed, now - ((now_ticks - event.timestamp) & _TICKS_MASK)))
+
+    # Events have been lost: Release all switches and let the keypad report the pushed ones again
+    def __overflow(self):
+        self.num_overflows += 1
+
+        now = get_current_millis()
+
+        for index in range(len(self.ports)):
+            self.__pending[index].clear()
+
+            if self.__pressed[index]:
+                self.__pressed[index] = False
+                self.__pending[index].append((False, now))
+
+        self.__keys.events.clear()
+        self.__keys.reset()
+
+
+###########################################################################################################################
+
+
+# Switch of an AdafruitKeypad. Besides the pushed property, this provides the events of the switch, which are used
+# by the SwitchController instead of polling.
+class AdafruitKeypadSwitch:
+
+    def __init__(self, keypad, index):
+        self.keypad = keypad
+        self.index = index
+
+    def init(self):
+        self.keypad.init()
+
+    # Return if the switch is currently pushed
+    @property
+    def pushed(self):
+        return self.keypad.pushed(self.index)
+
+    # Returns the next press/release event as tuple (pressed, time in milliseconds), or None
+    def next_event(self):
+        return self.keypad.next_event(self.index)
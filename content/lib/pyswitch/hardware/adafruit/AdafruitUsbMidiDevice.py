@@ -9,8 +9,13 @@ class AdafruitUsbMidiDevice:
                  in_buf_size,
                  in_channel = None,  # All
                  out_channel = 0,                 
+                 use_parser = False, # Use the PySwitch MidiParser for receiving instead of adafruit_midi
+                 sysex_size = 128    # Max. size of received SysEx messages when the MidiParser is used
         ):
 
+        self.__port_in = port_in
+        self.__port_out = port_out
+
         self.__midi = _MIDI(
             midi_out = port_out,
             out_channel = out_channel,
@@ -19,6 +24,17 @@ class AdafruitUsbMidiDevice:
             in_buf_size = in_buf_size
         )
 
+        # Optional incremental parser for receiving (the adafruit_midi instance is still used for sending)
+        self.parser = None
+        if use_parser:
+            from ...controller.midi_parser import MidiParser
+            
+            self.parser = MidiParser(
+                buffer_size = in_buf_size,
+                sysex_size = sysex_size,
+                in_channel = in_channel
+            )
+
     # def __repr__(self):
     #     return "USB"
 
@@ -29,4 +45,16 @@ class AdafruitUsbMidiDevice:
         self.__midi.send(midi_message)
 
     def receive(self):
-        return self.__midi.receive()
\ No newline at end of file
+        if self.parser:
+            return self.parser.receive(self.__port_in)
+        
+        return self.__midi.receive()
+
+    # Reads raw bytes into the passed buffer, returns the number of bytes read (used by raw MIDI routings).
+    # Do not mix this with receive(), as the MIDI parser might hold some of the bytes already.
+    def read_raw(self, buffer):
+        return self.__port_in.readinto(buffer, len(buffer))
+
+    # Writes the first num bytes of the buffer (used by raw MIDI routings)
+    def write_raw(self, buffer, num):
+        self.__port_out.write(buffer, num)
\ No newline at end of file
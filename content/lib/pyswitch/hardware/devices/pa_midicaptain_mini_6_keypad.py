@@ -0,0 +1,43 @@
+#################################################################################################################################
+# 
+# Addressing definitions for some known devices. This helps addressing the different hardware I/O. Only change this when either
+# one of the supported devices has been updated or new devices are added.
+#
+#################################################################################################################################
+ 
+import board as _board
+
+from ..adafruit.AdafruitKeypad import AdafruitKeypad as _AdafruitKeypad
+
+# PaintAudio MIDI Captain Mini (6 Switches)
+# Board Infos
+# Raspberry Pi Pico (RP2040)
+#
+# GP1  - FootSwitch 1
+# GP4  bat_chg_led
+# GP6  charging
+# GP7  NeoPixel
+# GP8  asyncio PWMOut frequency
+# GP9  - FootSwitch A
+# GP10 - FootSwitch B
+# GP11 - FootSwitch C
+# GP12 tft_dc   (SPI1 RX)
+# GP13 tft_cs   (Chip Select)
+# GP14 spi_clk  (SPI1SCK)
+# GP15 spi_mosi (SPI1 TX)
+# GP16 Midi GP16GP17 baudrate
+# GP17 Midi GP16GP17 baudrate
+# GP24 - FootSwitch 3
+# GP25 - FootSwitch 2
+
+# Same definitions as the non-keypad variant, but all switches are scanned in the background by the keypad module 
+# (see AdafruitKeypad), which debounces them and reports press/release events with timestamps. Use this by 
+# importing this module instead of the non-keypad one in inputs.py.
+_KEYS = _AdafruitKeypad((_board.GP1, _board.GP25, _board.GP24, _board.GP9, _board.GP10, _board.GP11))
+
+PA_MIDICAPTAIN_MINI_SWITCH_1 = { "model": _KEYS.switch(0), "pixels": (0, 1, 2), "name": "1", "strobeOrder": 0 }
+PA_MIDICAPTAIN_MINI_SWITCH_2 = { "model": _KEYS.switch(1), "pixels": (3, 4, 5), "name": "2", "strobeOrder": 1 }
+PA_MIDICAPTAIN_MINI_SWITCH_3 = { "model": _KEYS.switch(2), "pixels": (6, 7, 8), "name": "3", "strobeOrder": 2 }
+PA_MIDICAPTAIN_MINI_SWITCH_A = { "model": _KEYS.switch(3), "pixels": (9, 11, 10), "name": "A", "strobeOrder": 5 }
+PA_MIDICAPTAIN_MINI_SWITCH_B = { "model": _KEYS.switch(4), "pixels": (12, 14, 13), "name": "B", "strobeOrder": 4 }
+PA_MIDICAPTAIN_MINI_SWITCH_C = { "model": _KEYS.switch(5), "pixels": (15, 17, 16), "name": "C", "strobeOrder": 3 }
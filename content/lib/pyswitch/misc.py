@@ -18,6 +18,24 @@ def do_print(msg):  # pragma: no cover
 # Returns a current timestmap in integer milliseconds
 def get_current_millis():
     return int(monotonic() * 1000)
+
+# Millisecond tick counter for time measurements in the processing loop. On CircuitPython, this is supervisor.ticks_ms(),
+# which stays in the small int range and thus does not allocate memory. The counter wraps around at 2^29, so always 
+# use ticks_diff() to compare values.
+_TICKS_PERIOD = 0x20000000
+_TICKS_MASK = 0x1FFFFFFF
+_TICKS_HALF_PERIOD = 0x10000000
+
+try:
+    from supervisor import ticks_ms as get_ticks_ms
+except ImportError:
+    def get_ticks_ms():
+        return get_current_millis() & _TICKS_MASK
+
+# Returns the difference a - b of two values of get_ticks_ms() (milliseconds, negative if b is later)
+def ticks_diff(a, b):
+    diff = (a - b) & _TICKS_MASK
+    return diff - _TICKS_PERIOD if diff >= _TICKS_HALF_PERIOD else diff
     
 # # Returns a readable string with the current timestamp (local time)
 # def formatted_timestamp():
@@ -48,6 +66,9 @@ def fill_up_to(str, num_spaces_at_right, fill_char = " "):
 
 # Base class for everything that needs to be updated regularily
 class Updateable:
+    # Estimated costs of update() in milliseconds (maintained by the Controller, see there)
+    update_cost = 0
+
     def update(self):
         pass   # pragma: no cover
 
@@ -111,9 +132,9 @@ class PeriodCounter:
 
         self.__last_reset = 0
 
-    # Resets the period counter to the current time
-    def reset(self):
-        self.__last_reset = get_current_millis()
+    # Resets the period counter to the current time, or to the passed time (milliseconds, see get_current_millis())
+    def reset(self, time = None):
+        self.__last_reset = time if time != None else get_current_millis()
 
     # Returns the amount of milliseconds passed since the last reset
     @property
@@ -129,4 +150,12 @@ class PeriodCounter:
             self.__last_reset = current_time
             return True
         return False
+
+    # Returns if the period has been exceeded at the passed time (milliseconds, see get_current_millis()). 
+    # If yes, it also resets the period to that time.
+    def exceeded_at(self, time):
+        if self.__last_reset + self.interval < time:
+            self.__last_reset = time
+            return True
+        return False
             
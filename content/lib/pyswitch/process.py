@@ -24,27 +24,41 @@ from config import Config as _Config
 
 if not _get_option(_Config, "exploreMode"):
     # Normal operation
-    from pyswitch.controller.controller import Controller as _Controller
+    if _get_option(_Config, "asyncController"):
+        from pyswitch.controller.async_controller import AsyncController as _Controller
+    else:
+        from pyswitch.controller.controller import Controller as _Controller
+
     from pyswitch.controller.midi import MidiController as _MidiController
     from pyswitch.ui.UiController import UiController as _UiController
 
     # Load communication configuration
     from communication import Communication as _Communication  
 
-    # Optional Wrapper to include the PyMidiBridge for transfering files.
-    # Disable this to save memory.
+    _midi = _MidiController(
+        routings = _Communication["midi"]["routings"],
+        config = _Communication["midi"]
+    )
+
+    # Optional recorder for all MIDI traffic of the application (for replaying it later, see MidiRecorder)
+    if _get_option(_Communication["midi"], "recordFile"):
+        from pyswitch.controller.midi_recorder import MidiRecorder as _MidiRecorder
+
+        _midi = _MidiRecorder(
+            midi = _midi,
+            file_path = _Communication["midi"]["recordFile"]
+        )
+
+    # Optional Wrapper to include the PyMidiBridge for transfering files. Only bridge messages are passed
+    # to the bridge, which is loaded on the first one.
     if _get_option(_Config, "enableMidiBridge"):
-        from pymidibridge.MidiBridgeWrapper import MidiBridgeWrapper as _MidiBridgeWrapper
+        from pyswitch.controller.midi_bridge import MidiBridgeWrapper as _MidiBridgeWrapper
 
         _midi = _MidiBridgeWrapper(
-            midi = _MidiController(
-                routings = _Communication["midi"]["routings"]
-            ),
-            temp_file_path = '/.bridge_tmp'
-        )
-    else:
-        _midi = _MidiController(
-            routings = _Communication["midi"]["routings"]
+            midi = _midi,
+            temp_file_path = '/.bridge_tmp',
+            max_chunk_size = _get_option(_Config, "midiBridgeChunkSize", 65),
+            window_size = _get_option(_Config, "midiBridgeWindowSize", 4)
         )
 
     try:
@@ -70,8 +84,12 @@ if not _get_option(_Config, "exploreMode"):
         _controller.init()
 
         # Start processing loop (done here to keep the call stack short)
-        while _controller.tick():
-            pass
+        if _get_option(_Config, "asyncController"):
+            import asyncio as _asyncio
+            _asyncio.run(_controller.run())
+        else:
+            while _controller.tick():
+                pass
 
     except Exception as e:
         if _get_option(_Config, "enableMidiBridge"):
@@ -64,6 +64,9 @@ class DisplayLabel(DisplayElement):
         self.__label = None
 
         self.override_text = None
+
+        # Set while the label is waiting for the flush stage of the controller (see Controller.mark_dirty())
+        self.dirty = False
         
     def update_label(self):
         if self.override_text:
@@ -71,6 +74,10 @@ class DisplayLabel(DisplayElement):
         elif self.callback:
             self.callback.update_label(self)
 
+    # Called by the controller in the flush stage when the label has been marked dirty
+    def update_displays(self):
+        self.update_label()
+
     # Adds the slot to the splash
     def init(self, ui, appl):
         self.__ui = ui
@@ -83,10 +90,10 @@ class DisplayLabel(DisplayElement):
 
             class _CallbackMappingListener:
                 def parameter_changed(self, mapping):
-                    that.update_label()
+                    appl.mark_dirty(that)
 
                 def request_terminated(self, mapping):
-                    that.update_label()
+                    appl.mark_dirty(that)
 
             self.callback.init(appl, _CallbackMappingListener())
 
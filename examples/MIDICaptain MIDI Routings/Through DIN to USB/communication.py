@@ -34,7 +34,10 @@ Communication = {
     # the MidiController.PYSWITCH source/target or the application will not be able to communicate!
     "midi": {
         "routings": [
-            # MIDI Through from DIN to USB
+            # MIDI Through from DIN to USB. Raw routings ("raw = True", which forward the bytes without decoding 
+            # them and can filter and remap messages, see MidiRouteFilter in pyswitch.controller.midi) are not 
+            # possible here, because the application also sends to USB: Use them only for targets the application 
+            # does not send to.
             MidiRouting(
                 source = _DIN_MIDI,
                 target = _USB_MIDI
@@ -0,0 +1,169 @@
+#################################################################################################################################
+#
+# Benchmark: Classic tick loop (Controller) vs. asyncio tasks (AsyncController). Run from the project root (see 
+# test/compose.yaml):
+#
+#     python -m test.benchmark.bench_async_controller
+#
+# A switch is pushed at random times, the latency is the time until the next scan of the inputs. The CPU usage is the
+# process time divided by the wall time (the classic loop never sleeps, so it always uses the whole CPU). The loaded 
+# scenario adds a display with expensive elements and a stream of incoming MIDI messages. Times are host times, so only 
+# the ratios are meaningful for the controller.
+#
+#################################################################################################################################
+
+import sys
+import asyncio
+from random import Random
+from time import perf_counter, process_time
+from unittest.mock import patch
+
+from ..pyswitch.mocks_lib import *
+
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.control_change import ControlChange
+    from lib.pyswitch.controller.controller import Controller
+    from lib.pyswitch.controller.async_controller import AsyncController
+    from lib.pyswitch.misc import Updateable, Updater
+
+    from ..pyswitch.mocks_appl import MockNeoPixelDriver
+
+
+# Duration of every run (seconds)
+_DURATION = 2
+
+# Mean time between two switch pushes (seconds)
+_PUSH_INTERVAL = 0.05
+
+
+# MIDI source delivering messages at a fixed rate (messages per second)
+class _Midi:
+    def __init__(self, rate):
+        self.rate = rate
+        self.start = perf_counter()
+        self.num_received = 0
+        self.message = ControlChange(1, 1)
+
+    def send(self, midi_message):
+        pass
+
+    def receive(self):
+        if not self.rate or self.num_received >= (perf_counter() - self.start) * self.rate:
+            return None
+
+        self.num_received += 1
+        return self.message
+
+
+# Input simulating a switch pushed at random times. The latency is measured when the next scan detects the push.
+class _Input:
+    def __init__(self):
+        self.random = Random(1)
+        self.latencies = []
+        self.next_push = perf_counter() + self.random.random() * _PUSH_INTERVAL * 2
+
+    def process(self):
+        now = perf_counter()
+
+        if now >= self.next_push:
+            self.latencies.append(now - self.next_push)
+            self.next_push = now + self.random.random() * _PUSH_INTERVAL * 2
+
+
+# Display element keeping the CPU busy for some time when updated
+class _Element(Updateable):
+    def __init__(self, cost_seconds):
+        self.cost_seconds = cost_seconds
+
+    def update(self):
+        end = perf_counter() + self.cost_seconds
+        while perf_counter() < end:
+            pass
+
+
+class _Ui(Updater, Updateable):
+    def __init__(self):
+        Updater.__init__(self)
+
+
+def _create(cls, midi_rate, num_elements, tasks = {}):
+    appl = cls(
+        led_driver = MockNeoPixelDriver(),
+        midi = _Midi(midi_rate),
+        config = {
+            "updateInterval": 100,
+            "asyncTasks": tasks
+        }
+    )
+
+    ui = _Ui()
+    for i in range(num_elements):
+        ui.add_updateable(_Element(0.001))
+
+    appl.ui = ui
+    appl.add_updateable(ui)
+
+    input = _Input()
+    appl.inputs = [input]
+
+    return (appl, input)
+
+
+def _print(name, input, cpu, wall):
+    latencies = input.latencies
+    avg = sum(latencies) / len(latencies)
+
+    print(f"{ name.ljust(40, '.') }: Latency avg { round(avg * 1000, 2) }ms, max { round(max(latencies) * 1000, 2) }ms, CPU { round(cpu / wall * 100) }%")
+
+
+def _run_classic(name, midi_rate, num_elements):
+    appl, input = _create(Controller, midi_rate, num_elements)
+
+    start = perf_counter()
+    start_cpu = process_time()
+
+    while perf_counter() - start < _DURATION:
+        appl.tick()
+
+    _print(name, input, process_time() - start_cpu, perf_counter() - start)
+
+
+def _run_async(name, midi_rate, num_elements, tasks = {}):
+    appl, input = _create(AsyncController, midi_rate, num_elements, tasks)
+
+    async def stop():
+        await asyncio.sleep(_DURATION)
+        appl.stop()
+
+    async def main():
+        await asyncio.gather(appl.run(), stop())
+
+    start = perf_counter()
+    start_cpu = process_time()
+
+    asyncio.run(main())
+
+    _print(name, input, process_time() - start_cpu, perf_counter() - start)
+
+
+def run():
+    print("Idle (no MIDI, no display):")
+    _run_classic("Classic loop", 0, 0)
+    _run_async("AsyncController", 0, 0)
+    _run_async("AsyncController, inputs every 1ms", 0, 0, { "inputs": { "interval": 1 } })
+
+    print("Loaded (1000 MIDI messages/s, 20 display elements of 1ms):")
+    _run_classic("Classic loop", 1000, 20)
+    _run_async("AsyncController", 1000, 20)
+    _run_async("AsyncController, inputs every 1ms", 1000, 20, { "inputs": { "interval": 1 } })
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,68 @@
+#################################################################################################################################
+# 
+# Benchmark: Parsing of incoming messages by ClientParameterMapping.parse_against() vs. precompiled ClientResponseMatcher
+# instances (option "compileResponseMatchers"). Run from the project root (see test/compose.yaml):
+#
+#     python -m test.benchmark.bench_client_matchers
+#
+# Note that on CPython, slice comparisons run in C so the throughput numbers favour parse_against(): The compiled
+# matchers are about as fast or somewhat slower here. On the device, the allocated bytes are the relevant figure as 
+# every allocation adds to garbage collection pauses: parse_against() allocates the slices it compares (~43 bytes per 
+# call on CPython), the compiled matchers allocate nothing (string matches only when a new string has to be cached).
+#
+#################################################################################################################################
+
+import sys
+from unittest.mock import patch
+
+from ..pyswitch.mocks_lib import *
+from .tools import benchmark
+
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from lib.pyswitch.controller.client import ClientParameterMapping
+
+
+def _sysex(data):
+    # The adafruit_midi library delivers bytes
+    return SystemExclusive(
+        manufacturer_id = bytes([0x00, 0x20, 0x33]),
+        data = bytes(data)
+    )
+
+def run():
+    mapping_numeric = ClientParameterMapping.get(
+        name = "Benchmark Numeric",
+        response = _sysex([0x00, 0x00, 0x01, 0x00, 0x32, 0x03])
+    )
+
+    mapping_string = ClientParameterMapping.get(
+        name = "Benchmark String",
+        response = _sysex([0x00, 0x00, 0x03, 0x00, 0x00, 0x01]),
+        type = ClientParameterMapping.PARAMETER_TYPE_STRING
+    )
+
+    msg_numeric = _sysex([0x00, 0x00, 0x01, 0x00, 0x32, 0x03, 0x00, 0x01])
+    msg_string = _sysex([0x00, 0x00, 0x03, 0x00, 0x00, 0x01] + [ord(c) for c in "Some Rig Name"] + [0x00])
+    msg_other = _sysex([0x00, 0x00, 0x01, 0x00, 0x33, 0x03, 0x00, 0x01])
+
+    for compiled in [False, True]:
+        if compiled:
+            mapping_numeric.compile()
+            mapping_string.compile()
+
+        prefix = "Compiled" if compiled else "parse_against"
+
+        benchmark(f"{ prefix }: Numeric match", lambda: mapping_numeric.parse(msg_numeric))
+        benchmark(f"{ prefix }: String match", lambda: mapping_string.parse(msg_string))
+        benchmark(f"{ prefix }: No match", lambda: mapping_numeric.parse(msg_other))
+
+
+run()
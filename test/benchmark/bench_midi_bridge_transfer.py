@@ -0,0 +1,226 @@
+#################################################################################################################################
+#
+# Benchmark: File transfer throughput over the MIDI bridge, in a simulated loopback connection (virtual time). Run from the
+# project root (see test/compose.yaml):
+#
+#     python -m test.benchmark.bench_midi_bridge_transfer
+#
+# A sender (port of MidiBridgeWindowedTransfer.js) transfers a file to the WindowedTransferReceiver. The connection has a
+# fixed latency and byte rate per direction, and the device only processes incoming messages once per processing loop
+# tick. The PyMidiBridge mode (stop and wait with 65 byte chunks) is simulated with a window size of one and the same chunk
+# size, as PyMidiBridge is only available compiled for CircuitPython. Its messages have the same layout.
+#
+#################################################################################################################################
+
+import sys
+from os import remove, path
+from random import Random
+from tempfile import mkdtemp
+from time import perf_counter
+from unittest.mock import patch
+
+from ..pyswitch.mocks_lib import *
+
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "gc": MockGC()
+}):
+    from lib.pyswitch.controller.midi_bridge_transfer import *
+    from lib.pyswitch.controller.midi_bridge_transfer import _pack, _number_to_bytes, _bytes_to_number, _crc16_update, _crc16_final, _get_checksum
+
+
+_LATENCY_MILLIS = 2          # One-way latency of the connection (host MIDI stack and USB)
+_BYTES_PER_MILLI = 40        # Throughput of the connection per direction
+_TICK_MILLIS = 10            # Processing loop tick time of the device (messages are received once per tick)
+_TIMEOUT_MILLIS = 1000       # Sender timeout (see MidiBridgeWindowedTransfer.js)
+
+_FILE_SIZE = 8000            # Size of the file (about the size of a larger inputs.py)
+
+
+# One direction of the simulated connection
+class _Link:
+    def __init__(self, loss = 0, seed = 1):
+        self.queue = []             # (arrival time, data)
+        self.free_at = 0            # Time when the connection is free for the next message
+        self.loss = loss
+        self.random = Random(seed)
+        self.num_bytes = 0
+
+    def send(self, now, data):
+        size = len(data) + 5        # SysEx framing and manufacturer ID
+        self.num_bytes += size
+
+        start = max(now, self.free_at)
+        self.free_at = start + size / _BYTES_PER_MILLI
+
+        if self.loss and self.random.random() < self.loss:
+            return
+
+        self.queue.append((self.free_at + _LATENCY_MILLIS, data))
+
+    def receive(self, now):
+        ret = [m[1] for m in self.queue if m[0] <= now]
+        self.queue = [m for m in self.queue if m[0] > now]
+        return ret
+
+
+# Sender (port of MidiBridgeWindowedTransfer.js)
+class _Sender:
+    def __init__(self, link, content, chunk_size):
+        self.link = link
+        self.content = content
+        self.chunk_size = chunk_size
+        self.id = _number_to_bytes(0x123456)
+        self.file_crc = _crc16_final(_crc16_update(0xFFFF, content))
+
+        self.started = False
+        self.finished = False
+        self.error = None
+        self.num_chunks = 0
+        self.window_size = 1
+        self.base = 0
+        self.next = 0
+        self.rewound_at = -1
+        self.timeout_at = 0
+        self.num_sent = 0
+
+    def start(self, now):
+        self.__send(now, WINDOWED_START, self.id + _number_to_bytes(self.chunk_size) + _number_to_bytes(len(self.content)) + _pack(self.file_crc.to_bytes(2, "big")) + _pack(b"file.py"))
+        self.timeout_at = now + _TIMEOUT_MILLIS
+
+    def receive(self, now, data):
+        if _get_checksum(data, 4) != _bytes_to_number(data, 1, 3):
+            return
+
+        if data[0] == WINDOWED_ERROR:
+            self.error = data
+            return
+
+        next_chunk = _bytes_to_number(data, 8, 4)
+
+        if not self.started:
+            self.started = True
+            self.chunk_size = _bytes_to_number(data, 12, 4)
+            self.window_size = _bytes_to_number(data, 16, 4)
+            self.num_chunks = (len(self.content) + self.chunk_size - 1) // self.chunk_size
+            self.base = self.next = next_chunk
+
+        elif next_chunk > self.base:
+            self.base = next_chunk
+            self.next = max(self.next, self.base)
+
+        elif next_chunk == self.base and self.next > self.base and self.rewound_at != self.base:
+            self.rewound_at = self.base
+            self.next = self.base
+
+        if self.base >= self.num_chunks:
+            self.finished = True
+            return
+
+        self.__fill(now)
+
+    def check_timeout(self, now):
+        if now < self.timeout_at:
+            return
+
+        if not self.started:
+            self.start(now)
+        else:
+            self.next = self.base
+            self.__fill(now)
+
+    def __fill(self, now):
+        self.timeout_at = now + _TIMEOUT_MILLIS
+
+        while self.next < self.num_chunks and self.next < self.base + self.window_size:
+            chunk = self.content[self.next * self.chunk_size:(self.next + 1) * self.chunk_size]
+            self.__send(now, WINDOWED_DATA, self.id + _number_to_bytes(self.next) + _pack(chunk))
+            self.next += 1
+
+    def __send(self, now, command, payload):
+        self.num_sent += 1
+        self.link.send(now, bytes([command]) + _pack(_crc16_final(_crc16_update(0xFFFF, payload)).to_bytes(2, "big")) + payload)
+
+
+# Runs a transfer and returns the results
+def _transfer(folder, chunk_size, window_size, loss = 0):
+    content = bytes(Random(1).randrange(32, 127) for i in range(_FILE_SIZE))
+
+    to_device = _Link(loss)
+    to_host = _Link()
+
+    receiver = WindowedTransferReceiver(
+        send = lambda manufacturer_id, data: to_host.send(now, data),
+        manufacturer_id = [0x00, 0x7c, 0x7d],
+        temp_file_path = path.join(folder, "tmp"),
+        max_chunk_size = chunk_size,
+        window_size = window_size
+    )
+
+    sender = _Sender(to_device, content, chunk_size)
+
+    now = 0
+    sender.start(now)
+
+    device_seconds = 0
+    while not sender.finished and not sender.error and now < 600000:
+        # Host: Process acks as soon as they arrive
+        for data in to_host.receive(now):
+            sender.receive(now, data)
+
+        sender.check_timeout(now)
+
+        # Device: Process all messages arrived once per tick
+        if now % _TICK_MILLIS == 0:
+            start = perf_counter()
+            for data in to_device.receive(now):
+                receiver.receive(data)
+            device_seconds += perf_counter() - start
+
+        now += 1
+
+    with open("file.py", "rb") as f:
+        ok = f.read() == content
+
+    remove("file.py")
+
+    return {
+        "millis": now,
+        "ok": ok,
+        "messages": sender.num_sent,
+        "bytes_sent": to_device.num_bytes,
+        "rejected": receiver.num_rejected,
+        "device_seconds": device_seconds
+    }
+
+
+def _print(name, result):
+    bytes_per_second = int(_FILE_SIZE * 1000 / result["millis"])
+    overhead = round(result["bytes_sent"] / _FILE_SIZE, 2)
+    device = round(result["device_seconds"] * 1000000 / _FILE_SIZE, 2)
+
+    print(f"{ name.ljust(50, '.') }: { bytes_per_second } bytes/s, { result['messages'] } messages ({ result['rejected'] } rejected), { overhead } bytes on the wire per byte, { device }us host CPU per byte{ '' if result['ok'] else ', FILE CORRUPTED' }")
+
+
+def run():
+    from os import chdir, getcwd
+
+    folder = mkdtemp()
+    cwd = getcwd()
+    chdir(folder)
+
+    try:
+        print(f"File: { _FILE_SIZE } bytes, latency { _LATENCY_MILLIS }ms, { _BYTES_PER_MILLI } bytes/ms, device tick { _TICK_MILLIS }ms:")
+
+        _print("PyMidiBridge mode (65 bytes, stop and wait)", _transfer(folder, 65, 1))
+        _print("Windowed, 65 bytes, window 4", _transfer(folder, 65, 4))
+        _print("Windowed, 240 bytes, window 4", _transfer(folder, 240, 4))
+        _print("Windowed, 240 bytes, window 8", _transfer(folder, 240, 8))
+        _print("Windowed, 240 bytes, window 8, 10% loss", _transfer(folder, 240, 8, loss = 0.1))
+
+    finally:
+        chdir(cwd)
+
+
+if __name__ == "__main__":
+    run()
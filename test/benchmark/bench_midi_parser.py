@@ -0,0 +1,94 @@
+#################################################################################################################################
+# 
+# Benchmark: Receiving MIDI messages with adafruit_midi.MIDI.receive() vs. the incremental MidiParser (option "use_parser"
+# of the MIDI devices). Run from the project root (see test/compose.yaml):
+#
+#     python -m test.benchmark.bench_midi_parser
+#
+# This needs the adafruit_midi library to be installed (pip install adafruit-circuitpython-midi), as the original 
+# receive path is measured with it. The input is a mix of CC, PC, clock, note and SysEx messages (with running status),
+# delivered in chunks like a MIDI port does.
+#
+#################################################################################################################################
+
+import sys
+from unittest.mock import patch
+
+from ..pyswitch.mocks_lib import *
+from .tools import benchmark
+
+try:
+    import adafruit_midi
+except ImportError:
+    print("adafruit_midi is not installed, skipping benchmark")
+    sys.exit(0)
+
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "gc": MockGC()
+}):
+    from lib.pyswitch.controller.midi_parser import MidiParser
+
+
+# Input stream for one iteration: CC, CC (running status), clock, PC, note on, Kemper SysEx response, CC.
+# adafruit_midi parses all of them, the parser only emits the kinds accepted by default (CC, PC, SysEx).
+_STREAM = bytes(
+    [0xb0, 0x07, 0x40, 0x08, 0x41] +
+    [0xf8] +
+    [0xc0, 0x05] +
+    [0x90, 0x40, 0x7f] +
+    [0xf0, 0x00, 0x20, 0x33, 0x02, 0x7f, 0x01, 0x00, 0x04, 0x01, 0x00, 0x00, 0xf7] +
+    [0xb1, 0x10, 0x7f]
+)
+
+
+# Port delivering the stream in chunks of the requested size (supports read() for adafruit_midi and readinto() for the parser)
+class _Port:
+    def __init__(self):
+        self.pos = len(_STREAM)
+
+    def rewind(self):
+        self.pos = 0
+
+    def done(self):
+        return self.pos >= len(_STREAM)
+
+    def read(self, num):
+        data = _STREAM[self.pos:self.pos + num]
+        self.pos += len(data)
+        return data
+
+    def readinto(self, buffer):
+        num = min(len(buffer), len(_STREAM) - self.pos)
+        buffer[:num] = _STREAM[self.pos:self.pos + num]
+        self.pos += num
+        return num
+
+
+def run():
+    port_adafruit = _Port()
+    midi = adafruit_midi.MIDI(midi_in = port_adafruit, in_buf_size = 100)
+
+    def receive_adafruit():
+        port_adafruit.rewind()
+        while midi.receive() or not port_adafruit.done():
+            pass
+        
+    port_parser = _Port()
+    parser = MidiParser(buffer_size = 100)
+
+    def receive_parser():
+        port_parser.rewind()
+        while parser.receive(port_parser) or not port_parser.done():
+            pass
+
+    print(f"{ len(_STREAM) } bytes per call:")
+    
+    benchmark("adafruit_midi.MIDI.receive()", receive_adafruit)
+    benchmark("MidiParser.receive()", receive_parser)
+
+    print(f"Parser: { parser.num_messages } messages emitted, { parser.num_skipped } skipped")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,167 @@
+#################################################################################################################################
+#
+# Benchmark: Replays a recorded MIDI session (see MidiRecorder) against a Controller running the Kemper bidirectional
+# protocol, with the tuner and rig name mappings registered. Run from the project root (see test/compose.yaml):
+#
+#     python -m test.benchmark.bench_replay [recording file]
+#
+# Without a file, a Kemper-like session is synthesized and recorded first: Sensing messages every 500ms, a rig change
+# with rig name and date responses, and a tuner flood (note and deviance every 10ms) for three seconds.
+#
+#################################################################################################################################
+
+import sys
+from os import remove
+from tempfile import mkstemp
+from unittest.mock import patch
+
+from ..pyswitch.mocks_lib import *
+from .replay import MidiReplay, VirtualClock
+
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "displayio": MockDisplayIO(),
+    "adafruit_display_text": MockAdafruitDisplayText(),
+    "adafruit_display_shapes.rect": MockDisplayShapes().rect(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from lib.pyswitch.misc import get_current_millis
+    from lib.pyswitch.controller.controller import Controller
+    from lib.pyswitch.controller.midi_recorder import MidiRecorder, read_recording
+    from lib.pyswitch.clients.kemper import KemperMappings, KemperBidirectionalProtocol
+
+    from ..pyswitch.mocks_appl import MockNeoPixelDriver, MockSwitch
+
+
+# Duration of the synthesized session (milliseconds)
+_SESSION_MILLIS = 10000
+
+
+# Returns the response of the mapping with the passed value bytes appended
+def _response(mapping, value):
+    return SystemExclusive(mapping.response.manufacturer_id, mapping.response.data + value)
+
+
+# Incoming messages of the synthesized session, as list of tuples (time, message)
+def _session():
+    sense = KemperMappings.BIDIRECTIONAL_SENSING()
+    note = KemperMappings.TUNER_NOTE()
+    deviance = KemperMappings.TUNER_DEVIANCE()
+    rig_name = KemperMappings.RIG_NAME()
+    rig_date = KemperMappings.RIG_DATE()
+
+    ret = []
+
+    for time in range(0, _SESSION_MILLIS, 500):
+        ret.append((time, _response(sense, [0x00, 0x00])))
+
+    ret.append((1000, _response(rig_date, list(b"2024-01-01") + [0x00])))
+    ret.append((1002, _response(rig_name, list(b"Some Rig") + [0x00])))
+
+    for time in range(2000, 5000, 10):
+        ret.append((time, _response(note, [0x00, 40 + (time // 500) % 12])))
+        ret.append((time + 1, _response(deviance, [(time // 10) % 0x80, 0x00])))
+
+    ret.sort(key = lambda e: e[0])
+    return ret
+
+
+# Source for the recorder, delivering the session messages when they are due
+class _SessionSource:
+    def __init__(self, clock, messages):
+        self.clock = clock
+        self.messages = messages
+        self.pos = 0
+
+    def send(self, midi_message):
+        pass
+
+    def receive(self):
+        if self.pos < len(self.messages) and self.messages[self.pos][0] <= self.clock.millis:
+            self.pos += 1
+            return self.messages[self.pos - 1][1]
+
+        return None
+
+
+# Records the synthesized session to a temporary file and returns the file contents
+def _record_session():
+    fd, path = mkstemp()
+
+    try:
+        clock = VirtualClock(get_current_millis)
+        with clock:
+            source = _SessionSource(clock, _session())
+            recorder = MidiRecorder(source, path)
+
+            while clock.millis < _SESSION_MILLIS:
+                while recorder.receive():
+                    pass
+
+                clock.advance(1)
+
+            recorder.flush()
+
+        with open(path, "rb") as f:
+            return f.read()
+
+    finally:
+        remove(path)
+
+
+class _Listener:
+    def __init__(self):
+        self.num_changes = 0
+
+    def parameter_changed(self, mapping):
+        self.num_changes += 1
+
+    def request_terminated(self, mapping):
+        pass
+
+
+def run():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            data = f.read()
+    else:
+        data = _record_session()
+
+    events = read_recording(data)
+    print(f"Recording: { len(data) } bytes, { len(events) } events")
+
+    replay = MidiReplay(events, VirtualClock(get_current_millis))
+    listener = _Listener()
+
+    with replay.clock:
+        appl = Controller(
+            led_driver = MockNeoPixelDriver(),
+            midi = replay,
+            protocol = KemperBidirectionalProtocol(time_lease_seconds = 30),
+            inputs = [
+                {
+                    "assignment": {
+                        "model": MockSwitch()
+                    }
+                }
+            ]
+        )
+
+        for mapping in [KemperMappings.TUNER_NOTE(), KemperMappings.TUNER_DEVIANCE(), KemperMappings.RIG_NAME()]:
+            appl.client.register(mapping, listener)
+
+        appl.init()
+
+        result = replay.run(appl, trailing_millis = 100)
+
+    result.print()
+    print(f"    Parameter changes: { listener.num_changes }")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,130 @@
+#################################################################################################################################
+#
+# Benchmark: Time between two input scans of the Controller while a burst of MIDI messages comes in. Run from the
+# project root (see test/compose.yaml):
+#
+#     python -m test.benchmark.bench_tick_budget
+#
+# A burst of rig name responses (Kemper bidirectional protocol) is waiting in the MIDI buffer. The time between two
+# scans of the switch is the worst case latency between pushing the switch and sending its MIDI message. Without a
+# budget (emulated by a very large one) all messages are parsed in one tick, with a budget the burst is spread over
+# several ticks. Times are host times, so only the ratios are meaningful for the controller.
+#
+#################################################################################################################################
+
+import sys
+from time import perf_counter
+from unittest.mock import patch
+
+from ..pyswitch.mocks_lib import *
+
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "displayio": MockDisplayIO(),
+    "adafruit_display_text": MockAdafruitDisplayText(),
+    "adafruit_display_shapes.rect": MockDisplayShapes().rect(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from lib.pyswitch.controller.controller import Controller
+    from lib.pyswitch.clients.kemper import KemperMappings, KemperBidirectionalProtocol
+
+    from ..pyswitch.mocks_appl import MockNeoPixelDriver, MockPeriodCounter
+
+
+# Number of messages in the burst
+_BURST_SIZE = 3000
+
+
+# MIDI source delivering the burst
+class _Burst:
+    def __init__(self):
+        mapping = KemperMappings.RIG_NAME()
+        self.message = SystemExclusive(mapping.response.manufacturer_id, mapping.response.data + list(b"Some very long rig name") + [0x00])
+        self.remaining = 0
+
+    def send(self, midi_message):
+        pass
+
+    def receive(self):
+        if not self.remaining:
+            return None
+
+        self.remaining -= 1
+        return self.message
+
+
+# Input recording the max. time between two scans
+class _Input:
+    def __init__(self):
+        self.last = 0
+        self.max_interval = 0
+
+    def process(self):
+        now = perf_counter()
+
+        if self.last and now - self.last > self.max_interval:
+            self.max_interval = now - self.last
+
+        self.last = now
+
+
+class _Listener:
+    def parameter_changed(self, mapping):
+        pass
+
+    def request_terminated(self, mapping):
+        pass
+
+
+def _run(name, budget_millis):
+    midi = _Burst()
+
+    appl = Controller(
+        led_driver = MockNeoPixelDriver(),
+        midi = midi,
+        protocol = KemperBidirectionalProtocol(time_lease_seconds = 30),
+        period_counter = MockPeriodCounter(),
+        config = {
+            "tickBudgetMillis": budget_millis
+        }
+    )
+
+    appl.client.register(KemperMappings.RIG_NAME(), _Listener())
+    appl.init()
+
+    input = _Input()
+    appl.inputs = [input]
+
+    midi.remaining = _BURST_SIZE
+
+    ticks = 0
+    start = perf_counter()
+
+    while midi.remaining:
+        appl.tick()
+        ticks += 1
+
+    # One more tick to see the scan after the last message
+    appl.tick()
+
+    duration = perf_counter() - start
+
+    print(f"{ name.ljust(50, '.') }: Max. { round(input.max_interval * 1000, 2) }ms between scans, { ticks } ticks, { round(duration * 1000, 1) }ms overall, MIDI overruns: { appl.scheduler.overruns[1] }")
+
+
+def run():
+    print(f"Burst of { _BURST_SIZE } rig name messages:")
+
+    _run("No budget", 1000000)
+    _run("Budget 15ms (default)", 15)
+    _run("Budget 5ms", 5)
+    _run("Budget 1ms", 1)
+
+
+if __name__ == "__main__":
+    run()
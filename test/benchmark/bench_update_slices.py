@@ -0,0 +1,96 @@
+#################################################################################################################################
+#
+# Benchmark: Max. tick time of the Controller with many Updateables, with and without spreading the updates over 
+# several ticks. Run from the project root (see test/compose.yaml):
+#
+#     python -m test.benchmark.bench_update_slices
+#
+# The Updateables simulate a large configuration: Many cheap ones (callbacks, actions) and some expensive ones
+# (display labels being redrawn). The update period passes every 20 ticks. Without spreading (emulated by a very 
+# large tick budget), all Updateables run in the tick in which the period passes.
+#
+#################################################################################################################################
+
+import sys
+from time import perf_counter
+from unittest.mock import patch
+
+from ..pyswitch.mocks_lib import *
+
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from lib.pyswitch.controller.controller import Controller
+    from lib.pyswitch.misc import Updateable
+
+    from ..pyswitch.mocks_appl import MockNeoPixelDriver, MockMidiController, MockPeriodCounter
+
+
+_NUM_TICKS = 2000
+_PERIOD_TICKS = 20
+
+
+# Updateable taking the given time (microseconds)
+class _Updateable(Updateable):
+    def __init__(self, cost_micros):
+        self.cost = cost_micros / 1000000
+
+    def update(self):
+        end = perf_counter() + self.cost
+        while perf_counter() < end:
+            pass
+
+
+def _run(name, config):
+    period = MockPeriodCounter()
+
+    appl = Controller(
+        led_driver = MockNeoPixelDriver(),
+        midi = MockMidiController(),
+        period_counter = period,
+        config = config
+    )
+
+    for i in range(40):
+        appl.add_updateable(_Updateable(50))
+
+    for i in range(6):
+        appl.add_updateable(_Updateable(1500))
+
+    appl.init()
+
+    max_tick = 0
+    sum_tick = 0
+
+    for i in range(_NUM_TICKS):
+        period.exceed_next_time = (i % _PERIOD_TICKS == 0)
+
+        start = perf_counter()
+        appl.tick()
+        duration = perf_counter() - start
+
+        if i >= _PERIOD_TICKS:   # Skip the first round (costs unknown)
+            sum_tick += duration
+            if duration > max_tick:
+                max_tick = duration
+
+    print(f"{ name.ljust(50, '.') }: Max. tick { round(max_tick * 1000, 2) }ms, avg. { round(sum_tick * 1000000 / (_NUM_TICKS - _PERIOD_TICKS), 1) }us")
+
+
+def run():
+    print("40 Updateables taking 50us, 6 taking 1.5ms, period every 20 ticks:")
+
+    _run("All in one tick", { "tickBudgetMillis": 1000000 })
+    _run("Budget 15ms (default)", {})
+    _run("Budget 15ms, 4 slices", { "updateSlices": 4 })
+    _run("Budget 15ms, 8 slices", { "updateSlices": 8 })
+    _run("Budget 5ms", { "tickBudgetMillis": 5 })
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,189 @@
+#################################################################################################################################
+#
+# Replay driver for MIDI recordings (see MidiRecorder and the "recordFile" option in communication.py). Feeds the recorded
+# incoming messages through Controller.tick() under a virtual clock, so captured sessions can be replayed deterministically
+# against any configuration on a Linux host. Usage:
+#
+#     replay = MidiReplay(read_recording(data), VirtualClock(get_current_millis))
+#
+#     with replay.clock:
+#         controller = Controller(midi = replay, ...)    # Everything creating timestamps must be done inside the clock context
+#         controller.init()
+#         result = replay.run(controller)
+#
+#     result.print()
+#
+# The recorded messages are delivered when the virtual clock has reached their timestamp. The clock advances by a fixed
+# amount per tick, so the run does not depend on the performance of the host (the wall clock time is measured separately).
+#
+#################################################################################################################################
+
+import sys
+from time import perf_counter
+from unittest.mock import patch
+
+from ..pyswitch.mocks_lib import *
+
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from lib.pyswitch.misc import get_current_millis
+    from lib.pyswitch.controller.midi_parser import MidiParser
+    from lib.pyswitch.controller.midi_recorder import RECORDING_IN, RECORDING_OUT, _encode, _encoded_size, _raw_bytes
+
+
+# Virtual clock: Replaces the time source of pyswitch.misc while the context is active. As the modules imported
+# inside patch.dict(sys.modules) are removed again afterwards, each importing test module gets its own copy of
+# pyswitch.misc, so the get_current_millis function of the code under test has to be passed.
+class VirtualClock:
+    def __init__(self, get_current_millis_func = get_current_millis):
+        self.millis = 0
+        self.__patch = patch.dict(get_current_millis_func.__globals__, { "monotonic": self.monotonic })
+
+    def monotonic(self):
+        return self.millis / 1000
+
+    def advance(self, millis):
+        self.millis += millis
+
+    def __enter__(self):
+        self.__patch.start()
+        return self
+
+    def __exit__(self, *args):
+        self.__patch.stop()
+
+
+# Results of a replay run
+class ReplayResult:
+    def __init__(self):
+        self.ticks = 0
+        self.virtual_millis = 0
+        self.wall_seconds = 0
+        self.tick_max_micros = 0
+        self.num_in = 0                    # Recorded messages delivered
+        self.num_out = 0                   # Messages sent by the controller
+        self.num_out_recorded = 0          # Messages sent in the recorded session
+        self.delays = []                   # Virtual time between the timestamp of each incoming message and its delivery (ms)
+
+    @property
+    def messages_per_second(self):
+        return (self.num_in + self.num_out) / self.wall_seconds if self.wall_seconds else 0
+
+    @property
+    def tick_average_micros(self):
+        return self.wall_seconds * 1000000 / self.ticks if self.ticks else 0
+
+    def print(self):
+        delay_avg = sum(self.delays) / len(self.delays) if self.delays else 0
+        delay_max = max(self.delays) if self.delays else 0
+
+        print(f"Replayed { self.virtual_millis }ms in { self.ticks } ticks ({ round(self.wall_seconds, 3) }s wall clock time)")
+        print(f"    Messages: { self.num_in } in, { self.num_out } out ({ self.num_out_recorded } out in the recording), { int(self.messages_per_second) } messages/s")
+        print(f"    Tick time: avg. { round(self.tick_average_micros, 1) }us, max. { round(self.tick_max_micros, 1) }us")
+        print(f"    Delivery delay: avg. { round(delay_avg, 2) }ms, max. { delay_max }ms")
+
+
+# MIDI controller replacement delivering the incoming messages of a recording (use read_recording() to read the events)
+class MidiReplay:
+
+    # events: Events as returned by read_recording()
+    # clock:  VirtualClock for the code under test (see there)
+    def __init__(self, events, clock = None):
+        self.__in = [e for e in events if e[1] == RECORDING_IN]
+        self.__pos = 0
+        self.__num_out_recorded = len([e for e in events if e[1] == RECORDING_OUT])
+
+        self.clock = clock if clock else VirtualClock()
+
+        # Messages sent by the controller: Tuples (time, raw bytes)
+        self.sent = []
+
+        # Recorded messages are decoded with the MidiParser, which accepts all kinds here. The parser reuses CC/PC
+        # instances, which is fine as the controller processes every message before receiving the next.
+        self.__parser = MidiParser(buffer_size = 1024, sysex_size = 1024)
+        self.__parser.set_accept([k for k in range(0x80, 0xF0, 0x10)] + [k for k in range(0xF0, 0x100)])
+
+        self.__result = None
+
+    # Compatibility with MidiController
+    filter = None
+    transmitters = []
+
+    # True if there are recorded messages left
+    @property
+    def pending(self):
+        return self.__pos < len(self.__in)
+
+    def send(self, midi_message):
+        raw = _raw_bytes(midi_message)
+        data = bytearray(_encoded_size(midi_message, raw))
+        _encode(midi_message, raw, data, 0)
+
+        self.sent.append((self.clock.millis, bytes(data)))
+
+    def receive(self):
+        if self.__pos >= len(self.__in):
+            return None
+
+        (time, direction, data) = self.__in[self.__pos]
+        if time > self.clock.millis:
+            return None
+
+        self.__pos += 1
+
+        self.__parser.feed(data)
+        msg = self.__parser.parse()
+
+        if isinstance(msg, SystemExclusive):
+            # The mocked SystemExclusive keeps lists (the templates of the mappings are lists, too)
+            msg = SystemExclusive(list(msg.manufacturer_id), list(msg.data))
+
+        if self.__result:
+            self.__result.num_in += 1
+            self.__result.delays.append(self.clock.millis - time)
+
+        return msg
+
+    # Runs the controller until all recorded messages have been delivered (plus the given amount of
+    # milliseconds afterwards). Must be called inside the clock context.
+    def run(self, controller, tick_millis = 1, trailing_millis = 0):
+        result = ReplayResult()
+        result.num_out_recorded = self.__num_out_recorded
+        self.__result = result
+
+        num_sent = len(self.sent)
+        start_millis = self.clock.millis
+        end_millis = None
+
+        start = perf_counter()
+
+        while True:
+            if end_millis == None and not self.pending:
+                end_millis = self.clock.millis + trailing_millis
+
+            if end_millis != None and self.clock.millis >= end_millis:
+                break
+
+            tick_start = perf_counter()
+            controller.tick()
+            tick_micros = (perf_counter() - tick_start) * 1000000
+
+            if tick_micros > result.tick_max_micros:
+                result.tick_max_micros = tick_micros
+
+            result.ticks += 1
+            self.clock.advance(tick_millis)
+
+        result.wall_seconds = perf_counter() - start
+        result.virtual_millis = self.clock.millis - start_millis
+        result.num_out = len(self.sent) - num_sent
+
+        self.__result = None
+        return result
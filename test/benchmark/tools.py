@@ -0,0 +1,62 @@
+from time import perf_counter
+from tracemalloc import start, stop, take_snapshot, is_tracing
+
+# Runs the passed function the given number of times and prints the throughput. Allocations
+# are measured in a separate run (tracing slows down execution considerably). With repeat > 1, the
+# best of repeat runs is taken (for fast functions, where single runs are dominated by noise).
+def benchmark(name, func, iterations = 10000, repeat = 1):
+    # Warm up
+    func()
+
+    duration = None
+    for r in range(repeat):
+        start_time = perf_counter()
+        for i in range(iterations):
+            func()
+        run_duration = perf_counter() - start_time
+
+        if duration == None or run_duration < duration:
+            duration = run_duration
+
+    allocated = measure_allocations(func, iterations)
+
+    print(f"{ name.ljust(50, '.') }: { int(iterations / duration) } calls/s, { round(allocated / iterations, 1) } bytes allocated per call")
+
+    return {
+        "duration": duration,
+        "iterations": iterations,
+        "allocated": allocated
+    }
+
+# Returns the amount of bytes allocated while running the function the given number of times
+# (only blocks still alive at the end are counted by tracemalloc, so this also takes the peak).
+# The overhead of the measurement itself (calling a function which does nothing) is subtracted.
+def measure_allocations(func, iterations):
+    was_tracing = is_tracing()
+    if not was_tracing:
+        start()
+
+    allocated = _measure_peaks(func, iterations) - _measure_peaks(_noop, iterations)
+
+    if not was_tracing:
+        stop()
+
+    return allocated if allocated > 0 else 0
+
+def _noop():
+    pass
+
+def _measure_peaks(func, iterations):
+    from tracemalloc import get_traced_memory, reset_peak
+
+    reset_peak()
+
+    allocated = 0
+    for i in range(iterations):
+        current, _ = get_traced_memory()
+        func()
+        after, peak = get_traced_memory()
+        allocated += peak - current
+        reset_peak()
+
+    return allocated
@@ -26,16 +26,45 @@ class MockMidiController:
 ##################################################################################################################################
 
 
+# MIDI device supporting raw access
+class MockRawMidiDevice(MockMidiController):
+    def __init__(self):
+        super().__init__()
+
+        self.next_raw_chunks = []
+        self.raw_written = []
+        self.num_read_raw_calls = 0
+
+    def read_raw(self, buffer):
+        self.num_read_raw_calls += 1
+
+        if not self.next_raw_chunks:
+            return 0
+        
+        chunk = self.next_raw_chunks.pop(0)
+        buffer[:len(chunk)] = bytes(chunk)
+        return len(chunk)
+    
+    def write_raw(self, buffer, num):
+        self.raw_written.append(bytes(buffer[:num]))
+
+
+##################################################################################################################################
+
+
 class MockPeriodCounter():
     def __init__(self):
         self.exceed_next_time = False
         self.num_reset_calls = 0
+        self.reset_time = None
+        self.exceeded_at_time = None
         
         self.passed = 0
         self.interval = 0
 
-    def reset(self):
+    def reset(self, time = None):
         self.num_reset_calls += 1
+        self.reset_time = time
 
     @property
     def exceeded(self):
@@ -44,6 +73,10 @@ class MockPeriodCounter():
             return True
         return False
 
+    def exceeded_at(self, time):
+        self.exceeded_at_time = time
+        return self.exceeded
+
 
 ##################################################################################################################################
 
@@ -83,6 +116,29 @@ class MockSwitch:
 ##################################################################################################################################
 
 
+# Switch reporting press/release events (like AdafruitKeypadSwitch)
+class MockEventSwitch:
+    def __init__(self):
+        self.next_events = []
+        self.num_pushed_calls = 0
+
+    def init(self):
+        pass
+
+    @property
+    def pushed(self):
+        self.num_pushed_calls += 1
+        return False
+
+    def next_event(self):
+        if self.next_events:
+            return self.next_events.pop(0)
+        return None
+
+
+##################################################################################################################################
+
+
 class MockPotentiometer:
     def __init__(self):
         self.output = 0
@@ -120,9 +176,8 @@ def _check_unique_mapping_names(function):
         else:
             name = kwargs["name"]
 
-        for m in ClientParameterMapping._mappings:
-            if m.name == name:
-                raise Exception("Mapping already defined: " + repr(name))
+        if name in ClientParameterMapping._mappings:
+            raise Exception("Mapping already defined: " + repr(name))
 
         return function(*args, **kwargs)
     return wrapper
@@ -306,6 +361,7 @@ class MockClient:
         self.register_calls = []
         self.request_calls = []
         self.set_calls = []
+        self.accept_calls = []
         self.num_notify_connection_lost_calls = 0
         self.debug = False
         self.midi = MockMidiController()
@@ -314,7 +370,7 @@ class MockClient:
     def last_sent_message(self):
         return self.set_calls[len(self.set_calls)-1] if self.set_calls else None
 
-    def set(self, mapping, value):
+    def set(self, mapping, value, coalesce = False):
         self.set_calls.append({
             "mapping": mapping,
             "value": value
@@ -332,6 +388,9 @@ class MockClient:
             "listener": listener
         })
 
+    def accept(self, mapping):
+        self.accept_calls.append(mapping)
+
     def notify_connection_lost(self):
         self.num_notify_connection_lost_calls += 1
 
@@ -461,5 +520,12 @@ class MockController(Updater):
         self.led_driver = MockNeoPixelDriver()
         self.led_driver.init(num_leds)
 
+        self.dirty_items = []
+
+    # Updates immediately (no flush stage)
+    def mark_dirty(self, item):
+        self.dirty_items.append(item)
+        item.update_displays()
+
     def reset_actions(self):
         pass
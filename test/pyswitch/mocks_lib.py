@@ -14,6 +14,9 @@ class MockTime:
     def monotonic():
         return MockTime.mock["monotonicReturn"]
 
+    def monotonic_ns():
+        return int(MockTime.mock["monotonicReturn"] * 1000000000)
+
     def localtime():
         return MockTime.mock["localtimeReturn"]
     
@@ -233,12 +236,26 @@ class MockDisplayShapes:
 
 class MockMidiBridge:
     class PyMidiBridge:
-        def __init__(self, midi, storage, event_handler = None, read_chunk_size = 1024):
+        # Same signature as the shipped lib/pymidibridge/PyMidiBridge.mpy
+        def __init__(self, midi, storage_factory, event_handler = None):
+            self.midi = midi
+            self.storage_factory = storage_factory
+            self.event_handler = event_handler
             self.messages_received = []
+            self.errors = []
 
         def receive(self, msg):
             self.messages_received.append(msg)
 
+        def error(self, message):
+            self.errors.append(message)
+
+
+class MockMidiBridgeStorageProvider:
+    class MidiBridgeStorageProvider:
+        def __init__(self, temp_file_path):
+            self.temp_file_path = temp_file_path
+
 
 class MockOs:
         
@@ -293,4 +310,62 @@ class MockUsbHidKeycode:
     class Keycode:
         A = 4
         B = 5
-        C = 6
\ No newline at end of file
+        C = 6
+
+
+##################################################################################################################################
+
+
+class MockKeypad:
+    instances = []
+
+    class Event:
+        def __init__(self, key_number = 0, pressed = True, timestamp = 0):
+            self.key_number = key_number
+            self.pressed = pressed
+            self.timestamp = timestamp
+
+    class EventQueue:
+        def __init__(self):
+            self.events = []
+            self.overflowed = False
+
+        def __len__(self):
+            return len(self.events)
+
+        def get_into(self, event):
+            if not self.events:
+                return False
+            
+            e = self.events.pop(0)
+            event.key_number = e.key_number
+            event.pressed = e.pressed
+            event.timestamp = e.timestamp
+            return True
+
+        def clear(self):
+            self.events = []
+            self.overflowed = False
+
+    class Keys:
+        def __init__(self, pins, value_when_pressed, pull, interval, max_events):
+            self.pins = pins
+            self.value_when_pressed = value_when_pressed
+            self.pull = pull
+            self.interval = interval
+            self.max_events = max_events
+
+            self.events = MockKeypad.EventQueue()
+            self.num_reset_calls = 0
+
+            MockKeypad.instances.append(self)
+
+        def reset(self):
+            self.num_reset_calls += 1
+
+
+class MockSupervisor:
+    ticks = 0
+
+    def ticks_ms():
+        return MockSupervisor.ticks
@@ -27,6 +27,8 @@ class MockMisc:
     get_option = misc.get_option
     fill_up_to = misc.fill_up_to
     get_current_millis = misc.get_current_millis
+    get_ticks_ms = misc.get_ticks_ms
+    ticks_diff = misc.ticks_diff
 
     Updater = misc.Updater
     Updateable = misc.Updateable
@@ -0,0 +1,310 @@
+import sys
+import unittest
+import asyncio
+from time import sleep, perf_counter
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "usb_midi": MockUsbMidi(),
+    "adafruit_midi": MockAdafruitMIDI(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.control_change import ControlChange
+    from .mocks_appl import *
+    from lib.pyswitch.controller.async_controller import AsyncController, ASYNC_TASK_INPUTS, ASYNC_TASK_MIDI, ASYNC_TASK_UPDATE, ASYNC_TASK_DISPLAY
+    from lib.pyswitch.misc import Updateable, Updater
+
+
+# Input recording the times it has been processed
+class _Input:
+    def __init__(self):
+        self.times = []
+
+    def process(self):
+        self.times.append(perf_counter())
+
+
+# Updateable taking some time
+class _Updateable(Updateable):
+    def __init__(self, cost_seconds = 0):
+        self.cost_seconds = cost_seconds
+        self.num_update_calls = 0
+
+    def update(self):
+        if self.cost_seconds:
+            sleep(self.cost_seconds)
+
+        self.num_update_calls += 1
+
+
+# Updater containing Updateables (like the UiController)
+class _Ui(Updater, Updateable):
+    def __init__(self):
+        Updater.__init__(self)
+
+
+# Client recording the received messages
+class _Client:
+    def __init__(self):
+        self.messages_received = []
+        self.num_process_send_queue_calls = 0
+
+    def receive(self, midi_message):
+        if midi_message:
+            self.messages_received.append(midi_message)
+
+    def process_send_queue(self):
+        self.num_process_send_queue_calls += 1
+
+    def begin_update_cycle(self):
+        pass
+
+
+class TestAsyncController(unittest.TestCase):
+
+    def _create(self, midi, config = {}):
+        return AsyncController(
+            led_driver = MockNeoPixelDriver(),
+            midi = midi,
+            config = config,
+            period_counter = MockPeriodCounter()
+        )
+    
+    def _run(self, appl, seconds):
+        async def stop():
+            await asyncio.sleep(seconds)
+            appl.stop()
+
+        async def main():
+            await asyncio.gather(appl.run(), stop())
+
+        asyncio.run(main())
+
+    def test_task_options(self):
+        appl = self._create(MockMidiController(), {
+            "updateInterval": 123,
+            "asyncTasks": {
+                "inputs": {
+                    "interval": 2
+                },
+                "display": {
+                    "interval": 50,
+                    "priority": 5
+                }
+            }
+        })
+
+        self.assertEqual(appl.intervals, [2, 1, 123, 50])
+        self.assertEqual(appl.priorities, [3, 2, 1, 5])
+
+        # The tick budgets are not used in async mode
+        self.assertIsNone(appl.scheduler)
+
+    def test_run(self):
+        midi = MockMidiController()
+        appl = self._create(midi, {
+            "asyncTasks": {
+                "update": {
+                    "interval": 10
+                },
+                "display": {
+                    "interval": 20
+                }
+            }
+        })
+
+        client = _Client()
+        appl.client = client
+
+        input = _Input()
+        appl.inputs = [input]
+
+        u = _Updateable()
+        appl.add_updateable(u)
+
+        ui = _Ui()
+        element = _Updateable()
+        ui.add_updateable(element)
+        appl.ui = ui
+        appl.add_updateable(ui)
+
+        messages = [ControlChange(i, 1) for i in range(25)]
+        midi.next_receive_messages = list(messages)
+
+        self._run(appl, 0.1)
+
+        self.assertFalse(appl.running)
+
+        # All messages parsed, in batches
+        self.assertEqual(client.messages_received, messages)
+        self.assertGreater(client.num_process_send_queue_calls, 10)
+
+        # Inputs scanned at their rate, updates and display refresh separately
+        self.assertGreater(len(input.times), 10)
+        self.assertGreater(u.num_update_calls, 3)
+        self.assertGreater(element.num_update_calls, 1)
+        self.assertGreater(u.num_update_calls, element.num_update_calls)
+
+        self.assertEqual([appl.runs[t] > 0 for t in range(4)], [True, True, True, True])
+        
+    def test_updates_yield_to_inputs(self):
+        appl = self._create(MockMidiController(), {
+            "asyncTasks": {
+                "inputs": {
+                    "interval": 2
+                },
+                "update": {
+                    "interval": 1
+                }
+            }
+        })
+
+        input = _Input()
+        appl.inputs = [input]
+
+        # One update sweep takes 40ms
+        for i in range(20):
+            appl.add_updateable(_Updateable(0.002))
+
+        self._run(appl, 0.15)
+
+        # Inputs are scanned in between the updates: Without yielding, they would only be scanned once per sweep 
+        # (about 4 times). The number of scans is checked instead of the max. gap, as a single hiccup of the host 
+        # (sleeping much longer than requested) can exceed any gap tolerance.
+        self.assertGreater(len(input.times), 20)
+
+    def test_debug_stats_jitter(self):
+        appl = self._create(MockMidiController(), {
+            "debugStats": True,
+            "debugStatsInterval": 1000000,
+            "asyncTasks": {
+                "inputs": {
+                    "interval": 2
+                }
+            }
+        })
+
+        appl.inputs = [_Input()]
+
+        lines = []
+
+        with patch.dict(AsyncController.measurement_updated.__globals__, { "do_print": lines.append }):
+            with patch.dict(AsyncController.__bases__[0].measurement_updated.__globals__, { "do_print": lines.append }):
+                self._run(appl, 0.05)
+
+        # Time between the input scans is measured
+        jitter = appl.measurement_process_jitter
+        self.assertGreater(jitter.calls, 5)
+        self.assertGreaterEqual(jitter.average, 1)
+
+    def test_sleep_no_drift(self):
+        appl = self._create(MockMidiController(), {
+            "asyncTasks": {
+                "update": {
+                    "interval": 10
+                }
+            }
+        })
+
+        sleeps = []
+
+        class _Asyncio:
+            async def sleep(self, seconds):
+                sleeps.append(seconds)
+
+        appl._AsyncController__asyncio = _Asyncio()
+        appl._AsyncController__due[ASYNC_TASK_UPDATE] = 1000
+
+        def sleep_at(now):
+            with patch.dict(AsyncController.run.__globals__, { "get_current_millis": lambda: now }):
+                asyncio.run(appl._AsyncController__sleep(ASYNC_TASK_UPDATE))
+
+        # The run time of the task is subtracted from the sleep time
+        sleep_at(1003)
+        self.assertAlmostEqual(sleeps[-1], 0.007)
+
+        sleep_at(1012)
+        self.assertAlmostEqual(sleeps[-1], 0.008)
+
+        # Slightly late: Run again immediately
+        sleep_at(1031)
+        self.assertEqual(sleeps[-1], 0)
+
+        sleep_at(1035)
+        self.assertAlmostEqual(sleeps[-1], 0.005)
+
+        # Late by more than one interval: Continue from now
+        sleep_at(1080)
+        self.assertEqual(sleeps[-1], 0)
+
+        sleep_at(1082)
+        self.assertAlmostEqual(sleeps[-1], 0.008)
+
+    def test_updateables_cached(self):
+        appl = self._create(MockMidiController())
+
+        u = _Updateable()
+        appl.add_updateable(u)
+
+        ui = _Ui()
+        element = _Updateable()
+        ui.add_updateable(element)
+        appl.ui = ui
+        appl.add_updateable(ui)
+
+        get_updateables = appl._AsyncController__get_updateables
+
+        update = get_updateables(ASYNC_TASK_UPDATE)
+        display = get_updateables(ASYNC_TASK_DISPLAY)
+
+        self.assertEqual(update, [u])
+        self.assertEqual(display, [element])
+
+        # Same lists as long as nothing changes
+        self.assertIs(get_updateables(ASYNC_TASK_UPDATE), update)
+        self.assertIs(get_updateables(ASYNC_TASK_DISPLAY), display)
+
+        # New splash (UiController.show() replaces the list)
+        element_2 = _Updateable()
+        ui.updateables = [element_2]
+
+        self.assertEqual(get_updateables(ASYNC_TASK_DISPLAY), [element_2])
+        self.assertEqual(display, [element])
+
+        # New Updateable added to the controller
+        u_2 = _Updateable()
+        appl.add_updateable(u_2)
+
+        self.assertEqual(get_updateables(ASYNC_TASK_UPDATE), [u, u_2])
+
+    def test_measurement_output(self):
+        appl = self._create(MockMidiController())
+
+        appl.runs[ASYNC_TASK_INPUTS] = 10
+        appl.max_delay[ASYNC_TASK_DISPLAY] = 4
+
+        class _Measurement:
+            name = "Tick"
+            value = 1
+            average = 1
+            calls = 1
+
+        lines = []
+
+        with patch.dict(AsyncController.measurement_updated.__globals__, { "do_print": lines.append }):
+            with patch.dict(AsyncController.__bases__[0].measurement_updated.__globals__, { "do_print": lines.append }):
+                appl.measurement_updated(_Measurement())
+
+        self.assertIn("Task inputs...................: Runs: 10, Max. delay: 0ms", lines)
+        self.assertIn("Task display..................: Runs: 0, Max. delay: 4ms", lines)
+
+        self.assertEqual(appl.runs, [0, 0, 0, 0])
+        self.assertEqual(appl.max_delay, [0, 0, 0, 0])
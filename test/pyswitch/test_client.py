@@ -1,5 +1,6 @@
 import sys
 import unittest
+from uuid import uuid4
 from unittest.mock import patch   # Necessary workaround! Needs to be separated.
 
 from .mocks_lib import *
@@ -17,7 +18,9 @@ with patch.dict(sys.modules, {
 }):
     from adafruit_midi.system_exclusive import SystemExclusive
     from adafruit_midi.control_change import ControlChange
-    from lib.pyswitch.controller.client import Client
+    from adafruit_midi.program_change import ProgramChange
+    from lib.pyswitch.controller.client import Client, ClientParameterMapping
+    from lib.pyswitch.controller.midi import MidiFilter
 
     from.mocks_appl import *
 
@@ -589,16 +592,18 @@ class TestClient(unittest.TestCase):
         self.assertEqual(midi.messages_sent[0], mapping_1.request)
         
         req = client.requests[0]        
-        req.lifetime = MockPeriodCounter()
-        client._Client__cleanup_terminated_period = MockPeriodCounter()
+        self.assertGreater(req.deadline, 0)
         
-        client.receive(None)
+        client.process_send_queue()
         
         self.assertEqual(req.finished, False)
 
-        req.lifetime.exceed_next_time = True
-        client._Client__cleanup_terminated_period.exceed_next_time = True
-        client.receive(None)
+        # Hanging requests are terminated once per tick, not when messages are received
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: req.deadline }):
+            client.receive(None)
+            self.assertEqual(req.finished, False)
+
+            client.process_send_queue()
 
         self.assertEqual(req.finished, True)
         
@@ -694,3 +699,723 @@ class TestClient(unittest.TestCase):
         self.assertEqual(mapping_1.value, 12)
         self.assertEqual(client.requests, [])
 
+
+
+##############################################################################################
+
+
+    def test_dispatch_index(self):
+        midi = MockAdafruitMIDI.MIDI()
+
+        client = Client(
+            midi = midi,
+            config = {}
+        )
+
+        class MockCountingMapping(ClientParameterMapping):
+            def __init__(self, response):
+                super().__init__(name = uuid4(), create_key = ClientParameterMapping, request = response, response = response)
+                self.num_parse_calls = 0
+
+            def parse(self, midi_message):
+                self.num_parse_calls += 1
+                return super().parse(midi_message)
+            
+            # parse() only accepts messages matching the response template
+            def dispatch_keys(self):
+                return self.response_dispatch_keys()
+
+        mapping_cc_1 = MockCountingMapping(ControlChange(10, 0))
+        mapping_cc_2 = MockCountingMapping(ControlChange(11, 0))
+        mapping_pc = MockCountingMapping(ProgramChange(0))
+        mapping_sysex = MockCountingMapping(SystemExclusive(
+            manufacturer_id = [0x00, 0x20, 0x33],
+            data = [0x00, 0x00, 0x01, 0x00, 0x32, 0x03]
+        ))
+
+        mapping_mock = MockParameterMapping(
+            request = ControlChange(12, 0),
+            response = ControlChange(12, 0)
+        )
+
+        listener = MockClientRequestListener()
+
+        for m in [mapping_cc_1, mapping_cc_2, mapping_pc, mapping_sysex, mapping_mock]:
+            client.request(m, listener)
+
+        self.assertEqual(len(client.requests), 5)
+
+        # CC 11: Only the matching mapping (and the mock which does not provide dispatch keys) is asked
+        self.assertEqual(client.receive(ControlChange(11, 5)), True)
+
+        self.assertEqual(mapping_cc_1.num_parse_calls, 0)
+        self.assertEqual(mapping_cc_2.num_parse_calls, 1)
+        self.assertEqual(mapping_pc.num_parse_calls, 0)
+        self.assertEqual(mapping_sysex.num_parse_calls, 0)
+        self.assertEqual(mapping_cc_2.value, 5)
+        self.assertEqual(listener.parameter_changed_calls, [mapping_cc_2])
+        self.assertEqual(len(client.requests), 4)
+
+        # Unknown CC: No mapping asked
+        self.assertEqual(client.receive(ControlChange(99, 5)), False)
+        self.assertEqual(mapping_cc_1.num_parse_calls, 0)
+
+        # SysEx for another address
+        self.assertEqual(client.receive(SystemExclusive(
+            manufacturer_id = [0x00, 0x20, 0x33],
+            data = [0x00, 0x00, 0x01, 0x00, 0x33, 0x03, 0x00, 0x01]
+        )), False)
+
+        self.assertEqual(mapping_sysex.num_parse_calls, 0)
+
+        # SysEx for another manufacturer
+        self.assertEqual(client.receive(SystemExclusive(
+            manufacturer_id = [0x00, 0x20, 0x34],
+            data = [0x00, 0x00, 0x01, 0x00, 0x32, 0x03, 0x00, 0x01]
+        )), False)
+
+        self.assertEqual(mapping_sysex.num_parse_calls, 0)
+
+        # Matching SysEx
+        self.assertEqual(client.receive(SystemExclusive(
+            manufacturer_id = [0x00, 0x20, 0x33],
+            data = [0x00, 0x00, 0x01, 0x00, 0x32, 0x03, 0x00, 0x01]
+        )), True)
+
+        self.assertEqual(mapping_sysex.num_parse_calls, 1)
+        self.assertEqual(mapping_sysex.value, 1)
+
+        # Program change
+        self.assertEqual(client.receive(ProgramChange(7)), True)
+        self.assertEqual(mapping_pc.num_parse_calls, 1)
+        self.assertEqual(mapping_pc.value, 7)
+
+        self.assertEqual(client.requests, [client.get_matching_request(mapping_cc_1), client.get_matching_request(mapping_mock)])
+
+        # Re-request a finished mapping: Must be indexed again
+        client.request(mapping_cc_2, listener)
+        self.assertEqual(client.receive(ControlChange(11, 6)), True)
+        self.assertEqual(mapping_cc_2.num_parse_calls, 2)
+        self.assertEqual(mapping_cc_2.value, 6)
+
+
+##############################################################################################
+
+
+    def test_dispatch_index_timeout(self):
+        midi = MockAdafruitMIDI.MIDI()
+
+        client = Client(
+            midi = midi,
+            config = {}
+        )
+
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        listener = MockClientRequestListener()
+        client.request(mapping, listener)
+
+        req = client.requests[0]
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: req.deadline }):
+            client.process_send_queue()
+        
+        self.assertEqual(client.receive(ControlChange(10, 1)), False)
+        self.assertEqual(listener.request_terminated_calls, [mapping])
+        self.assertEqual(client.requests, [])
+        self.assertEqual(client._Client__dispatch, {})
+
+
+##############################################################################################
+
+
+    def test_compile_response_matchers(self):
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        mapping_2 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(11, 0),
+            response = ControlChange(11, 0)
+        )
+
+        # Default: Not compiled
+        client = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {}
+        )
+
+        client.request(mapping_1)
+        self.assertEqual(mapping_1.matchers, None)
+
+        # Compiled
+        client = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {
+                "compileResponseMatchers": True
+            }
+        )
+
+        listener = MockClientRequestListener()
+        client.request(mapping_2, listener)
+        self.assertEqual(len(mapping_2.matchers), 1)
+
+        self.assertEqual(client.receive(ControlChange(11, 67)), True)
+        self.assertEqual(mapping_2.value, 67)
+        self.assertEqual(listener.parameter_changed_calls, [mapping_2])
+
+
+##############################################################################################
+
+
+    def test_get_matching_request(self):
+        client = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {}
+        )
+
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        mapping_2 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(11, 0),
+            response = ControlChange(11, 0)
+        )
+
+        self.assertEqual(client.get_matching_request(mapping_1), None)
+
+        client.request(mapping_1)
+        client.request(mapping_2)
+
+        self.assertIs(client.get_matching_request(mapping_1), client.requests[0])
+        self.assertIs(client.get_matching_request(mapping_2), client.requests[1])
+
+        # Requesting again does not add a second request
+        client.request(mapping_1)
+        self.assertEqual(len(client.requests), 2)
+
+        # Finished requests are removed
+        client.receive(ControlChange(10, 3))
+
+        self.assertEqual(client.get_matching_request(mapping_1), None)
+        self.assertIs(client.get_matching_request(mapping_2), client.requests[0])
+
+
+##############################################################################################
+
+
+    def test_adaptive_polling(self):
+        midi = MockAdafruitMIDI.MIDI()
+
+        client = Client(
+            midi = midi,
+            config = {
+                "updateInterval": 100,
+                "adaptivePollingMaxIntervalMillis": 400
+            }
+        )
+
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            set = ControlChange(9, 0),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        # Polls one update cycle and answers with the passed value. Returns if the request has been sent.
+        def poll(value):
+            num_sent = len(midi.messages_sent)
+            client.begin_update_cycle()
+            client.request(mapping)
+
+            if len(midi.messages_sent) == num_sent:
+                return False
+            
+            client.receive(ControlChange(10, value))
+            return True
+
+        self.assertEqual(poll(3), True)
+        
+        # Stable value: Interval doubles up to the maximum
+        self.assertEqual(poll(3), True)
+        self.assertEqual(poll(3), False)
+        
+        self.assertEqual(poll(3), True)
+        self.assertEqual([poll(3) for i in range(3)], [False, False, False])
+
+        self.assertEqual(poll(3), True)
+        self.assertEqual([poll(3) for i in range(3)], [False, False, False])
+
+        # Value changed: Full rate again
+        self.assertEqual(poll(4), True)
+        self.assertEqual(poll(4), True)
+        self.assertEqual(poll(4), False)
+
+        # Setting the value resets the interval
+        client.set(mapping, 4)
+        self.assertEqual(poll(4), True)
+        self.assertEqual(poll(4), False)
+        self.assertEqual(poll(4), True)
+
+
+    def test_adaptive_polling_multiple_listeners(self):
+        midi = MockAdafruitMIDI.MIDI()
+
+        client = Client(
+            midi = midi,
+            config = {
+                "updateInterval": 100,
+                "adaptivePollingMaxIntervalMillis": 400
+            }
+        )
+
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        listeners = [MockClientRequestListener() for i in range(3)]
+
+        # Polls one update cycle (every listener requests the mapping) and answers with a stable value. 
+        # Returns if the request has been sent.
+        def poll():
+            num_sent = len(midi.messages_sent)
+            client.begin_update_cycle()
+
+            for listener in listeners:
+                client.request(mapping, listener)
+
+            if len(midi.messages_sent) == num_sent:
+                return False
+            
+            client.receive(ControlChange(10, 3))
+            return True
+
+        # The interval is the same as with one listener
+        self.assertEqual(
+            [poll() for i in range(12)], 
+            [True, True, False, True, False, False, False, True, False, False, False, True]
+        )
+
+
+    def test_adaptive_polling_dependency(self):
+        midi = MockAdafruitMIDI.MIDI()
+
+        client = Client(
+            midi = midi,
+            config = {
+                "updateInterval": 100,
+                "adaptivePollingMaxIntervalMillis": 800
+            }
+        )
+
+        mapping_dep = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(20, 0),
+            response = ControlChange(20, 0)
+        )
+
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0),
+            depends = mapping_dep
+        )
+
+        client.begin_update_cycle()
+        client.request(mapping)
+        self.assertEqual(midi.messages_sent, [mapping_dep.request])
+
+        client.receive(ControlChange(20, 1))
+        self.assertEqual(midi.messages_sent, [mapping_dep.request, mapping.request])
+        client.receive(ControlChange(10, 7))
+
+        client.begin_update_cycle()
+        client.request(mapping)
+        client.receive(ControlChange(20, 1))
+        self.assertEqual(len(midi.messages_sent), 3)
+
+        # Dependency is polled less frequently now
+        client.begin_update_cycle()
+        client.request(mapping)
+        self.assertEqual(len(midi.messages_sent), 3)
+
+        client.begin_update_cycle()
+        client.request(mapping)
+        self.assertEqual(len(midi.messages_sent), 4)
+
+        # Dependency changed: The mapping is requested again
+        client.receive(ControlChange(20, 2))
+        self.assertEqual(midi.messages_sent[-1], mapping.request)
+
+
+##############################################################################################
+
+
+    def test_request_expiry_queue(self):
+        midi = MockAdafruitMIDI.MIDI()
+
+        client = Client(
+            midi = midi,
+            config = {}
+        )
+
+        mappings = [
+            ClientParameterMapping.get(
+                name = uuid4(),
+                request = ControlChange(10 + i, 0),
+                response = ControlChange(10 + i, 0)
+            )
+            for i in range(4)
+        ]
+
+        listener = MockClientRequestListener()
+
+        # Deadlines 3000, 3010, 3020 and 3030 (lifetime is 2000ms)
+        for i in range(4):
+            with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 1000 + i * 10 }):
+                client.request(mappings[i], listener)
+
+        requests = client.requests
+        reqs = list(requests)
+
+        self.assertEqual(client._Client__expiry, reqs)
+        self.assertEqual(client._Client__next_deadline, 3000)
+        
+        # Second request has been answered, the first and third one expired
+        client.receive(ControlChange(11, 1))
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 2999 }):
+            client.process_send_queue()
+
+        self.assertEqual(listener.request_terminated_calls, [])
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 3025 }):
+            client.process_send_queue()
+
+        self.assertEqual(listener.request_terminated_calls, [mappings[0], mappings[2]])
+        self.assertIs(client.requests, requests)
+        self.assertEqual(client.requests, [reqs[3]])
+        self.assertEqual(client._Client__expiry, [reqs[3]])
+        self.assertEqual(client._Client__expiry_pos, 0)
+        self.assertEqual(client._Client__next_deadline, 3030)
+
+        # Answered requests are skipped
+        client.receive(ControlChange(13, 1))
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 3030 }):
+            client.process_send_queue()
+
+        self.assertEqual(client.requests, [])
+        self.assertEqual(client._Client__expiry, [])
+        self.assertEqual(client._Client__next_deadline, 0)
+
+
+##############################################################################################
+
+
+    def test_notify_changes_only(self):
+        client = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {
+                "notifyChangesOnly": True
+            }
+        )
+
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        listener_1 = MockClientRequestListener()
+        listener_2 = MockClientRequestListener()
+
+        client.request(mapping, listener_1)
+        client.receive(ControlChange(10, 3))
+
+        self.assertEqual(listener_1.parameter_changed_calls, [mapping])
+
+        # Same value again
+        client.request(mapping, listener_1)
+        client.receive(ControlChange(10, 3))
+
+        self.assertEqual(listener_1.parameter_changed_calls, [mapping])
+        self.assertEqual(client.num_notifications, 1)
+        self.assertEqual(client.num_notifications_saved, 1)
+
+        # New listeners are notified with the current value
+        client.request(mapping, listener_1)
+        client.request(mapping, listener_2)
+        client.receive(ControlChange(10, 3))
+
+        self.assertEqual(listener_1.parameter_changed_calls, [mapping])
+        self.assertEqual(listener_2.parameter_changed_calls, [mapping])
+
+        # Changed value
+        client.request(mapping, listener_1)
+        client.request(mapping, listener_2)
+        client.receive(ControlChange(10, 4))
+
+        self.assertEqual(listener_1.parameter_changed_calls, [mapping, mapping])
+        self.assertEqual(listener_2.parameter_changed_calls, [mapping, mapping])
+        self.assertEqual(client.num_notifications, 4)
+        self.assertEqual(client.num_notifications_saved, 2)
+
+        # After a timeout, the next value is notified in any case
+        client.request(mapping, listener_1)
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: client.requests[0].deadline }):
+            client.process_send_queue()
+
+        client.request(mapping, listener_1)
+        client.receive(ControlChange(10, 4))
+
+        self.assertEqual(listener_1.parameter_changed_calls, [mapping, mapping, mapping])
+
+
+    def test_notify_changes_only_mapping(self):
+        client = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {
+                "notifyChangesOnly": True
+            }
+        )
+
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0),
+            changes_only = False
+        )
+
+        client_2 = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {}
+        )
+
+        mapping_2 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(11, 0),
+            response = ControlChange(11, 0),
+            changes_only = True
+        )
+
+        listener = MockClientRequestListener()
+
+        for i in range(2):
+            client.request(mapping_1, listener)
+            client.receive(ControlChange(10, 3))
+
+            client_2.request(mapping_2, listener)
+            client_2.receive(ControlChange(11, 3))
+
+        self.assertEqual(listener.parameter_changed_calls, [mapping_1, mapping_2, mapping_1])
+        self.assertEqual(client.num_notifications_saved, 0)
+        self.assertEqual(client_2.num_notifications_saved, 1)
+
+
+##############################################################################################
+
+
+    def test_latency(self):
+        client = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {
+                "debugClientLatency": True
+            }
+        )
+
+        client._Client__latency_period = MockPeriodCounter()
+
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        mapping_2 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(11, 0),
+            response = ControlChange(11, 0)
+        )
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 1000 }):
+            client.request(mapping_1)
+            client.request(mapping_2)
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 1030 }):
+            client.receive(ControlChange(10, 1))
+
+        self.assertEqual(list(client.latency.keys()), [mapping_1])
+        
+        histogram = client.get_latency(mapping_1)
+        self.assertEqual(histogram.name, mapping_1.name)
+        self.assertEqual(histogram.calls, 1)
+        self.assertEqual(histogram.max, 30)
+        self.assertEqual(histogram.counts[3], 1)
+
+        # Timeout
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 5000 }):
+            client.process_send_queue()
+
+        self.assertEqual(client.get_latency(mapping_2).timeouts, 1)
+        self.assertEqual(client.get_latency(mapping_2).calls, 0)
+        self.assertEqual(histogram.timeouts, 0)
+
+
+    def test_latency_disabled(self):
+        client = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {}
+        )
+
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        client.request(mapping)
+        self.assertEqual(client.requests[0].sent_time, 0)
+
+        client.receive(ControlChange(10, 1))
+        self.assertEqual(client.latency, None)
+
+
+
+    def test_filter(self):
+        midi = MockAdafruitMIDI.MIDI()
+        midi.filter = MidiFilter()
+
+        client = Client(
+            midi = midi,
+            config = {}
+        )
+
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        mapping_2 = ClientParameterMapping.get(
+            name = uuid4(),
+            response = SystemExclusive([0x00, 0x20, 0x33], [0x00, 0x00, 0x01])
+        )
+
+        mapping_3 = ClientParameterMapping.get(
+            name = uuid4(),
+            response = ProgramChange(0)
+        )
+
+        # Requested and registered mappings are added automatically
+        client.request(mapping_1)
+        client.register(mapping_2)
+
+        self.assertEqual(midi.filter.kinds, [0xB0, 0xF0])
+        self.assertEqual(midi.filter.manufacturers, [bytes([0x00, 0x20, 0x33])])
+
+        client.accept(mapping_3)
+
+        self.assertEqual(midi.filter.kinds, [0xB0, 0xF0, 0xC0])
+
+
+    def test_filter_disabled(self):
+        client = Client(
+            midi = MockAdafruitMIDI.MIDI(),
+            config = {}
+        )
+
+        # Must not throw
+        client.accept(ClientParameterMapping.get(
+            name = uuid4(),
+            response = ProgramChange(0)
+        ))
+
+
+
+    def test_coalesce(self):
+        midi = MockAdafruitMIDI.MIDI()
+
+        client = Client(
+            midi = midi,
+            config = {
+                "coalesceIntervalMillis": 20
+            }
+        )
+
+        period = MockPeriodCounter()
+        client._Client__coalesce_period = period
+
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            set = ControlChange(10, 0)
+        )
+
+        mapping_2 = ClientParameterMapping.get(
+            name = uuid4(),
+            set = ControlChange(11, 0)
+        )
+
+        client.set(mapping_1, 1, coalesce = True)
+        client.set(mapping_2, 5, coalesce = True)
+        client.set(mapping_1, 2, coalesce = True)
+
+        client.process_send_queue()
+        self.assertEqual(midi.messages_sent, [])
+
+        # Flush: Only the last values are sent
+        period.exceed_next_time = True
+        client.process_send_queue()
+
+        self.assertEqual(len(midi.messages_sent), 2)
+        self.assertEqual((midi.messages_sent[0].control, midi.messages_sent[0].value), (10, 2))
+        self.assertEqual((midi.messages_sent[1].control, midi.messages_sent[1].value), (11, 5))
+        self.assertEqual(client.num_coalesced, 1)
+
+        period.exceed_next_time = True
+        client.process_send_queue()
+        self.assertEqual(len(midi.messages_sent), 2)
+
+        # A normal set replaces the pending value and is sent immediately
+        client.set(mapping_1, 3, coalesce = True)
+        client.set(mapping_1, 4)
+
+        self.assertEqual(len(midi.messages_sent), 3)
+        self.assertEqual(midi.messages_sent[2].value, 4)
+
+        period.exceed_next_time = True
+        client.process_send_queue()
+        self.assertEqual(len(midi.messages_sent), 3)
+
+
+    def test_coalesce_disabled(self):
+        midi = MockAdafruitMIDI.MIDI()
+
+        client = Client(
+            midi = midi,
+            config = {}
+        )
+
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            set = ControlChange(10, 0)
+        )
+
+        client.set(mapping, 1, coalesce = True)
+        client.set(mapping, 2, coalesce = True)
+
+        self.assertEqual(len(midi.messages_sent), 2)
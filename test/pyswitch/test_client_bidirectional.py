@@ -20,7 +20,8 @@ with patch.dict(sys.modules, {
 
     from lib.pyswitch.controller.actions import PushButtonAction
     from lib.pyswitch.controller.callbacks import BinaryParameterCallback
-    from lib.pyswitch.controller.client import BidirectionalClient
+    from lib.pyswitch.controller.client import BidirectionalClient, ClientParameterMapping
+    from adafruit_midi.control_change import ControlChange
     from lib.pyswitch.controller.controller import Controller
 
     from.mocks_appl import *
@@ -93,6 +94,62 @@ class TestBidirectionalClient(unittest.TestCase):
         self.assertEqual(protocol.num_update_calls, 1)
 
 
+#############################################################################################
+
+
+    def test_feedback_value_changes_only(self):
+        mapping = ClientParameterMapping(
+            name = "feedback changes only",
+            create_key = ClientParameterMapping,
+            set = ControlChange(10, 0),
+            response = ControlChange(10, 0)
+        )
+
+        protocol = MockBidirectionalProtocol()
+        protocol.outputs_is_bidirectional = [
+            {
+                "mapping": mapping,
+                "result": True
+            }
+        ]
+        protocol.outputs_feedback_value = [
+            {
+                "mapping": mapping,
+                "result": True
+            }
+        ]
+
+        client = BidirectionalClient(
+            midi = MockMidiController(),
+            config = {
+                "notifyChangesOnly": True
+            },
+            protocol = protocol
+        )
+
+        listener = MockClientRequestListener()
+        client.register(mapping, listener)
+
+        values = []
+        listener.parameter_changed = lambda m: values.append(m.value)
+
+        client.receive(ControlChange(10, 0))
+        self.assertEqual(values, [0])
+
+        # Set value is fed back to the listeners
+        client.set(mapping, 1)
+        self.assertEqual(values, [0, 1])
+
+        # The device echoes the old value: Must be notified
+        client.receive(ControlChange(10, 0))
+        self.assertEqual(values, [0, 1, 0])
+        self.assertEqual(mapping.value, 0)
+
+        # Unchanged value
+        client.receive(ControlChange(10, 0))
+        self.assertEqual(values, [0, 1, 0])
+
+
 #############################################################################################
 
 
@@ -22,6 +22,7 @@ with patch.dict(sys.modules, {
     from adafruit_midi.program_change import ProgramChange
 
     from lib.pyswitch.controller.client import *
+    from lib.pyswitch.controller.client import _dispatch_key
 
 
 class TestClientParameterMapping(unittest.TestCase):
@@ -344,6 +345,40 @@ class TestClientParameterMapping(unittest.TestCase):
         self.assertEqual(list(mapping.set.data[0:6]), [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa])
 
 
+    def test_set_value_sysex_in_place(self):
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            set = SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 0x00, 0x00, 0x00]
+            )            
+        )
+
+        mapping.set_value(129)
+        message = mapping.set
+        data = message.data
+        packet = message.packet
+
+        self.assertIsInstance(message, ClientSysExSetMessage)
+        self.assertIsInstance(message, SystemExclusive)
+        self.assertEqual(message.manufacturer_id, [0x00, 0x10, 0x20])
+        self.assertIsInstance(data, bytearray)
+        self.assertEqual(list(data), [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 1, 1, 0x00])
+
+        # Complete wire packet, returned on sending
+        self.assertEqual(list(packet), [0xf0, 0x00, 0x10, 0x20, 0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 1, 1, 0x00, 0xf7])
+        self.assertIs(message.__bytes__(), packet)
+
+        # The message and its buffers are patched in place
+        mapping.set_value(300)
+        
+        self.assertIs(mapping.set, message)
+        self.assertIs(message.data, data)
+        self.assertIs(message.__bytes__(), packet)
+        self.assertEqual(list(data), [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 2, 44, 0x00])
+        self.assertEqual(list(packet), [0xf0, 0x00, 0x10, 0x20, 0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 2, 44, 0x00, 0xf7])
+
+
     def test_set_value_sysex_string(self):
         mapping = ClientParameterMapping.get(
             name = uuid4(),
@@ -505,3 +540,265 @@ class TestClientParameterMapping(unittest.TestCase):
         self.assertEqual(mapping.result_finished(), True)
         self.assertEqual(mapping.value, 11 * 128 + 34)
 
+
+
+####################################################################################################
+
+
+    def test_dispatch_keys(self):
+        mapping_sysex = ClientParameterMapping.get(
+            name = uuid4(),
+            response = SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa]
+            )
+        )
+
+        self.assertEqual(mapping_sysex.dispatch_keys(), [_dispatch_key(SystemExclusive(
+            manufacturer_id = [0x00, 0x10, 0x20],
+            data = [0x7f, 0x7f, 0xd9, 0x01, 0x04, 0xaa, 0x00]
+        ))])
+
+        # Different address: Different key
+        self.assertNotEqual(mapping_sysex.dispatch_keys()[0], _dispatch_key(SystemExclusive(
+            manufacturer_id = [0x00, 0x10, 0x20],
+            data = [0x00, 0x00, 0xd9, 0x01, 0x05, 0xaa]
+        )))
+
+        # Different manufacturer: Different key
+        self.assertNotEqual(mapping_sysex.dispatch_keys()[0], _dispatch_key(SystemExclusive(
+            manufacturer_id = [0x00, 0x10, 0x21],
+            data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa]
+        )))
+
+        # Keys of SysEx messages are small ints which never collide with ControlChange or ProgramChange keys
+        self.assertLess(mapping_sysex.dispatch_keys()[0], -1)
+        self.assertGreater(mapping_sysex.dispatch_keys()[0], -(1 << 29))
+
+        mapping_cc = ClientParameterMapping.get(
+            name = uuid4(),
+            response = ControlChange(23, 0)
+        )
+
+        self.assertEqual(mapping_cc.dispatch_keys(), [23])
+
+        mapping_two_part = ClientTwoPartParameterMapping.get(
+            name = uuid4(),
+            response = [
+                ControlChange(32, 0),
+                ProgramChange(0)
+            ]
+        )
+
+        self.assertEqual(len(mapping_two_part.dispatch_keys()), 2)
+        self.assertEqual(mapping_two_part.dispatch_keys()[0], 32)
+
+        mapping_none = ClientParameterMapping.get(
+            name = uuid4()
+        )
+
+        self.assertEqual(mapping_none.dispatch_keys(), [])
+
+        mapping_other = ClientParameterMapping.get(
+            name = uuid4(),
+            response = self
+        )
+
+        self.assertEqual(mapping_other.dispatch_keys(), None)
+
+        # Overridden parse(): All messages are offered
+        class _CustomMapping(ClientParameterMapping):
+            def parse(self, midi_message):
+                return False
+
+        mapping_custom = _CustomMapping(
+            name = uuid4(),
+            create_key = ClientParameterMapping,
+            response = ControlChange(23, 0)
+        )
+
+        self.assertEqual(mapping_custom.dispatch_keys(), None)
+
+
+####################################################################################################
+
+
+    def test_compiled_matchers(self):
+        templates = [
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 0x00, 0x00]
+            ),
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9]
+            ),
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa]
+            ),
+            ControlChange(4, 0),
+            ProgramChange(0),
+            None
+        ]
+
+        messages = [
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 0x01, 0x05]
+            ),
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 0x66, 0x6f, 0x6f, 0x00]
+            ),
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x21],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 0x01, 0x05]
+            ),
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 0x01, 0x05]
+            ),
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x05, 0xaa, 0x01, 0x05]
+            ),
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9]
+            ),
+            SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01]
+            ),
+            ControlChange(4, 99),
+            ControlChange(5, 99),
+            ProgramChange(23),
+            self
+        ]
+
+        # Same messages with bytes instead of lists (like the adafruit_midi library delivers them)
+        def to_bytes(msg):
+            if not isinstance(msg, SystemExclusive):
+                return msg
+            
+            return SystemExclusive(
+                manufacturer_id = bytes(msg.manufacturer_id),
+                data = bytes(msg.data)
+            )
+        
+        for type in [ClientParameterMapping.PARAMETER_TYPE_NUMERIC, ClientParameterMapping.PARAMETER_TYPE_STRING]:
+            for template in templates:
+                mapping = ClientParameterMapping.get(
+                    name = uuid4(),
+                    response = template,
+                    type = type
+                )
+
+                matcher = ClientResponseMatcher(template, type)
+                matcher_bytes = ClientResponseMatcher(to_bytes(template), type)
+
+                for message in messages:
+                    self.assertEqual(matcher.match(message), mapping.parse_against(message, template))
+                    self.assertEqual(matcher_bytes.match(to_bytes(message)), mapping.parse_against(to_bytes(message), to_bytes(template)))
+
+
+    def test_compile(self):
+        mapping = ClientParameterMapping.get(
+            name = uuid4(),
+            response = SystemExclusive(
+                manufacturer_id = [0x00, 0x10, 0x20],
+                data = [0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa]
+            ),
+            type = ClientParameterMapping.PARAMETER_TYPE_STRING
+        )
+
+        self.assertEqual(mapping.matchers, None)
+        mapping.compile()
+        self.assertEqual(len(mapping.matchers), 1)
+
+        self.assertTrue(mapping.parse(SystemExclusive(
+            manufacturer_id = bytes([0x00, 0x10, 0x20]),
+            data = bytes([0x00, 0x00, 0xd9, 0x01, 0x04, 0xaa, 0x66, 0x6f, 0x6f, 0x00])
+        )))
+        self.assertEqual(mapping.value, "foo")
+
+        self.assertFalse(mapping.parse(ControlChange(4, 99)))
+        self.assertEqual(mapping.value, "foo")
+
+
+    def test_compile_two_part(self):
+        mapping = ClientTwoPartParameterMapping.get(
+            name = uuid4(),
+            response = [
+                ControlChange(32, 0),
+                ProgramChange(0)
+            ]
+        )
+
+        mapping.compile()
+        self.assertEqual(len(mapping.matchers), 2)
+
+        self.assertFalse(mapping.parse(ProgramChange(3)))
+        self.assertTrue(mapping.parse(ControlChange(32, 1)))
+        self.assertEqual(mapping.result_finished(), False)
+        self.assertTrue(mapping.parse(ProgramChange(3)))
+        self.assertEqual(mapping.result_finished(), True)
+        self.assertEqual(mapping.value, 131)
+
+
+####################################################################################################
+
+
+    def test_registry(self):
+        name = uuid4()
+        mapping = ClientParameterMapping.get(name = name)
+
+        self.assertIs(ClientParameterMapping.get(name = name), mapping)
+        self.assertIs(ClientTwoPartParameterMapping.get(name = name), mapping)
+        self.assertIs(ClientParameterMapping._mappings[name], mapping)
+
+        name_2 = uuid4()
+        mapping_2 = ClientTwoPartParameterMapping.get(name = name_2)
+
+        self.assertIsInstance(mapping_2, ClientTwoPartParameterMapping)
+        self.assertIs(ClientParameterMapping.get(name = name_2), mapping_2)
+
+
+####################################################################################################
+
+
+    def test_string_cache(self):
+        cache = ClientStringCache(size = 2)
+
+        data_1 = bytes([0x00, 0x00, 0x03, 0x00, 0x00, 0x01, 0x46, 0x6f, 0x6f, 0x00])
+        data_2 = bytes([0x00, 0x00, 0x03, 0x00, 0x00, 0x01, 0x42, 0x61, 0x72, 0x00])
+        data_3 = bytes([0x00, 0x00, 0x03, 0x00, 0x00, 0x01, 0x42, 0x61, 0x7a, 0x00])
+
+        str_1 = cache.decode(data_1)
+        self.assertEqual(str_1, "Foo")
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        # Identical payload (other object) returns the same string object
+        self.assertIs(cache.decode(bytes(data_1)), str_1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        self.assertEqual(cache.decode(data_2), "Bar")
+        self.assertEqual(cache.decode(data_3), "Baz")
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+        # Oldest entry has been replaced
+        self.assertEqual(cache.decode(data_1), "Foo")
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+
+        self.assertEqual(cache.decode(data_3), "Baz")
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+        # Unhashable data is decoded without caching
+        self.assertEqual(cache.decode(list(data_2)), "Bar")
+        self.assertEqual(cache.decode(bytearray(data_2)), "Bar")
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+        cache.clear()
+        self.assertEqual(cache.decode(data_3), "Baz")
+        self.assertEqual((cache.hits, cache.misses), (2, 5))
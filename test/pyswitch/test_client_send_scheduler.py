@@ -0,0 +1,308 @@
+import sys
+import unittest
+from uuid import uuid4
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "usb_midi": MockUsbMidi(),
+    "adafruit_midi": MockAdafruitMIDI(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from adafruit_midi.control_change import ControlChange
+    from adafruit_midi.program_change import ProgramChange
+    from lib.pyswitch.controller.client import Client, ClientParameterMapping, ClientSendScheduler
+
+    from.mocks_appl import *
+
+
+class TestClientSendScheduler(unittest.TestCase):
+
+    def test_budget(self):
+        midi = MockAdafruitMIDI.MIDI()
+        
+        scheduler = ClientSendScheduler(
+            midi = midi,
+            budget_bytes = 7,
+            interval_millis = 200,
+            poll_period = MockPeriodCounter()
+        )
+
+        msg_1 = ControlChange(1, 1)
+        msg_2 = ProgramChange(3)
+        msg_3 = ControlChange(2, 1)
+        msg_4 = SystemExclusive([0x00, 0x20, 0x33], [1, 2, 3, 4, 5, 6, 7, 8])
+
+        scheduler.send(msg_1)
+        scheduler.send(msg_2)
+        scheduler.send(msg_3)
+        scheduler.send(msg_4)
+
+        self.assertEqual(scheduler.num_pending, 4)
+        self.assertEqual(midi.messages_sent, [])
+
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, [msg_1, msg_2])
+        self.assertEqual(scheduler.num_pending, 2)
+        self.assertEqual(scheduler.num_deferred, 1)
+
+        # Messages larger than the budget are sent anyway, one per tick
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, [msg_1, msg_2, msg_3])
+
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, [msg_1, msg_2, msg_3, msg_4])
+        self.assertEqual(scheduler.num_pending, 0)
+
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, [msg_1, msg_2, msg_3, msg_4])
+
+
+    def test_priority(self):
+        midi = MockAdafruitMIDI.MIDI()
+        period = MockPeriodCounter()
+        
+        scheduler = ClientSendScheduler(
+            midi = midi,
+            budget_bytes = 100,
+            interval_millis = 200,
+            poll_period = period
+        )
+
+        req_1 = ControlChange(10, 0)
+        req_2 = ControlChange(11, 0)
+        set_1 = ControlChange(20, 1)
+
+        scheduler.request(req_1)
+        scheduler.request(req_2)
+        scheduler.send(set_1)
+
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, [set_1, req_1])
+
+        
+    def test_spread_polling(self):
+        midi = MockAdafruitMIDI.MIDI()
+        period = MockPeriodCounter()
+        
+        scheduler = ClientSendScheduler(
+            midi = midi,
+            budget_bytes = 100,
+            interval_millis = 200,
+            poll_period = period
+        )
+
+        requests = [ControlChange(i, 0) for i in range(4)]
+        for r in requests:
+            scheduler.request(r)
+
+        # First request is sent immediately, the others are spread over the interval
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests[:1])
+        self.assertEqual(period.interval, 50)
+        self.assertEqual(period.num_reset_calls, 1)
+
+        period.passed = 49
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests[:1])
+
+        period.passed = 50
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests[:2])
+        self.assertEqual(period.num_reset_calls, 2)
+
+        # Slow ticks: Catch up
+        period.passed = 100
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests)
+        self.assertEqual(scheduler.num_pending, 0)
+
+        # Next cycle
+        period.passed = 0
+        scheduler.request(requests[0])
+        scheduler.request(requests[1])
+
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests + requests[:1])
+        self.assertEqual(period.interval, 100)
+
+
+    def test_spread_polling_requests_added(self):
+        midi = MockAdafruitMIDI.MIDI()
+        period = MockPeriodCounter()
+        
+        scheduler = ClientSendScheduler(
+            midi = midi,
+            budget_bytes = 100,
+            interval_millis = 200,
+            poll_period = period
+        )
+
+        requests = [ControlChange(i, 0) for i in range(8)]
+        for r in requests[:4]:
+            scheduler.request(r)
+
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests[:1])
+        self.assertEqual(period.interval, 50)
+
+        # More requests added while the cycle is running: The spacing is recomputed, so all requests still fit 
+        # into the interval (7 remaining requests in 200ms)
+        for r in requests[4:]:
+            scheduler.request(r)
+
+        period.passed = 24
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests[:1])
+        self.assertEqual(period.interval, 25)
+
+        period.passed = 25
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests[:2])
+
+        # Rest of the cycle: 175ms for 6 requests
+        period.passed = 0
+        scheduler.process()
+        self.assertEqual(period.interval, 25)
+
+        period.passed = 25
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, requests[:3])
+
+
+    def test_client(self):
+        midi = MockAdafruitMIDI.MIDI()
+        
+        client = Client(
+            midi = midi,
+            config = {
+                "clientSendBudgetBytes": 100
+            }
+        )
+
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            set = ControlChange(10, 0),
+            request = ControlChange(11, 0),
+            response = ControlChange(11, 0)
+        )
+
+        mapping_2 = ClientParameterMapping.get(
+            name = uuid4(),
+            set = [ControlChange(20, 0), ControlChange(21, 0)],
+            request = ControlChange(22, 0),
+            response = ControlChange(22, 0)
+        )
+
+        client.request(mapping_1)
+        client.set(mapping_2, [3, 4])
+        
+        self.assertEqual(midi.messages_sent, [])
+
+        client.process_send_queue()
+        self.assertEqual(midi.messages_sent, [mapping_2.set[0], mapping_2.set[1], mapping_1.request])
+
+
+    def test_client_latency_sent_time(self):
+        midi = MockAdafruitMIDI.MIDI()
+        
+        client = Client(
+            midi = midi,
+            config = {
+                "clientSendBudgetBytes": 100,
+                "debugClientLatency": True
+            }
+        )
+
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            request = ControlChange(11, 0),
+            response = ControlChange(11, 0)
+        )
+
+        # Enqueued at 1000, sent at 1050, answered at 1080
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 1000 }):
+            client.request(mapping_1)
+
+        request = client.requests[0]
+        self.assertEqual(request.sent_time, 0)
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 1050 }):
+            client.process_send_queue()
+
+        self.assertEqual(midi.messages_sent, [mapping_1.request])
+        self.assertEqual(request.sent_time, 1050)
+
+        with patch.dict(Client.__init__.__globals__, { "get_current_millis": lambda: 1080 }):
+            client.receive(ControlChange(11, 5))
+
+        self.assertEqual(client.get_latency(mapping_1).max, 30)
+
+
+    def test_client_no_budget(self):
+        midi = MockAdafruitMIDI.MIDI()
+        
+        client = Client(
+            midi = midi,
+            config = {}
+        )
+
+        mapping_1 = ClientParameterMapping.get(
+            name = uuid4(),
+            set = ControlChange(10, 0),
+            request = ControlChange(11, 0),
+            response = ControlChange(11, 0)
+        )
+
+        client.request(mapping_1)
+        self.assertEqual(midi.messages_sent, [mapping_1.request])
+
+        client.process_send_queue()
+        self.assertEqual(midi.messages_sent, [mapping_1.request])
+
+
+
+    def test_coalesce(self):
+        midi = MockAdafruitMIDI.MIDI()
+        
+        scheduler = ClientSendScheduler(
+            midi = midi,
+            budget_bytes = 3,
+            interval_millis = 200,
+            poll_period = MockPeriodCounter()
+        )
+
+        msg_1 = ControlChange(1, 1)
+        msg_2 = ControlChange(2, 1)
+
+        scheduler.send(msg_1, coalesce = True)
+        scheduler.send(msg_2, coalesce = True)
+        scheduler.send(msg_1, coalesce = True)
+
+        self.assertEqual(scheduler.num_pending, 2)
+        self.assertEqual(scheduler.num_coalesced, 1)
+
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, [msg_1])
+
+        # msg_1 has been sent already: Enqueued again
+        scheduler.send(msg_1, coalesce = True)
+        scheduler.send(msg_2, coalesce = True)
+        self.assertEqual(scheduler.num_pending, 2)
+
+        # Without coalescing, messages are enqueued every time
+        scheduler.send(msg_1)
+        self.assertEqual(scheduler.num_pending, 3)
+
+        scheduler.process()
+        scheduler.process()
+        scheduler.process()
+        self.assertEqual(midi.messages_sent, [msg_1, msg_2, msg_1, msg_1])
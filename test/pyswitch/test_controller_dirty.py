@@ -0,0 +1,206 @@
+import sys
+import unittest
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "usb_midi": MockUsbMidi(),
+    "adafruit_midi": MockAdafruitMIDI(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from lib.pyswitch.controller.controller import Controller
+    from lib.pyswitch.controller.actions import Action
+    from .mocks_appl import *
+    from .mocks_callback import *
+
+
+# Item counting its updates
+class _Item:
+    def __init__(self):
+        self.dirty = False
+        self.num_update_displays_calls = 0
+
+    def update_displays(self):
+        self.num_update_displays_calls += 1
+
+
+class TestControllerDirtyTracking(unittest.TestCase):
+
+    def _create(self, inputs = [], config = {}):
+        appl = Controller(
+            led_driver = MockNeoPixelDriver(),
+            midi = MockMidiController(),
+            inputs = inputs,
+            config = config,
+            period_counter = MockPeriodCounter()
+        )
+
+        appl.init()
+        return appl
+
+    def test_flush(self):
+        appl = self._create()
+
+        item_1 = _Item()
+        item_2 = _Item()
+
+        appl.mark_dirty(item_1)
+        appl.mark_dirty(item_1)
+        appl.mark_dirty(item_2)
+        appl.mark_dirty(item_1)
+
+        # Nothing is updated before the flush stage of the tick
+        self.assertEqual(item_1.num_update_displays_calls, 0)
+        self.assertTrue(item_1.dirty)
+
+        appl.tick()
+
+        self.assertEqual(item_1.num_update_displays_calls, 1)
+        self.assertEqual(item_2.num_update_displays_calls, 1)
+        self.assertFalse(item_1.dirty)
+        self.assertFalse(item_2.dirty)
+
+        self.assertEqual(appl.num_updates_performed, 2)
+        self.assertEqual(appl.num_updates_skipped, 2)
+
+        # Clean items cost nothing
+        appl.tick()
+
+        self.assertEqual(item_1.num_update_displays_calls, 1)
+        self.assertEqual(appl.num_updates_performed, 2)
+
+        # Marked again
+        appl.mark_dirty(item_2)
+        appl.tick()
+
+        self.assertEqual(item_1.num_update_displays_calls, 1)
+        self.assertEqual(item_2.num_update_displays_calls, 2)
+        self.assertEqual(appl.num_updates_performed, 3)
+
+    def test_action_marked_by_mapping_changes(self):
+        mapping_1 = MockParameterMapping()
+        mapping_2 = MockParameterMapping()
+
+        cb = MockActionCallback(mappings = [mapping_1, mapping_2])
+        action = Action({
+            "callback": cb
+        })
+
+        appl = self._create(inputs = [
+            {
+                "assignment": {
+                    "model": MockSwitch()
+                },
+                "actions": [
+                    action
+                ]
+            }
+        ])
+
+        appl.tick()
+        calls = cb.update_displays_calls
+
+        # Several changes in one tick: Only one update
+        cb.parameter_changed(mapping_1)
+        cb.parameter_changed(mapping_2)
+        cb.request_terminated(mapping_1)
+
+        self.assertEqual(cb.update_displays_calls, calls)
+        self.assertTrue(action.dirty)
+
+        appl.tick()
+
+        self.assertEqual(cb.update_displays_calls, calls + 1)
+        self.assertEqual(appl.num_updates_skipped, 2)
+
+        # No changes: No updates
+        appl.tick()
+        appl.tick()
+
+        self.assertEqual(cb.update_displays_calls, calls + 1)
+
+    def test_action_enabled_change_marked_by_update(self):
+        cb = MockActionCallback()
+        cb_enabled = MockEnabledCallback(output = True)
+
+        action = Action({
+            "callback": cb,
+            "enableCallback": cb_enabled
+        })
+
+        period = MockPeriodCounter()
+
+        appl = Controller(
+            led_driver = MockNeoPixelDriver(),
+            midi = MockMidiController(),
+            inputs = [
+                {
+                    "assignment": {
+                        "model": MockSwitch()
+                    },
+                    "actions": [
+                        action
+                    ]
+                }
+            ],
+            period_counter = period
+        )
+
+        appl.init()
+        
+        period.exceed_next_time = True
+        appl.tick()
+        calls = cb.update_displays_calls
+        performed = appl.num_updates_performed
+
+        # The periodic update does not render anything when nothing changed
+        period.exceed_next_time = True
+        appl.tick()
+
+        self.assertEqual(cb.update_displays_calls, calls)
+        self.assertEqual(appl.num_updates_performed, performed)
+
+        # Enabled state changed: The update only marks the action, which is rendered in the flush stage
+        cb_enabled.output = False
+        action.update()
+
+        self.assertTrue(action.dirty)
+
+        cb_enabled.output = True
+        period.exceed_next_time = True
+        appl.tick()
+
+        self.assertEqual(cb.update_displays_calls, calls + 1)
+        self.assertEqual(appl.num_updates_performed, performed + 1)
+        self.assertFalse(action.dirty)
+
+    def test_measurement_output(self):
+        appl = self._create(config = {
+            "debugStats": True
+        })
+
+        appl.mark_dirty(_Item())
+        appl.tick()
+
+        class _Measurement:
+            name = "Tick"
+            value = 1
+            average = 1
+            calls = 1
+
+        lines = []
+
+        with patch.dict(Controller.measurement_updated.__globals__, { "do_print": lines.append }):
+            appl.measurement_updated(_Measurement())
+
+        self.assertIn("Display updates...............: Performed: 1, Skipped: 0", lines)
+
+        self.assertEqual(appl.num_updates_performed, 0)
+        self.assertEqual(appl.num_updates_skipped, 0)
@@ -68,4 +68,9 @@ class TestControllerMeasurementsUpdate(unittest.TestCase):
                 
                 self.assertGreaterEqual(gc_mock_data().collect_calls, 1)
                 self.assertIn(MockMisc.format_size(gc_mock_data().output_mem_free), MockMisc.msgs_str)
+
+                # Tick budget report
+                self.assertIn("Tick budget Inputs", MockMisc.msgs_str)
+                self.assertIn("Tick budget MIDI", MockMisc.msgs_str)
+                self.assertIn("Tick budget Update", MockMisc.msgs_str)
                 
\ No newline at end of file
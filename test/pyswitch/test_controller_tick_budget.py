@@ -0,0 +1,405 @@
+import sys
+import unittest
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "usb_midi": MockUsbMidi(),
+    "adafruit_midi": MockAdafruitMIDI(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.control_change import ControlChange
+    from .mocks_appl import *
+    from lib.pyswitch.controller.controller import Controller
+    from lib.pyswitch.controller.scheduler import TickScheduler, TASK_INPUTS, TASK_MIDI, TASK_UPDATE
+    from lib.pyswitch.misc import Updateable, Updater, ticks_diff
+
+
+# Virtual milliseconds clock
+class _Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+# Input advancing the clock when processed
+class _Input:
+    def __init__(self, clock, cost):
+        self.clock = clock
+        self.cost = cost
+        self.num_process_calls = 0
+
+    def process(self):
+        self.clock.now += self.cost
+        self.num_process_calls += 1
+
+
+# Updateable advancing the clock when updated
+class _Updateable(Updateable):
+    def __init__(self, clock, cost):
+        self.clock = clock
+        self.cost = cost
+        self.num_update_calls = 0
+
+    def update(self):
+        self.clock.now += self.cost
+        self.num_update_calls += 1
+
+
+# MIDI controller advancing the clock for every message received
+class _Midi(MockMidiController):
+    def __init__(self, clock, cost):
+        super().__init__()
+        self.clock = clock
+        self.cost = cost
+
+    def receive(self):
+        msg = super().receive()
+        if msg:
+            self.clock.now += self.cost
+        return msg
+
+
+class TestTickScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.patcher = patch.dict(TickScheduler.begin.__globals__, { "get_ticks_ms": self.clock })
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_budgets(self):
+        scheduler = TickScheduler(budget_millis = 100, split = (10, 30, 60))
+        self.assertEqual(scheduler.budgets, [10, 30, 60])
+
+        with self.assertRaises(Exception):
+            TickScheduler(split = (50, 50))
+
+    def test_expired(self):
+        scheduler = TickScheduler(budget_millis = 100, split = (10, 30, 60))
+
+        self.clock.now = 5
+        scheduler.begin(TASK_INPUTS)
+        self.assertEqual(scheduler.expired, False)
+
+        self.clock.now = 14
+        self.assertEqual(scheduler.expired, False)
+
+        self.clock.now = 15
+        self.assertEqual(scheduler.expired, True)
+
+        scheduler.end(TASK_INPUTS, False)
+        self.assertEqual(scheduler.overruns, [0, 0, 0])
+
+    def test_ticks_wrap_around(self):
+        scheduler = TickScheduler(budget_millis = 100, split = (10, 30, 60))
+
+        # supervisor.ticks_ms() wraps around at 2^29
+        self.clock.now = 0x1FFFFFFA
+        scheduler.begin(TASK_INPUTS)
+
+        self.clock.now = 3
+        self.assertEqual(scheduler.expired, False)
+
+        self.clock.now = 4
+        self.assertEqual(scheduler.expired, True)
+
+        self.clock.now = 6
+        scheduler.end(TASK_INPUTS, False)
+        self.assertEqual(scheduler.max_overrun, [2, 0, 0])
+
+    def test_ticks_diff(self):
+        self.assertEqual(ticks_diff(10, 3), 7)
+        self.assertEqual(ticks_diff(3, 10), -7)
+        self.assertEqual(ticks_diff(2, 0x1FFFFFFE), 4)
+        self.assertEqual(ticks_diff(0x1FFFFFFE, 2), -4)
+
+    def test_overruns(self):
+        scheduler = TickScheduler(budget_millis = 100, split = (10, 30, 60))
+
+        scheduler.begin(TASK_MIDI)
+        self.clock.now = 35
+        scheduler.end(TASK_MIDI, True)
+
+        scheduler.begin(TASK_MIDI)
+        self.clock.now += 32
+        scheduler.end(TASK_MIDI, False)
+
+        scheduler.begin(TASK_UPDATE)
+        self.clock.now += 1
+        scheduler.end(TASK_UPDATE, True)
+
+        self.assertEqual(scheduler.overruns, [0, 2, 0])
+        self.assertEqual(scheduler.max_overrun, [0, 5, 0])
+        self.assertEqual(scheduler.carry_overs, [0, 1, 1])
+
+        report = scheduler.report()
+        self.assertEqual(len(report), 3)
+        self.assertIn("30ms", report[1])
+        self.assertIn("Overruns: 2 (max. 5ms)", report[1])
+
+        scheduler.reset()
+
+        self.assertEqual(scheduler.overruns, [0, 0, 0])
+        self.assertEqual(scheduler.max_overrun, [0, 0, 0])
+        self.assertEqual(scheduler.carry_overs, [0, 0, 0])
+
+
+class TestControllerTickBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.patcher = patch.dict(TickScheduler.begin.__globals__, { "get_ticks_ms": self.clock })
+        self.patcher.start()
+        self.patcher_controller = patch.dict(Controller.__init__.__globals__, { "get_ticks_ms": self.clock })
+        self.patcher_controller.start()
+
+    def tearDown(self):
+        self.patcher_controller.stop()
+        self.patcher.stop()
+
+    def _create(self, midi, period, config = {}):
+        appl = Controller(
+            led_driver = MockNeoPixelDriver(),
+            midi = midi,
+            config = config,
+            period_counter = period
+        )
+
+        appl.init()
+        return appl
+
+    def test_midi_flood(self):
+        midi = _Midi(self.clock, 1)
+        period = MockPeriodCounter()
+
+        appl = self._create(midi, period, {
+            "tickBudgetMillis": 10,
+            "tickBudgetSplit": (20, 40, 40)
+        })
+
+        inputs = [_Input(self.clock, 0) for i in range(3)]
+        appl.inputs = inputs
+
+        midi.next_receive_messages = [ControlChange(1, i) for i in range(10)]
+
+        # Only 4 messages fit into the MIDI budget per tick, the rest are left in the buffer
+        appl.tick()
+        self.assertEqual(len(midi.next_receive_messages), 6)
+        self.assertEqual([i.num_process_calls for i in inputs], [1, 1, 1])
+
+        appl.tick()
+        self.assertEqual(len(midi.next_receive_messages), 2)
+        self.assertEqual([i.num_process_calls for i in inputs], [2, 2, 2])
+
+        appl.tick()
+        self.assertEqual(len(midi.next_receive_messages), 0)
+
+        self.assertEqual(appl.scheduler.carry_overs, [0, 2, 0])
+        self.assertEqual(appl.scheduler.overruns, [0, 0, 0])
+
+    def test_slow_message(self):
+        midi = _Midi(self.clock, 20)
+        period = MockPeriodCounter()
+
+        appl = self._create(midi, period, {
+            "tickBudgetMillis": 10
+        })
+
+        midi.next_receive_messages = [ControlChange(1, 1), ControlChange(1, 2)]
+
+        # At least one message is processed per tick
+        appl.tick()
+        self.assertEqual(len(midi.next_receive_messages), 1)
+
+        self.assertEqual(appl.scheduler.overruns, [0, 1, 0])
+        self.assertEqual(appl.scheduler.max_overrun, [0, 16, 0])
+
+    def test_inputs_carry_over(self):
+        midi = _Midi(self.clock, 0)
+        period = MockPeriodCounter()
+
+        appl = self._create(midi, period, {
+            "tickBudgetMillis": 10,
+            "tickBudgetSplit": (20, 40, 40)
+        })
+
+        inputs = [_Input(self.clock, 1) for i in range(3)]
+        appl.inputs = inputs
+
+        appl.tick()
+        self.assertEqual([i.num_process_calls for i in inputs], [1, 1, 0])
+
+        appl.tick()
+        self.assertEqual([i.num_process_calls for i in inputs], [2, 1, 1])
+
+        appl.tick()
+        self.assertEqual([i.num_process_calls for i in inputs], [2, 2, 2])
+
+        self.assertEqual(appl.scheduler.carry_overs[TASK_INPUTS], 3)
+
+    def test_updates_carry_over(self):
+        midi = _Midi(self.clock, 0)
+        period = MockPeriodCounter()
+
+        appl = self._create(midi, period, {
+            "tickBudgetMillis": 10,
+            "tickBudgetSplit": (20, 40, 40)
+        })
+
+        updateables = [_Updateable(self.clock, 3) for i in range(3)]
+        for u in updateables:
+            appl.add_updateable(u)
+
+        # Nothing to do until the period is exceeded
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [0, 0, 0])
+
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [1, 1, 0])
+
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [1, 1, 1])
+
+        # Round finished
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [1, 1, 1])
+
+        self.assertEqual([u.update_cost for u in updateables], [3, 3, 3])
+
+        # Next round: The costs are known now, so only one Updateable fits per tick
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [2, 1, 1])
+
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [2, 2, 1])
+
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [2, 2, 2])
+
+        self.assertEqual(appl.scheduler.carry_overs[TASK_UPDATE], 3)
+        self.assertEqual(appl.scheduler.overruns[TASK_UPDATE], 1)
+
+    def test_update_round_not_restarted(self):
+        midi = _Midi(self.clock, 0)
+        period = MockPeriodCounter()
+
+        appl = self._create(midi, period, {
+            "tickBudgetMillis": 10,
+            "tickBudgetSplit": (20, 40, 40)
+        })
+
+        updateables = [_Updateable(self.clock, 5) for i in range(3)]
+        for u in updateables:
+            appl.add_updateable(u)
+
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [1, 0, 0])
+
+        # Period passed again before the round is finished: The round is finished first
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [1, 1, 0])
+
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [1, 1, 1])
+
+        # ...and the next round starts right after
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [2, 1, 1])
+
+    def test_update_slices(self):
+        midi = _Midi(self.clock, 0)
+        period = MockPeriodCounter()
+
+        appl = self._create(midi, period, {
+            "tickBudgetMillis": 100,
+            "updateSlices": 2
+        })
+
+        updateables = [_Updateable(self.clock, 1) for i in range(4)]
+        for u in updateables:
+            appl.add_updateable(u)
+
+        # First round: Costs unknown, all are updated in one tick
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [1, 1, 1, 1])
+
+        # Next rounds are spread over two ticks
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [2, 2, 1, 1])
+
+        appl.tick()
+        self.assertEqual([u.num_update_calls for u in updateables], [2, 2, 2, 2])
+
+    def test_cost_decay(self):
+        midi = _Midi(self.clock, 0)
+        period = MockPeriodCounter()
+
+        appl = self._create(midi, period)
+
+        u = _Updateable(self.clock, 8)
+        appl.add_updateable(u)
+
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual(u.update_cost, 8)
+
+        # Cheaper updates only decay the estimation slowly
+        u.cost = 0
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual(u.update_cost, 7)
+
+        # More expensive ones raise it immediately
+        u.cost = 20
+        period.exceed_next_time = True
+        appl.tick()
+        self.assertEqual(u.update_cost, 20)
+
+    def test_ui_expanded(self):
+        midi = _Midi(self.clock, 0)
+        period = MockPeriodCounter()
+
+        appl = self._create(midi, period, {
+            "tickBudgetMillis": 10,
+            "tickBudgetSplit": (20, 40, 40)
+        })
+
+        # Updater containing Updateables (like the UiController)
+        class _Ui(Updater, Updateable):
+            def __init__(self):
+                Updater.__init__(self)
+
+        ui = _Ui()
+        elements = [_Updateable(self.clock, 3) for i in range(2)]
+        for e in elements:
+            ui.add_updateable(e)
+
+        appl.add_updateable(ui)
+
+        period.exceed_next_time = True
+        appl.tick()
+        appl.tick()
+        period.exceed_next_time = True
+        appl.tick()
+
+        # The elements are spread over the ticks individually
+        self.assertEqual([e.num_update_calls for e in elements], [2, 1])
+        self.assertEqual(ui.update_cost, 0)
@@ -0,0 +1,149 @@
+import sys
+import unittest
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+
+# Stand-in for the modules imported by the hardware package, which are not used here
+class _AnyModule:
+    def __getattr__(self, name):
+        return name
+
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "board": _AnyModule(),
+    "busio": _AnyModule(),
+    "displayio": _AnyModule(),
+    "fourwire": _AnyModule(),
+    "adafruit_misc.adafruit_st7789": _AnyModule(),
+    "adafruit_misc.neopixel": _AnyModule(),
+    "adafruit_bitmap_font": _AnyModule(),
+    "keypad": MockKeypad,
+    "supervisor": MockSupervisor,
+    "gc": MockGC()
+}):
+    from lib.pyswitch.hardware.adafruit.AdafruitKeypad import AdafruitKeypad, AdafruitKeypadSwitch
+
+
+class TestAdafruitKeypad(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.patcher = patch.dict(AdafruitKeypad.__init__.__globals__, { "get_current_millis": lambda: self.now })
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def _keys(self):
+        return MockKeypad.instances[-1]
+
+    def test_init(self):
+        keypad = AdafruitKeypad(("GP1", "GP2"), debounce_millis = 30, max_events = 10)
+
+        switch_1 = keypad.switch(0)
+        switch_2 = keypad.switch(1)
+
+        self.assertIsInstance(switch_1, AdafruitKeypadSwitch)
+        self.assertEqual(switch_2.index, 1)
+
+        num_instances = len(MockKeypad.instances)
+
+        # Not initialized yet
+        self.assertEqual(switch_1.next_event(), None)
+        self.assertEqual(switch_1.pushed, False)
+
+        switch_1.init()
+        switch_2.init()
+
+        self.assertEqual(len(MockKeypad.instances), num_instances + 1)
+
+        keys = self._keys()
+        self.assertEqual(keys.pins, ("GP1", "GP2"))
+        self.assertEqual(keys.value_when_pressed, False)
+        self.assertEqual(keys.pull, True)
+        self.assertEqual(keys.interval, 0.03)
+        self.assertEqual(keys.max_events, 10)
+
+    def test_events(self):
+        keypad = AdafruitKeypad(("GP1", "GP2", "GP3"))
+        switches = [keypad.switch(i) for i in range(3)]
+
+        for s in switches:
+            s.init()
+
+        keys = self._keys()
+
+        self.assertEqual(switches[0].next_event(), None)
+
+        # Event timestamps are converted to get_current_millis() time
+        self.now = 5000
+        MockSupervisor.ticks = 300
+
+        keys.events.events = [
+            MockKeypad.Event(key_number = 1, pressed = True, timestamp = 250),
+            MockKeypad.Event(key_number = 2, pressed = True, timestamp = 260),
+            MockKeypad.Event(key_number = 1, pressed = False, timestamp = 280)
+        ]
+
+        self.assertEqual(switches[0].next_event(), None)
+
+        self.assertEqual(switches[1].pushed, False)
+        self.assertEqual(switches[2].pushed, True)
+
+        self.assertEqual(switches[1].next_event(), (True, 4950))
+        self.assertEqual(switches[1].next_event(), (False, 4980))
+        self.assertEqual(switches[1].next_event(), None)
+
+        self.assertEqual(switches[2].next_event(), (True, 4960))
+        self.assertEqual(switches[2].next_event(), None)
+
+    def test_ticks_wrap_around(self):
+        keypad = AdafruitKeypad(("GP1",))
+        switch = keypad.switch(0)
+        switch.init()
+
+        self.now = 5000
+        MockSupervisor.ticks = 10
+
+        self._keys().events.events = [
+            MockKeypad.Event(key_number = 0, pressed = True, timestamp = (1 << 29) - 20)
+        ]
+
+        self.assertEqual(switch.next_event(), (True, 4970))
+
+    def test_overflow(self):
+        keypad = AdafruitKeypad(("GP1", "GP2"))
+        switches = [keypad.switch(i) for i in range(2)]
+
+        for s in switches:
+            s.init()
+
+        keys = self._keys()
+
+        self.now = 1000
+        MockSupervisor.ticks = 0
+
+        keys.events.events = [
+            MockKeypad.Event(key_number = 0, pressed = True, timestamp = 0)
+        ]
+
+        self.assertEqual(switches[0].next_event(), (True, 1000))
+
+        # Overflow: Pushed switches are released, and the keypad is reset (which reports the still pushed ones again)
+        self.now = 2000
+        keys.events.events = [
+            MockKeypad.Event(key_number = 1, pressed = True, timestamp = 0)
+        ]
+        keys.events.overflowed = True
+
+        self.assertEqual(switches[1].next_event(), None)
+        self.assertEqual(switches[0].next_event(), (False, 2000))
+
+        self.assertEqual(keypad.num_overflows, 1)
+        self.assertEqual(keys.num_reset_calls, 1)
+        self.assertEqual(keys.events.overflowed, False)
+        self.assertEqual(len(keys.events), 0)
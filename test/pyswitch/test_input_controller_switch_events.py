@@ -0,0 +1,175 @@
+import sys
+import unittest
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "usb_midi": MockUsbMidi(),
+    "adafruit_midi": MockAdafruitMIDI(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+
+    from lib.pyswitch.controller.inputs import SwitchController
+    from lib.pyswitch.misc import PeriodCounter
+
+    from .mocks_appl import MockAction, MockPeriodCounter, MockEventSwitch, MockController
+    from .mocks_callback import *
+
+
+class TestSwitchControllerEvents(unittest.TestCase):
+
+    def test_push_release(self):
+        switch = MockEventSwitch()
+        action_1 = MockAction()
+
+        fs = SwitchController(
+            MockController(),
+            {
+                "assignment": {
+                    "model": switch
+                },
+                "actions": [
+                    action_1
+                ]
+            }
+        )
+
+        # No events
+        fs.process()
+        self.assertEqual(action_1.num_push_calls, 0)
+
+        switch.next_events = [(True, 1000)]
+        fs.process()
+
+        self.assertEqual(action_1.num_push_calls, 1)
+        self.assertEqual(action_1.num_release_calls, 0)
+
+        # Still pushed
+        fs.process()
+        self.assertEqual(action_1.num_push_calls, 1)
+
+        switch.next_events = [(False, 1100)]
+        fs.process()
+
+        self.assertEqual(action_1.num_push_calls, 1)
+        self.assertEqual(action_1.num_release_calls, 1)
+
+        # Short tap between two ticks: Both events are processed
+        switch.next_events = [(True, 1200), (False, 1230)]
+        fs.process()
+
+        self.assertEqual(action_1.num_push_calls, 2)
+        self.assertEqual(action_1.num_release_calls, 2)
+
+        # The switch is never polled
+        self.assertEqual(switch.num_pushed_calls, 0)
+
+    def test_hold_timestamps(self):
+        hold_period = MockPeriodCounter()
+        switch = MockEventSwitch()
+
+        action_1 = MockAction()
+        action_hold = MockAction()
+
+        fs = SwitchController(
+            MockController(),
+            {
+                "assignment": {
+                    "model": switch
+                },
+                "actions": [
+                    action_1
+                ],
+                "actionsHold": [
+                    action_hold
+                ]
+            },
+            hold_period
+        )
+
+        # The hold period starts at the time of the event
+        switch.next_events = [(True, 1000)]
+        fs.process()
+
+        self.assertEqual(hold_period.reset_time, 1000)
+
+        # While pushed, the hold time is checked with the current time
+        hold_period.exceed_next_time = True
+        fs.process()
+
+        self.assertEqual(action_hold.num_push_calls, 1)
+        self.assertEqual(action_1.num_push_calls, 0)
+
+        # On release, the hold time is checked at the time of the event
+        switch.next_events = [(False, 1700)]
+        fs.process()
+
+        self.assertEqual(action_1.num_push_calls, 0)
+
+        switch.next_events = [(True, 2000), (False, 2100)]
+        fs.process()
+
+        self.assertEqual(hold_period.reset_time, 2000)
+        self.assertEqual(hold_period.exceeded_at_time, 2100)
+        self.assertEqual(action_1.num_push_calls, 1)
+        self.assertEqual(action_1.num_release_calls, 1)
+        self.assertEqual(action_hold.num_push_calls, 1)
+
+    def test_late_processing(self):
+        switch = MockEventSwitch()
+
+        action_1 = MockAction()
+        action_hold = MockAction()
+
+        fs = SwitchController(
+            MockController(),
+            {
+                "assignment": {
+                    "model": switch
+                },
+                "actions": [
+                    action_1
+                ],
+                "actionsHold": [
+                    action_hold
+                ],
+                "holdTimeMillis": 600
+            }
+        )
+
+        # Short press which is processed a long time after it happened: Not a hold
+        switch.next_events = [(True, 1000), (False, 1500)]
+        fs.process()
+
+        self.assertEqual(action_1.num_push_calls, 1)
+        self.assertEqual(action_hold.num_push_calls, 0)
+
+        # Long press processed late: Hold
+        switch.next_events = [(True, 3000), (False, 3700)]
+        fs.process()
+
+        self.assertEqual(action_1.num_push_calls, 1)
+        self.assertEqual(action_hold.num_push_calls, 1)
+
+
+class TestPeriodCounterTimestamps(unittest.TestCase):
+
+    def test_reset_exceeded_at(self):
+        period = PeriodCounter(100)
+
+        period.reset(1000)
+
+        self.assertEqual(period.exceeded_at(1050), False)
+        self.assertEqual(period.exceeded_at(1100), False)
+        self.assertEqual(period.exceeded_at(1101), True)
+
+        # Reset to the time passed
+        self.assertEqual(period.exceeded_at(1201), False)
+        self.assertEqual(period.exceeded_at(1202), True)
@@ -43,6 +43,10 @@ class TestKemperBidirectionalProtocol(unittest.TestCase):
         midi = MockMidiController()
         protocol.init(midi, client)
 
+        # Sensing messages must pass the MIDI filter
+        self.assertEqual(len(client.accept_calls), 1)
+        self.assertEqual(client.accept_calls[0].response.manufacturer_id, NRPN_MANUFACTURER_ID)
+
         self.assertEqual(protocol.get_color(), Colors.RED)
 
         exp_msg_init = SystemExclusive(
@@ -100,3 +100,47 @@ class TestKemperRigNameCallback(unittest.TestCase):
                 self.assertEqual(label.text, "3-3")
 
 
+
+
+    def test_skip_unchanged(self):
+        cb = KemperRigNameCallback(
+            show_name = True,
+            show_rig_id = True
+        )
+
+        label = DisplayLabel(
+            layout = {
+                "font": "foo"
+            },
+            callback = cb
+        )
+
+        appl = MockController()
+        ui = MockUiController()
+        label.init(ui, appl)
+
+        KemperMappings.RIG_NAME().value = "foo"
+        KemperMappings.RIG_ID().value = 12
+
+        cb.update_label(label)
+        self.assertEqual(label.text, "3-3 foo")
+
+        text = label.text
+
+        # Same values: The label is not touched
+        cb.update_label(label)
+        self.assertIs(label.text, text)
+
+        # Changed label
+        label.text = "bar"
+        cb.update_label(label)
+        self.assertEqual(label.text, "3-3 foo")
+
+        # Changed values
+        KemperMappings.RIG_ID().value = 13
+        cb.update_label(label)
+        self.assertEqual(label.text, "3-4 foo")
+
+        KemperMappings.RIG_NAME().value = "bar"
+        cb.update_label(label)
+        self.assertEqual(label.text, "3-4 bar")
@@ -16,7 +16,7 @@ with patch.dict(sys.modules, {
     "time": MockTime,
     "gc": MockGC()
 }):
-    from lib.pyswitch.controller.measure import RuntimeMeasurement
+    from lib.pyswitch.controller.measure import RuntimeMeasurement, LatencyHistogram
 
 
 class MockRuntimeMeasurementListener:
@@ -119,3 +119,32 @@ class TestMeasurementRuntime(unittest.TestCase):
 
 
 
+
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_add(self):
+        h = LatencyHistogram(name = "foo")
+
+        self.assertEqual(h.name, "foo")
+        self.assertEqual(h.average, 0)
+
+        h.add(5)
+        h.add(6)
+        h.add(100)
+        h.add(4000)
+
+        self.assertEqual(h.counts, [1, 1, 0, 0, 1, 0, 0, 0, 1])
+        self.assertEqual(h.min, 5)
+        self.assertEqual(h.max, 4000)
+        self.assertEqual(h.calls, 4)
+        self.assertEqual(h.average, 1027)
+
+        h.timeout()
+        self.assertEqual(h.timeouts, 1)
+
+        h.reset()
+        self.assertEqual(h.counts, [0 for i in range(9)])
+        self.assertEqual(h.calls, 0)
+        self.assertEqual(h.timeouts, 0)
@@ -0,0 +1,218 @@
+import sys
+import unittest
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "usb_midi": MockUsbMidi(),
+    "adafruit_midi": MockAdafruitMIDI(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from adafruit_midi.control_change import ControlChange
+    from lib.pyswitch.controller.midi_bridge import MidiBridgeWrapper, MIDI_BRIDGE_MANUFACTURER_ID
+    from lib.pyswitch.controller.midi import MidiFilter
+
+    from .mocks_appl import *
+
+
+class _StopReceiving(Exception):
+    pass
+
+
+class TestMidiBridgeWrapper(unittest.TestCase):
+
+    def setUp(self):
+        self.patcher = patch.dict(sys.modules, {
+            "micropython": MockMicropython,
+            "pymidibridge.PyMidiBridge": MockMidiBridge(),
+            "pymidibridge.MidiBridgeStorageProvider": MockMidiBridgeStorageProvider()
+        })
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_pass_through(self):
+        midi = MockMidiController()
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp")
+
+        msg_cc = ControlChange(1, 2)
+        msg_kemper = SystemExclusive([0x00, 0x20, 0x33], [0x01, 0x02])
+        msg_short_id = SystemExclusive([0x7c], [0x01, 0x02])
+        msg_similar = SystemExclusive([0x00, 0x7c, 0x7e], [0x01, 0x02])
+
+        midi.next_receive_messages = [msg_cc, msg_kemper, msg_short_id, msg_similar]
+
+        self.assertEqual(wrapper.receive(), msg_cc)
+        self.assertEqual(wrapper.receive(), msg_kemper)
+        self.assertEqual(wrapper.receive(), msg_short_id)
+        self.assertEqual(wrapper.receive(), msg_similar)
+        self.assertEqual(wrapper.receive(), None)
+
+        # The bridge has not been loaded
+        self.assertEqual(wrapper.bridge_loaded, False)
+        self.assertEqual(wrapper.num_bridge_messages, 0)
+
+    def test_bridge_messages(self):
+        midi = MockMidiController()
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp")
+
+        msg_bridge = SystemExclusive(MIDI_BRIDGE_MANUFACTURER_ID, [0x01, 0x02])
+        msg_cc = ControlChange(1, 2)
+
+        midi.next_receive_messages = [msg_bridge, msg_cc, msg_bridge]
+
+        self.assertEqual(wrapper.receive(), None)
+        self.assertEqual(wrapper.bridge_loaded, True)
+
+        self.assertEqual(wrapper.receive(), msg_cc)
+        self.assertEqual(wrapper.receive(), None)
+
+        self.assertEqual(wrapper.bridge.messages_received, [msg_bridge, msg_bridge])
+        self.assertEqual(wrapper.num_bridge_messages, 2)
+
+        # Bridge setup
+        self.assertEqual(wrapper.bridge.midi, wrapper)
+        self.assertEqual(wrapper.bridge.event_handler, wrapper)
+        self.assertEqual(wrapper.bridge.storage_factory, wrapper)
+
+        storage = wrapper.bridge.storage_factory.get_storage()
+        self.assertIsInstance(storage, MockMidiBridgeStorageProvider.MidiBridgeStorageProvider)
+        self.assertEqual(storage.temp_file_path, "/tmp")
+
+    def test_windowed_messages(self):
+        midi = MockMidiController()
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp/foo", max_chunk_size = 100, window_size = 3)
+
+        msg_windowed = SystemExclusive(MIDI_BRIDGE_MANUFACTURER_ID, [0x12, 0x00, 0x00, 0x00])
+        msg_bridge = SystemExclusive(MIDI_BRIDGE_MANUFACTURER_ID, [0x01, 0x02])
+
+        midi.next_receive_messages = [msg_windowed, msg_bridge]
+
+        # Windowed transfer messages go to the receiver, not to the bridge
+        self.assertEqual(wrapper.receive(), None)
+        self.assertEqual(wrapper.bridge_loaded, False)
+        self.assertEqual(wrapper.num_bridge_messages, 1)
+
+        self.assertEqual(wrapper.receive(), None)
+        self.assertEqual(wrapper.bridge.messages_received, [msg_bridge])
+        self.assertEqual(wrapper.num_bridge_messages, 2)
+
+        # Receiver setup
+        self.assertEqual(wrapper.windowed._WindowedTransferReceiver__temp_file_path, "/tmp/foo_w")
+        self.assertEqual(wrapper.windowed._WindowedTransferReceiver__max_chunk_size, 100)
+        self.assertEqual(wrapper.windowed._WindowedTransferReceiver__window_size, 3)
+
+    def test_bytes_manufacturer_id(self):
+        midi = MockMidiController()
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp")
+
+        midi.next_receive_messages = [SystemExclusive(bytes(MIDI_BRIDGE_MANUFACTURER_ID), b"\x01")]
+
+        self.assertEqual(wrapper.receive(), None)
+        self.assertEqual(wrapper.num_bridge_messages, 1)
+
+    def test_storage_factory(self):
+        midi = MockMidiController()
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp", storage_factory = lambda: "foo")
+
+        self.assertEqual(wrapper.bridge.storage_factory.get_storage(), "foo")
+
+    def test_mock_matches_library(self):
+        # The parameters of the PyMidiBridge mock must exist in the shipped library (its .mpy file contains the 
+        # parameter names as strings), else the tests would not catch calls with wrong keywords
+        from inspect import signature
+        from os.path import dirname, join
+
+        lib_path = dirname(dirname(dirname(MidiBridgeWrapper.receive.__globals__["__file__"])))
+
+        with open(join(lib_path, "pymidibridge", "PyMidiBridge.mpy"), "rb") as f:
+            mpy = f.read()
+
+        for name in signature(MockMidiBridge.PyMidiBridge.__init__).parameters:
+            if name == "self":
+                continue
+
+            self.assertIn(name.encode(), mpy)
+
+        self.assertNotIn(b"read_chunk_size", mpy)
+
+    def test_send(self):
+        midi = MockMidiController()
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp")
+
+        msg = ControlChange(1, 2)
+        wrapper.send(msg)
+
+        self.assertEqual(midi.messages_sent, [msg])
+
+        wrapper.send_system_exclusive(MIDI_BRIDGE_MANUFACTURER_ID, [0x05, 0x06])
+
+        self.assertEqual(len(midi.messages_sent), 2)
+        self.assertEqual(midi.messages_sent[1].manufacturer_id, MIDI_BRIDGE_MANUFACTURER_ID)
+        self.assertEqual(midi.messages_sent[1].data, [0x05, 0x06])
+
+        self.assertEqual(wrapper.bridge_loaded, False)
+
+    def test_filter(self):
+        midi = MockMidiController()
+        midi.filter = MidiFilter()
+        midi.transmitters = ["foo"]
+
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp")
+
+        self.assertEqual(wrapper.filter, midi.filter)
+        self.assertEqual(wrapper.transmitters, ["foo"])
+
+        self.assertTrue(midi.filter.accepts(SystemExclusive(MIDI_BRIDGE_MANUFACTURER_ID, [0x01])))
+
+    def test_no_filter(self):
+        midi = MockMidiController()
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp")
+
+        self.assertEqual(wrapper.filter, None)
+        self.assertEqual(wrapper.transmitters, [])
+
+    def test_error(self):
+        midi = MockMidiController()
+        wrapper = MidiBridgeWrapper(midi, temp_file_path = "/tmp")
+
+        # The error loop keeps receiving: Stop it by raising on the second call
+        calls = []
+        def receive():
+            calls.append(1)
+            if len(calls) % 2 == 0:
+                raise _StopReceiving()
+        
+        midi.receive = receive
+
+        printed = []
+        sleeps = []
+
+        with patch.dict(MidiBridgeWrapper.error.__globals__, { "do_print": lambda msg: printed.append(msg), "sleep": sleeps.append }):
+            try:
+                raise Exception("foo")
+            except Exception as e:
+                with self.assertRaises(_StopReceiving):
+                    wrapper.error(e)
+
+            self.assertEqual(len(wrapper.bridge.errors), 1)
+            self.assertIn("Exception: foo", wrapper.bridge.errors[0])
+
+            with self.assertRaises(_StopReceiving):
+                wrapper.error("bar")
+
+            self.assertEqual(wrapper.bridge.errors[1], "bar")
+            self.assertEqual(printed, wrapper.bridge.errors)
+
+            # The loop does not spin at full speed
+            self.assertEqual(len(sleeps), 2)
+            self.assertTrue(sleeps[0] > 0)
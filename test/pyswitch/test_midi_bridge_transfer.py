@@ -0,0 +1,305 @@
+import sys
+import unittest
+from os import path, listdir
+from tempfile import TemporaryDirectory
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "gc": MockGC()
+}):
+    from lib.pyswitch.controller.midi_bridge_transfer import *
+    from lib.pyswitch.controller.midi_bridge_transfer import _pack, _unpack, _number_to_bytes, _bytes_to_number, _crc16_update, _crc16_final, _get_checksum
+
+
+_MANUFACTURER_ID = [0x00, 0x7c, 0x7d]
+_ID = _number_to_bytes(0x123456)
+
+
+# CRC as calculated by JsMidiBridge (bitwise, for reference)
+def _reference_crc(data):
+    crc = 0xFFFF
+    for b in data:
+        x = (crc ^ b) & 0xFF
+        for i in range(8):
+            if x & 0x0001:
+                x = (x >> 1) ^ 0x6756
+            else:
+                x >>= 1
+        crc = (crc >> 8) ^ x
+
+    crc = ~crc & 0xFFFF
+    return ((crc << 8) | (crc >> 8)) & 0xFFFF
+
+
+def _message(command, payload):
+    return bytes([command]) + _pack(_crc16_final(_crc16_update(0xFFFF, payload)).to_bytes(2, "big")) + payload
+
+def _start(file_path, content, chunk_size, transmission_id = _ID):
+    return _message(
+        WINDOWED_START,
+        transmission_id + _number_to_bytes(chunk_size) + _number_to_bytes(len(content)) + _pack(_reference_crc(content).to_bytes(2, "big")) + _pack(file_path.encode())
+    )
+
+def _data(index, chunk, transmission_id = _ID):
+    return _message(
+        WINDOWED_DATA,
+        transmission_id + _number_to_bytes(index) + _pack(chunk)
+    )
+
+
+class TestWindowedTransferReceiver(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = TemporaryDirectory()
+        self.sent = []
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _receiver(self, max_chunk_size = 10, window_size = 3):
+        return WindowedTransferReceiver(
+            send = lambda manufacturer_id, data: self.sent.append((manufacturer_id, data)),
+            manufacturer_id = _MANUFACTURER_ID,
+            temp_file_path = path.join(self.dir.name, "tmp"),
+            max_chunk_size = max_chunk_size,
+            window_size = window_size
+        )
+
+    def _target(self):
+        return path.join(self.dir.name, "file.py")
+
+    def _read_target(self):
+        with open(self._target(), "rb") as f:
+            return f.read()
+
+    # Returns the last answer as tuple (command, transmission ID, values)
+    def _answer(self, index = -1):
+        manufacturer_id, data = self.sent[index]
+
+        self.assertEqual(manufacturer_id, _MANUFACTURER_ID)
+        self.assertEqual(_get_checksum(data, 4), _bytes_to_number(data, 1, 3))
+
+        if data[0] == WINDOWED_ACK:
+            return (data[0], data[4:8], [_bytes_to_number(data, 8 + i * 4, 4) for i in range(3)])
+        else:
+            return (data[0], data[4:8], _unpack(data[8:]).decode())
+
+    def test_transfer(self):
+        receiver = self._receiver()
+        content = b"0123456789abcdefghijklmnopqrstuvw"
+
+        receiver.receive(_start(self._target(), content, 10))
+        self.assertEqual(self._answer(), (WINDOWED_ACK, _ID, [0, 10, 3]))
+
+        for i in range(4):
+            receiver.receive(_data(i, content[i * 10:(i + 1) * 10]))
+            self.assertEqual(self._answer(), (WINDOWED_ACK, _ID, [i + 1, 10, 3]))
+
+        self.assertEqual(self._read_target(), content)
+        self.assertEqual(listdir(self.dir.name), ["file.py"])
+
+        self.assertEqual(receiver.num_files, 1)
+        self.assertEqual(receiver.num_chunks, 4)
+        self.assertEqual(receiver.num_rejected, 0)
+
+        # Further data of the finished transmission is ignored
+        receiver.receive(_data(3, content[30:]))
+        self.assertEqual(len(self.sent), 5)
+
+    def test_replace_existing(self):
+        with open(self._target(), "wb") as f:
+            f.write(b"old content")
+
+        receiver = self._receiver()
+
+        receiver.receive(_start(self._target(), b"new", 10))
+        receiver.receive(_data(0, b"new"))
+
+        self.assertEqual(self._read_target(), b"new")
+
+    def test_empty_file(self):
+        receiver = self._receiver()
+
+        receiver.receive(_start(self._target(), b"", 10))
+
+        self.assertEqual(self._answer(), (WINDOWED_ACK, _ID, [0, 10, 3]))
+        self.assertEqual(self._read_target(), b"")
+        self.assertEqual(receiver.num_files, 1)
+
+    def test_chunk_size_limited(self):
+        receiver = self._receiver(max_chunk_size = 4)
+        content = b"0123456789"
+
+        receiver.receive(_start(self._target(), content, 200))
+        self.assertEqual(self._answer(), (WINDOWED_ACK, _ID, [0, 4, 3]))
+
+        receiver.receive(_data(0, b"0123"))
+        receiver.receive(_data(1, b"4567"))
+        receiver.receive(_data(2, b"89"))
+
+        self.assertEqual(self._read_target(), content)
+
+    def test_out_of_order(self):
+        receiver = self._receiver()
+        content = b"0123456789abcdefghij"
+
+        receiver.receive(_start(self._target(), content, 10))
+
+        # Chunk 0 lost: Chunk 1 is rejected and the sender is told to go back to 0
+        receiver.receive(_data(1, content[10:]))
+        self.assertEqual(self._answer(), (WINDOWED_ACK, _ID, [0, 10, 3]))
+        self.assertEqual(receiver.num_rejected, 1)
+
+        receiver.receive(_data(0, content[:10]))
+        receiver.receive(_data(1, content[10:]))
+
+        self.assertEqual(self._read_target(), content)
+        self.assertEqual(receiver.num_rejected, 1)
+
+    def test_corrupted_chunk(self):
+        receiver = self._receiver()
+        content = b"0123456789abcdefghij"
+
+        receiver.receive(_start(self._target(), content, 10))
+
+        corrupted = bytearray(_data(0, content[:10]))
+        corrupted[-1] ^= 0x01
+        receiver.receive(corrupted)
+
+        self.assertEqual(self._answer(), (WINDOWED_ACK, _ID, [0, 10, 3]))
+        self.assertEqual(receiver.num_rejected, 1)
+
+        # Wrong chunk length
+        receiver.receive(_data(0, content[:9]))
+        self.assertEqual(self._answer(), (WINDOWED_ACK, _ID, [0, 10, 3]))
+        self.assertEqual(receiver.num_rejected, 2)
+
+        receiver.receive(_data(0, content[:10]))
+        receiver.receive(_data(1, content[10:]))
+
+        self.assertEqual(self._read_target(), content)
+
+    def test_corrupted_start(self):
+        receiver = self._receiver()
+
+        corrupted = bytearray(_start(self._target(), b"foo", 10))
+        corrupted[-1] ^= 0x01
+        receiver.receive(corrupted)
+
+        self.assertEqual(self.sent, [])
+
+    def test_unknown_transmission(self):
+        receiver = self._receiver()
+
+        receiver.receive(_data(0, b"foo"))
+
+        self.assertEqual(self.sent, [])
+        self.assertEqual(receiver.num_rejected, 0)
+
+    def test_file_checksum_mismatch(self):
+        receiver = self._receiver()
+
+        receiver.receive(_message(
+            WINDOWED_START,
+            _ID + _number_to_bytes(10) + _number_to_bytes(3) + _pack(b"\x00\x00") + _pack(self._target().encode())
+        ))
+        receiver.receive(_data(0, b"foo"))
+
+        self.assertEqual(self._answer(), (WINDOWED_ERROR, _ID, "File checksum mismatch"))
+        self.assertEqual(listdir(self.dir.name), [])
+        self.assertEqual(receiver.num_files, 0)
+
+    def test_invalid_chunk_size(self):
+        receiver = self._receiver()
+
+        receiver.receive(_start(self._target(), b"foo", 0))
+
+        self.assertEqual(self._answer(), (WINDOWED_ERROR, _ID, "Invalid chunk size"))
+
+    def test_resume(self):
+        receiver = self._receiver()
+        content = b"0123456789abcdefghijklmnopqrst"
+
+        receiver.receive(_start(self._target(), content, 10))
+        receiver.receive(_data(0, content[:10]))
+
+        # Sender starts over (with a new transmission ID): Resumed at chunk 1
+        other_id = _number_to_bytes(0x654321)
+
+        receiver.receive(_start(self._target(), content, 10, transmission_id = other_id))
+        self.assertEqual(self._answer(), (WINDOWED_ACK, other_id, [1, 10, 3]))
+
+        # Chunks of the old transmission are ignored now
+        num_sent = len(self.sent)
+        receiver.receive(_data(1, content[10:20]))
+        self.assertEqual(len(self.sent), num_sent)
+
+        receiver.receive(_data(1, content[10:20], transmission_id = other_id))
+        receiver.receive(_data(2, content[20:], transmission_id = other_id))
+
+        self.assertEqual(self._read_target(), content)
+
+    def test_start_other_file(self):
+        receiver = self._receiver()
+
+        receiver.receive(_start(self._target(), b"0123456789abc", 10))
+        receiver.receive(_data(0, b"0123456789"))
+
+        # Different content: Starts from the beginning
+        receiver.receive(_start(self._target(), b"0123456789xyz", 10))
+        self.assertEqual(self._answer(), (WINDOWED_ACK, _ID, [0, 10, 3]))
+
+        receiver.receive(_data(0, b"0123456789"))
+        receiver.receive(_data(1, b"xyz"))
+
+        self.assertEqual(self._read_target(), b"0123456789xyz")
+
+    def test_open_error(self):
+        receiver = WindowedTransferReceiver(
+            send = lambda manufacturer_id, data: self.sent.append((manufacturer_id, data)),
+            manufacturer_id = _MANUFACTURER_ID,
+            temp_file_path = path.join(self.dir.name, "not", "existing")
+        )
+
+        receiver.receive(_start(self._target(), b"foo", 10))
+
+        self.assertEqual(self._answer()[0], WINDOWED_ERROR)
+
+        # No transmission running
+        receiver.receive(_data(0, b"foo"))
+        self.assertEqual(len(self.sent), 1)
+
+
+class TestWindowedTransferHelpers(unittest.TestCase):
+
+    def test_crc(self):
+        for data in [b"", b"a", b"foo bar", bytes(range(256))]:
+            self.assertEqual(_crc16_final(_crc16_update(0xFFFF, data)), _reference_crc(data))
+
+        # Incremental
+        self.assertEqual(
+            _crc16_final(_crc16_update(_crc16_update(0xFFFF, b"foo "), b"bar")),
+            _reference_crc(b"foo bar")
+        )
+
+    def test_pack(self):
+        self.assertEqual(_pack(b""), b"")
+        self.assertEqual(_pack(b"\xff"), b"\x7f\x40")
+        self.assertEqual(_pack(b"\x12\x34\x56"), b"\x09\x0d\x0a\x60")
+
+        for data in [b"\x00", b"\xff\xff", bytes(range(256)), b"abcdefg", b"abcdefgh"]:
+            packed = _pack(data)
+
+            self.assertEqual(len([b for b in packed if b > 0x7f]), 0)
+            self.assertEqual(bytes(_unpack(packed)), data)
+
+    def test_numbers(self):
+        for value in [0, 1, 127, 128, 65, 240, 0xFFFFFF]:
+            packed = _number_to_bytes(value)
+
+            self.assertEqual(len(packed), 4)
+            self.assertEqual(_bytes_to_number(b"\x00" + packed + b"\x00", 1, 4), value)
@@ -17,7 +17,10 @@ with patch.dict(sys.modules, {
 }):
     from adafruit_midi.system_exclusive import SystemExclusive
     from adafruit_midi.midi_message import MIDIUnknownEvent
-    from lib.pyswitch.controller.midi import MidiController, MidiRouting
+    from adafruit_midi.control_change import ControlChange
+    from adafruit_midi.program_change import ProgramChange
+    from lib.pyswitch.controller.midi import MidiController, MidiRouting, MidiFilter, MidiRouteFilter
+    from lib.pyswitch.controller.midi_parser import MidiParser
 
     from.mocks_appl import *
 
@@ -293,3 +296,648 @@ class TestMidiController(unittest.TestCase):
         # Must not throw
         MidiController([])
 
+
+
+
+    def test_raw_routings(self):
+        sub_midi_1 = MockRawMidiDevice()
+        sub_midi_2 = MockRawMidiDevice()
+        sub_midi_3 = MockRawMidiDevice()
+        sub_midi_appl = MockMidiController()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_2,
+                    raw = True
+                ),
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_3,
+                    raw = True
+                ),
+                MidiRouting(
+                    source = sub_midi_appl,
+                    target = MidiRouting.APPLICATION
+                )
+            ],
+            config = {
+                "rawBufferSize": 8
+            }
+        )
+
+        sub_midi_1.next_raw_chunks = [
+            [0xb0, 0x07, 0x40, 0xf8, 0xc0, 0x02]
+        ]
+
+        midi.receive()
+        self.assertEqual(sub_midi_2.raw_written, [bytes([0xb0, 0x07, 0x40, 0xf8, 0xc0, 0x02])])
+        self.assertEqual(sub_midi_3.raw_written, [bytes([0xb0, 0x07, 0x40, 0xf8, 0xc0, 0x02])])
+        self.assertEqual(sub_midi_1.num_read_raw_calls, 1)
+
+        # Messages are not decoded
+        self.assertEqual(sub_midi_2.messages_sent, [])
+
+        # SysEx spanning several reads is forwarded in one go
+        sub_midi_2.raw_written = []
+        sub_midi_1.num_read_raw_calls = 0
+        sub_midi_1.next_raw_chunks = [
+            [0xf0, 0x00, 0x20, 0x33],
+            [0x01, 0x02, 0xf8, 0x03],
+            [0x04, 0xf7],
+            [0x90, 0x40, 0x40]
+        ]
+
+        midi.receive()
+        self.assertEqual(sub_midi_2.raw_written, [
+            bytes([0xf0, 0x00, 0x20, 0x33]),
+            bytes([0x01, 0x02, 0xf8, 0x03]),
+            bytes([0x04, 0xf7])
+        ])
+        self.assertEqual(sub_midi_1.num_read_raw_calls, 3)
+
+        midi.receive()
+        self.assertEqual(sub_midi_2.raw_written[-1], bytes([0x90, 0x40, 0x40]))
+
+
+    def test_raw_routings_sysex_limit(self):
+        sub_midi_1 = MockRawMidiDevice()
+        sub_midi_2 = MockRawMidiDevice()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_2,
+                    raw = True
+                )
+            ]
+        )
+
+        sub_midi_1.next_raw_chunks = [[0xf0]] + [[0x01] for i in range(20)]
+
+        midi.receive()
+        self.assertEqual(sub_midi_1.num_read_raw_calls, MidiController.MAX_RAW_SYSEX_READS)
+
+
+    def test_raw_routings_invalid(self):
+        sub_midi_1 = MockRawMidiDevice()
+        sub_midi_2 = MockRawMidiDevice()
+
+        with self.assertRaises(Exception):
+            MidiController(
+                routings = [
+                    MidiRouting(
+                        source = sub_midi_1,
+                        target = MidiRouting.APPLICATION,
+                        raw = True
+                    )
+                ]
+            )
+
+        with self.assertRaises(Exception):
+            MidiController(
+                routings = [
+                    MidiRouting(
+                        source = sub_midi_1,
+                        target = sub_midi_2,
+                        raw = True
+                    ),
+                    MidiRouting(
+                        source = sub_midi_1,
+                        target = MidiRouting.APPLICATION
+                    )
+                ]
+            )
+
+        # Application sends to the target
+        with self.assertRaises(Exception):
+            MidiController(
+                routings = [
+                    MidiRouting(
+                        source = sub_midi_1,
+                        target = sub_midi_2,
+                        raw = True
+                    ),
+                    MidiRouting(
+                        source = MidiRouting.APPLICATION,
+                        target = sub_midi_2
+                    )
+                ]
+            )
+
+        # Two raw sources send to the same target
+        sub_midi_3 = MockRawMidiDevice()
+
+        with self.assertRaises(Exception):
+            MidiController(
+                routings = [
+                    MidiRouting(
+                        source = sub_midi_1,
+                        target = sub_midi_2,
+                        raw = True
+                    ),
+                    MidiRouting(
+                        source = sub_midi_3,
+                        target = sub_midi_2,
+                        raw = True
+                    )
+                ]
+            )
+
+        # Another source sends decoded messages to the target
+        with self.assertRaises(Exception):
+            MidiController(
+                routings = [
+                    MidiRouting(
+                        source = sub_midi_3,
+                        target = sub_midi_2
+                    ),
+                    MidiRouting(
+                        source = sub_midi_1,
+                        target = sub_midi_2,
+                        raw = True
+                    )
+                ]
+            )
+
+        # One raw source to several targets is fine
+        MidiController(
+            routings = [
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_2,
+                    raw = True
+                ),
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_3,
+                    raw = True
+                )
+            ]
+        )
+
+
+
+    def test_external_routings_drain(self):
+        sub_midi_1 = MockMidiController()
+        sub_midi_2 = MockMidiController()
+        sub_midi_3 = MockMidiController()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_3
+                ),
+                MidiRouting(
+                    source = sub_midi_2,
+                    target = sub_midi_3
+                )
+            ],
+            config = {
+                "maxThruMessages": 3
+            }
+        )
+
+        messages_1 = [ControlChange(i, 1) for i in range(5)]
+        messages_2 = [ControlChange(i, 2) for i in range(2)]
+
+        sub_midi_1.next_receive_messages = list(messages_1)
+        sub_midi_2.next_receive_messages = list(messages_2)
+
+        midi.receive()
+        self.assertEqual(sub_midi_3.messages_sent, messages_1[:3] + messages_2)
+        self.assertEqual(midi.thru_backlog, 0)
+
+        # Messages of source 1 have been left waiting
+        midi.receive()
+        self.assertEqual(sub_midi_3.messages_sent, messages_1[:3] + messages_2 + messages_1[3:])
+        self.assertEqual(midi.thru_backlog, 1)
+
+        # Exactly the limit: Nothing left waiting
+        sub_midi_1.next_receive_messages = list(messages_1[:3])
+
+        midi.receive()
+        midi.receive()
+        self.assertEqual(midi.thru_backlog, 1)
+
+
+    def test_external_routings_budget(self):
+        sub_midi_1 = MockMidiController()
+        sub_midi_2 = MockMidiController()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_2
+                )
+            ],
+            config = {
+                "maxThruMessages": 100,
+                "thruBudgetMillis": 3
+            }
+        )
+
+        messages = [ControlChange(i, 1) for i in range(10)]
+        sub_midi_1.next_receive_messages = list(messages)
+
+        # Every call to get the time takes one millisecond
+        time = [0]
+        def get_current_millis():
+            time[0] += 1
+            return time[0]
+
+        with patch.dict(MidiController.__init__.__globals__, { "get_current_millis": get_current_millis }):
+            midi.receive()
+        
+            self.assertEqual(sub_midi_2.messages_sent, messages[:3])
+            self.assertEqual(midi.thru_backlog, 0)
+
+            midi.receive()
+
+        self.assertEqual(sub_midi_2.messages_sent, messages[:6])
+        self.assertEqual(midi.thru_backlog, 1)
+
+
+    def test_appl_and_external_routing(self):
+        sub_midi_1 = MockMidiController()
+        sub_midi_2 = MockMidiController()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_2
+                ),
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = MidiRouting.APPLICATION
+                )
+            ]
+        )
+
+        messages = [ControlChange(i, 1) for i in range(3)] + [MIDIUnknownEvent(0x01)]
+        sub_midi_1.next_receive_messages = list(messages)
+
+        # All messages arrive at the application and are forwarded to the external target, too
+        self.assertEqual(midi.receive(), messages[0])
+        self.assertEqual(midi.receive(), messages[1])
+        self.assertEqual(midi.receive(), messages[2])
+        self.assertEqual(midi.receive(), messages[3])
+        self.assertEqual(midi.receive(), None)
+
+        self.assertEqual(sub_midi_2.messages_sent, messages[:3])
+
+
+
+    def test_filter_disabled(self):
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = MockMidiController(),
+                    target = MidiRouting.APPLICATION
+                )
+            ]
+        )
+
+        self.assertEqual(midi.filter, None)
+
+
+    def test_filter(self):
+        sub_midi_1 = MockMidiController()
+        sub_midi_2 = MockMidiController()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = MidiRouting.APPLICATION
+                ),
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_2
+                )
+            ],
+            config = {
+                "filterMessages": True
+            }
+        )
+
+        self.assertIsInstance(midi.filter, MidiFilter)
+
+        midi.filter.add_message(ControlChange(7, 0))
+        midi.filter.add_message(SystemExclusive([0x00, 0x20, 0x33], [0x01]))
+
+        messages = [
+            ProgramChange(1),
+            ControlChange(8, 1),
+            SystemExclusive([0x00, 0x20, 0x34], [0x01]),
+            SystemExclusive([0x00, 0x20, 0x33], [0x02]),
+            MIDIUnknownEvent(0xF8)
+        ]
+        sub_midi_1.next_receive_messages = list(messages)
+
+        self.assertEqual(midi.receive(), messages[1])
+        self.assertEqual(midi.receive(), messages[3])
+        self.assertEqual(midi.receive(), None)
+
+        self.assertEqual(midi.filter.num_dropped, 3)
+        self.assertEqual(midi.filter.dropped, 3)
+
+        # Dropped messages are still forwarded to external targets
+        self.assertEqual(sub_midi_2.messages_sent, messages[:4])
+
+
+    def test_filter_parser(self):
+        class MockParserDevice(MockMidiController):
+            def __init__(self):
+                super().__init__()
+                self.parser = MidiParser()
+                self.data = []
+
+            def receive(self):
+                self.parser.feed(self.data)
+                self.data = []
+                return self.parser.parse()
+                
+        device = MockParserDevice()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = device,
+                    target = MidiRouting.APPLICATION
+                )
+            ],
+            config = {
+                "filterMessages": True
+            }
+        )
+
+        # Nothing is accepted yet
+        self.assertEqual(device.parser.accepts(0xB0), False)
+
+        midi.filter.add_mapping(MockParameterMapping(
+            response = [
+                ControlChange(7, 0),
+                SystemExclusive([0x00, 0x20, 0x33], [0x01])
+            ]
+        ))
+
+        self.assertEqual(device.parser.accepts(0xB0), True)
+        self.assertEqual(device.parser.accepts(0xC0), False)
+        self.assertEqual(device.parser.accepts(0xF0), True)
+
+        device.data = [
+            0xc0, 0x01, 
+            0xf0, 0x00, 0x20, 0x34, 0x01, 0xf7, 
+            0xf8,
+            0xb0, 0x07, 0x05
+        ]
+
+        msg = midi.receive()
+        self.assertEqual((msg.control, msg.value), (7, 5))
+
+        device.data = [0xf0, 0x00, 0x20, 0x33, 0x02, 0xf7]
+
+        msg = midi.receive()
+        self.assertEqual(msg.data, bytes([0x02]))
+
+        self.assertEqual(midi.receive(), None)
+
+        # Dropped in the parser
+        self.assertEqual(midi.filter.num_dropped, 0)
+        self.assertEqual(midi.filter.dropped, 3)
+
+
+    def test_parser_no_reuse_when_forwarded(self):
+        class MockParserDevice(MockMidiController):
+            def __init__(self):
+                super().__init__()
+                self.parser = MidiParser()
+                self.data = []
+
+            def receive(self):
+                self.parser.feed(self.data)
+                self.data = []
+                return self.parser.parse()
+                
+        device_appl = MockParserDevice()
+        device_thru = MockParserDevice()
+        device_appl_only = MockParserDevice()
+        target = MockMidiController()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = device_appl,
+                    target = MidiRouting.APPLICATION
+                ),
+                MidiRouting(
+                    source = device_appl,
+                    target = target
+                ),
+                MidiRouting(
+                    source = device_thru,
+                    target = target
+                ),
+                MidiRouting(
+                    source = device_appl_only,
+                    target = MidiRouting.APPLICATION
+                )
+            ],
+            config = {
+                "maxThruMessages": 3
+            }
+        )
+
+        self.assertEqual(device_appl.parser.reuse_messages, False)
+        self.assertEqual(device_thru.parser.reuse_messages, False)
+        self.assertEqual(device_appl_only.parser.reuse_messages, True)
+
+        # Targets keeping the messages (like transmit queues) must not see them changed afterwards
+        device_thru.data = [0xb0, 0x01, 0x0a, 0x02, 0x14, 0x03, 0x1e]
+        midi.receive()
+
+        self.assertEqual([(m.control, m.value) for m in target.messages_sent], [(1, 10), (2, 20), (3, 30)])
+
+
+
+    def _filtered_routing(self, filter, chunks):
+        sub_midi_1 = MockRawMidiDevice()
+        sub_midi_2 = MockRawMidiDevice()
+        sub_midi_3 = MockRawMidiDevice()
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_2,
+                    raw = True,
+                    filter = filter
+                ),
+                MidiRouting(
+                    source = sub_midi_1,
+                    target = sub_midi_3,
+                    raw = True
+                )
+            ],
+            config = {
+                "rawBufferSize": 16
+            }
+        )
+
+        for chunk in chunks:
+            sub_midi_1.next_raw_chunks = [chunk]
+            midi.receive()
+
+        # Unfiltered routing gets everything
+        self.assertEqual(sub_midi_3.raw_written, [bytes(c) for c in chunks])
+
+        return sub_midi_2.raw_written
+
+
+    def test_route_filter_statuses(self):
+        written = self._filtered_routing(
+            filter = MidiRouteFilter(
+                statuses = [0xB0, 0xF8]
+            ),
+            chunks = [
+                [0xb0, 0x07, 0x40, 0xc0, 0x02, 0xf8, 0x90, 0x40, 0x40, 0xf2, 0x01, 0x02, 0xb3, 0x01, 0x02],
+                [0xc0, 0x01]
+            ]
+        )
+
+        self.assertEqual(written, [
+            bytes([0xb0, 0x07, 0x40, 0xf8, 0xb3, 0x01, 0x02])
+        ])
+
+
+    def test_route_filter_channels(self):
+        written = self._filtered_routing(
+            filter = MidiRouteFilter(
+                channels = {
+                    0: 5,
+                    1: None
+                }
+            ),
+            chunks = [
+                [0xb0, 0x07, 0x40, 0xb1, 0x01, 0x02, 0xc0, 0x03, 0xb2, 0x04, 0x05]
+            ]
+        )
+
+        self.assertEqual(written, [
+            bytes([0xb5, 0x07, 0x40, 0xc5, 0x03, 0xb2, 0x04, 0x05])
+        ])
+
+
+    def test_route_filter_control_changes(self):
+        written = self._filtered_routing(
+            filter = MidiRouteFilter(
+                control_changes = [
+                    (7, 7, None),
+                    (10, 12, 20)
+                ]
+            ),
+            chunks = [
+                # Running status
+                [0xb0, 0x07, 0x40, 0x0a, 0x01, 0x0b, 0x02, 0x0d, 0x03],
+
+                # Message spanning reads, with real time message in between
+                [0xb1, 0x0c],
+                [0xf8, 0x04],
+
+                # Program changes are not affected
+                [0xc0, 0x07]
+            ]
+        )
+
+        self.assertEqual(written, [
+            bytes([0xb0, 0x14, 0x01, 0xb0, 0x15, 0x02, 0xb0, 0x0d, 0x03]),
+            bytes([0xf8, 0xb1, 0x16, 0x04]),
+            bytes([0xc0, 0x07])
+        ])
+
+
+    def test_route_filter_status_always_written(self):
+        written = self._filtered_routing(
+            filter = MidiRouteFilter(
+                statuses = [0xB0]
+            ),
+            chunks = [
+                [0xb0, 0x01, 0x02],
+                [0xb0, 0x03, 0x04]
+            ]
+        )
+
+        # No running status across reads (other routings might write to the target in between)
+        self.assertEqual(written, [
+            bytes([0xb0, 0x01, 0x02]),
+            bytes([0xb0, 0x03, 0x04])
+        ])
+
+
+    def test_route_filter_running_status_output_size(self):
+        # Worst case: Program changes with running status, every one gets its status byte
+        written = self._filtered_routing(
+            filter = MidiRouteFilter(
+                statuses = [0xC0]
+            ),
+            chunks = [
+                [0xc0] + [0x01] * 15
+            ]
+        )
+
+        self.assertEqual(written, [
+            bytes([0xc0, 0x01] * 15)
+        ])
+
+
+    def test_route_filter_manufacturers(self):
+        written = self._filtered_routing(
+            filter = MidiRouteFilter(
+                manufacturers = [
+                    [0x00, 0x20, 0x33],
+                    [0x41]
+                ]
+            ),
+            chunks = [
+                [0xf0, 0x00, 0x20, 0x33, 0x01, 0xf7, 0xf0, 0x42, 0x01, 0xf7, 0xf0, 0x41, 0x02, 0xf7],
+                [0xf0, 0x00],
+                [0x20, 0x33, 0x03],
+                [0x04, 0xf7, 0xf0, 0x00, 0x20, 0x34, 0x05, 0xf7, 0xb0, 0x01, 0x02]
+            ]
+        )
+
+        self.assertEqual(written, [
+            bytes([0xf0, 0x00, 0x20, 0x33, 0x01, 0xf7, 0xf0, 0x41, 0x02, 0xf7]),
+            bytes([0xf0, 0x00, 0x20, 0x33, 0x03]),
+            bytes([0x04, 0xf7, 0xb0, 0x01, 0x02])
+        ])
+
+
+    def test_route_filter_invalid(self):
+        with self.assertRaises(Exception):
+            MidiController(
+                routings = [
+                    MidiRouting(
+                        source = MockRawMidiDevice(),
+                        target = MockRawMidiDevice(),
+                        filter = MidiRouteFilter(statuses = [0xB0])
+                    )
+                ]
+            )
+
+        with self.assertRaises(Exception):
+            MidiController(
+                routings = [
+                    MidiRouting(
+                        source = MockRawMidiDevice(),
+                        target = MidiRouting.APPLICATION,
+                        filter = MidiRouteFilter(statuses = [0xB0])
+                    )
+                ]
+            )
@@ -0,0 +1,299 @@
+import sys
+import unittest
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from adafruit_midi.control_change import ControlChange
+    from adafruit_midi.program_change import ProgramChange
+    from adafruit_midi.midi_message import MIDIUnknownEvent
+    from lib.pyswitch.controller.midi_parser import MidiParser
+
+
+class MockPort:
+    def __init__(self):
+        self.chunks = []
+        self.num_readinto_calls = 0
+
+    def readinto(self, buffer):
+        self.num_readinto_calls += 1
+
+        if not self.chunks:
+            return None
+        
+        chunk = self.chunks[0]
+        num = min(len(buffer), len(chunk))
+        
+        buffer[:num] = bytes(chunk[:num])
+        
+        if num < len(chunk):
+            self.chunks[0] = chunk[num:]
+        else:
+            self.chunks.pop(0)
+
+        return num
+
+
+class TestMidiParser(unittest.TestCase):
+
+    def test_control_change(self):
+        parser = MidiParser()
+        port = MockPort()
+        
+        port.chunks = [[0xb3, 0x07, 0x40]]
+
+        msg = parser.receive(port)
+        self.assertIsInstance(msg, ControlChange)
+        self.assertEqual(msg.control, 0x07)
+        self.assertEqual(msg.value, 0x40)
+        self.assertEqual(msg.channel, 3)
+
+        self.assertEqual(parser.receive(port), None)
+        self.assertEqual(parser.num_messages, 1)
+
+
+    def test_running_status(self):
+        parser = MidiParser()
+        port = MockPort()
+        
+        port.chunks = [[0xb0, 0x07, 0x40, 0x08, 0x41, 0x09], [0x42, 0xc1, 0x05, 0x06]]
+
+        msg = parser.receive(port)
+        self.assertEqual((msg.control, msg.value), (0x07, 0x40))
+
+        msg_2 = parser.receive(port)
+        self.assertEqual((msg_2.control, msg_2.value), (0x08, 0x41))
+
+        # Same instance every time
+        self.assertIs(msg_2, msg)
+
+        msg = parser.receive(port)
+        self.assertEqual((msg.control, msg.value), (0x09, 0x42))
+
+        msg = parser.receive(port)
+        self.assertIsInstance(msg, ProgramChange)
+        self.assertEqual((msg.patch, msg.channel), (0x05, 1))
+
+        msg = parser.receive(port)
+        self.assertEqual(msg.patch, 0x06)
+
+        self.assertEqual(parser.receive(port), None)
+
+
+    def test_no_reuse(self):
+        parser = MidiParser()
+        parser.reuse_messages = False
+        port = MockPort()
+        
+        port.chunks = [[0xb0, 0x07, 0x40, 0x08, 0x41, 0xc1, 0x05, 0x06]]
+
+        msg_1 = parser.receive(port)
+        msg_2 = parser.receive(port)
+        msg_3 = parser.receive(port)
+        msg_4 = parser.receive(port)
+
+        self.assertIsNot(msg_1, msg_2)
+        self.assertIsNot(msg_3, msg_4)
+
+        self.assertEqual((msg_1.control, msg_1.value, msg_1.channel), (0x07, 0x40, 0))
+        self.assertEqual((msg_2.control, msg_2.value, msg_2.channel), (0x08, 0x41, 0))
+        self.assertEqual((msg_3.patch, msg_3.channel), (0x05, 1))
+        self.assertEqual((msg_4.patch, msg_4.channel), (0x06, 1))
+
+
+    def test_sysex(self):
+        parser = MidiParser()
+        port = MockPort()
+        
+        # Spanning several reads, with a real time message inside
+        port.chunks = [
+            [0xf0, 0x00, 0x20],
+            [0x33, 0x02, 0xf8, 0x7f, 0x01],
+            [0x00, 0xf7, 0xf0, 0x41, 0x01, 0x02, 0xf7]
+        ]
+
+        self.assertEqual(parser.receive(port), None)
+        self.assertEqual(parser.receive(port), None)
+
+        msg = parser.receive(port)
+        self.assertIsInstance(msg, SystemExclusive)
+        self.assertEqual(msg.manufacturer_id, bytes([0x00, 0x20, 0x33]))
+        self.assertEqual(msg.data, bytes([0x02, 0x7f, 0x01, 0x00]))
+
+        msg = parser.receive(port)
+        self.assertEqual(msg.manufacturer_id, bytes([0x41]))
+        self.assertEqual(msg.data, bytes([0x01, 0x02]))
+
+        self.assertEqual(parser.num_skipped, 1)
+
+
+    def test_sysex_manufacturer_id_reused(self):
+        parser = MidiParser()
+        port = MockPort()
+        
+        port.chunks = [
+            [0xf0, 0x00, 0x20, 0x33, 0x02, 0xf7, 0xf0, 0x00, 0x20, 0x33, 0x03, 0xf7, 0xf0, 0x00, 0x20, 0x34, 0x03, 0xf7]
+        ]
+
+        msg_1 = parser.receive(port)
+        msg_2 = parser.receive(port)
+        msg_3 = parser.receive(port)
+
+        self.assertIs(msg_1.manufacturer_id, msg_2.manufacturer_id)
+        self.assertEqual(msg_3.manufacturer_id, bytes([0x00, 0x20, 0x34]))
+
+
+    def test_sysex_overflow(self):
+        parser = MidiParser(sysex_size = 4)
+        port = MockPort()
+        
+        port.chunks = [
+            [0xf0, 0x00, 0x20, 0x33, 0x02, 0x03, 0xf7, 0xf0, 0x00, 0x20, 0x33, 0x04, 0xf7]
+        ]
+
+        msg = parser.receive(port)
+        self.assertEqual(msg.data, bytes([0x04]))
+        self.assertEqual(parser.num_overflows, 1)
+
+
+    def test_sysex_unterminated(self):
+        parser = MidiParser()
+        port = MockPort()
+        
+        port.chunks = [
+            [0xf0, 0x00, 0x20, 0x33, 0xb0, 0x01, 0x02, 0xf7]
+        ]
+
+        msg = parser.receive(port)
+        self.assertEqual((msg.control, msg.value), (0x01, 0x02))
+        self.assertEqual(parser.receive(port), None)
+
+
+    def test_accept(self):
+        parser = MidiParser()
+        port = MockPort()
+        
+        # Note on, clock, CC, pitch bend, tune request, song position, PC
+        port.chunks = [
+            [0x90, 0x40, 0x7f, 0xf8, 0xb0, 0x01, 0x02, 0xe0, 0x00, 0x40, 0xf6, 0xf2, 0x01, 0x02, 0xc0, 0x03]
+        ]
+
+        msg = parser.receive(port)
+        self.assertIsInstance(msg, ControlChange)
+
+        msg = parser.receive(port)
+        self.assertIsInstance(msg, ProgramChange)
+
+        self.assertEqual(parser.num_skipped, 5)
+
+        # Accept other kinds
+        parser.set_accept([0x90, 0xf8])
+        self.assertEqual(parser.accepts(0x90), True)
+        self.assertEqual(parser.accepts(0xb0), False)
+
+        port.chunks = [
+            [0x90, 0x40, 0x7f, 0xb0, 0x01, 0x02, 0xf8]
+        ]
+
+        msg = parser.receive(port)
+        self.assertIsInstance(msg, MIDIUnknownEvent)
+        self.assertEqual(msg.status, 0x90)
+
+        msg = parser.receive(port)
+        self.assertIsInstance(msg, MIDIUnknownEvent)
+        self.assertEqual(msg.status, 0xf8)
+
+        self.assertEqual(parser.receive(port), None)
+
+
+    def test_in_channel(self):
+        parser = MidiParser(in_channel = 2)
+        port = MockPort()
+        
+        port.chunks = [
+            [0xb0, 0x01, 0x02, 0xb2, 0x03, 0x04, 0xb5, 0x05, 0x06]
+        ]
+
+        msg = parser.receive(port)
+        self.assertEqual((msg.control, msg.channel), (0x03, 2))
+        self.assertEqual(parser.receive(port), None)
+
+        parser.in_channel = (0, 5)
+        self.assertEqual(parser.in_channel, (0, 5))
+        
+        port.chunks = [
+            [0xb0, 0x01, 0x02, 0xb2, 0x03, 0x04, 0xb5, 0x05, 0x06]
+        ]
+
+        self.assertEqual(parser.receive(port).channel, 0)
+        self.assertEqual(parser.receive(port).channel, 5)
+        self.assertEqual(parser.receive(port), None)
+
+
+    def test_ring_buffer(self):
+        parser = MidiParser(buffer_size = 4)
+        port = MockPort()
+        
+        port.chunks = [
+            [0xb0, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0xc0, 0x07]
+        ]
+
+        # The buffer wraps around: Bytes are read as space becomes available
+        results = []
+        for i in range(10):
+            msg = parser.receive(port)
+            if msg:
+                results.append((msg.__class__.__name__, msg.patch if isinstance(msg, ProgramChange) else msg.control))
+
+        self.assertEqual(results, [("ControlChange", 0x01), ("ControlChange", 0x03), ("ControlChange", 0x05), ("ProgramChange", 0x07)])
+
+
+    def test_feed(self):
+        parser = MidiParser(buffer_size = 4)
+
+        self.assertEqual(parser.feed([0xb0, 0x01, 0x02, 0xb0, 0x03]), 4)
+        
+        msg = parser.parse()
+        self.assertEqual(msg.control, 0x01)
+
+        self.assertEqual(parser.parse(), None)
+        self.assertEqual(parser.feed([0x03, 0x04]), 2)
+        self.assertEqual(parser.parse().control, 0x03)
+
+
+
+    def test_accept_manufacturers(self):
+        parser = MidiParser()
+        parser.set_accept_manufacturers([[0x00, 0x20, 0x33], [0x41]])
+
+        parser.feed([
+            0xf0, 0x00, 0x20, 0x34, 0x01, 0x02, 0xf7, 
+            0xf0, 0x42, 0x01, 0xf7, 
+            0xf0, 0x41, 0x03, 0xf7
+        ])
+
+        msg = parser.parse()
+        self.assertEqual(msg.manufacturer_id, bytes([0x41]))
+        self.assertEqual(parser.parse(), None)
+        self.assertEqual(parser.num_skipped, 2)
+
+        parser.feed([0xf0, 0x00, 0x20, 0x33, 0x04, 0xf7])
+        
+        msg = parser.parse()
+        self.assertEqual(msg.data, bytes([0x04]))
+
+        # All
+        parser.set_accept_manufacturers(None)
+
+        parser.feed([0xf0, 0x42, 0x01, 0xf7])
+        self.assertEqual(parser.parse().manufacturer_id, bytes([0x42]))
@@ -0,0 +1,199 @@
+import sys
+import unittest
+from os import remove
+from tempfile import mkstemp
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from adafruit_midi.control_change import ControlChange
+    from adafruit_midi.program_change import ProgramChange
+    from adafruit_midi.midi_message import MIDIUnknownEvent
+    from lib.pyswitch.controller.midi_recorder import *
+    from lib.pyswitch.controller.midi_recorder import _write_number, _read_number
+
+    from .mocks_appl import *
+
+
+class TestMidiRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.time = 1000
+
+        self.patcher = patch.dict(MidiRecorder.__init__.__globals__, { 
+            "get_current_millis": lambda: self.time 
+        })
+        self.patcher.start()
+
+        fd, self.path = mkstemp()
+
+    def tearDown(self):
+        self.patcher.stop()
+        remove(self.path)
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_record(self):
+        midi = MockMidiController()
+        recorder = MidiRecorder(midi, self.path, flush_interval_millis = 0)
+
+        self.assertEqual(self.read(), RECORDING_HEADER)
+
+        msg_sysex = SystemExclusive([0x00, 0x20, 0x33], [0x01, 0x02, 0x03])
+        msg_cc = ControlChange(7, 100)
+        msg_cc.channel = 2
+        msg_pc = ProgramChange(5)
+
+        self.time = 1010
+        midi.next_receive_messages.append(msg_sysex)
+        self.assertEqual(recorder.receive(), msg_sysex)
+
+        self.time = 1300
+        recorder.send(msg_cc)
+        self.assertEqual(midi.messages_sent, [msg_cc])
+
+        self.time = 1300
+        recorder.send(msg_pc)
+
+        self.time = 1400
+        midi.next_receive_messages.append(MIDIUnknownEvent(0xf8))
+        recorder.receive()
+
+        # Nothing received: Not recorded
+        self.assertEqual(recorder.receive(), None)
+
+        self.assertEqual(recorder.num_events, 4)
+        self.assertEqual(self.read(), RECORDING_HEADER)
+
+        recorder.flush()
+
+        self.assertEqual(read_recording(self.read()), [
+            (10, RECORDING_IN, bytes([0xf0, 0x00, 0x20, 0x33, 0x01, 0x02, 0x03, 0xf7])),
+            (300, RECORDING_OUT, bytes([0xb2, 7, 100])),
+            (300, RECORDING_OUT, bytes([0xc0, 5])),
+            (400, RECORDING_IN, bytes([0xf8]))
+        ])
+
+        self.assertEqual(recorder.num_bytes, len(self.read()))
+
+        # Flushing again appends nothing
+        recorder.flush()
+        self.assertEqual(len(read_recording(self.read())), 4)
+
+    def test_record_other_types(self):
+        class MockPitchBend:
+            def __init__(self, pitch_bend):
+                self.pitch_bend = pitch_bend
+
+            def __bytes__(self):
+                return bytes([0xe0, self.pitch_bend & 0x7f, self.pitch_bend >> 7])
+            
+        midi = MockMidiController()
+        recorder = MidiRecorder(midi, self.path, flush_interval_millis = 0)
+
+        recorder.send(MockPitchBend(8192))
+        recorder.flush()
+
+        # All data bytes are recorded
+        self.assertEqual(read_recording(self.read()), [
+            (0, RECORDING_OUT, bytes([0xe0, 0x00, 0x40]))
+        ])
+
+    def test_flush_when_full(self):
+        midi = MockMidiController()
+        recorder = MidiRecorder(midi, self.path, buffer_size = 20, flush_interval_millis = 0)
+
+        recorder.send(ControlChange(1, 2))
+        recorder.send(ControlChange(3, 4))
+        self.assertEqual(self.read(), RECORDING_HEADER)
+
+        # Does not fit anymore: The buffer is written first
+        recorder.send(ControlChange(5, 6))
+        self.assertEqual(len(read_recording(self.read())), 2)
+
+        # Messages larger than the buffer are skipped
+        recorder.send(SystemExclusive([0x00, 0x20, 0x33], [0x00] * 20))
+        self.assertEqual(recorder.num_skipped, 1)
+        self.assertEqual(len(midi.messages_sent), 4)
+
+        recorder.flush()
+
+        events = read_recording(self.read())
+        self.assertEqual(len(events), 3)
+        self.assertEqual(events[2][2], bytes([0xb0, 5, 6]))
+
+    def test_flush_interval(self):
+        period = MockPeriodCounter()
+
+        with patch.dict(MidiRecorder.__init__.__globals__, { "PeriodCounter": lambda interval: period }):
+            midi = MockMidiController()
+            recorder = MidiRecorder(midi, self.path)
+
+        recorder.send(ControlChange(1, 2))
+
+        # Flushed only when nothing has been received
+        period.exceed_next_time = True
+        midi.next_receive_messages.append(ControlChange(3, 4))
+        recorder.receive()
+        self.assertEqual(self.read(), RECORDING_HEADER)
+
+        period.exceed_next_time = True
+        recorder.receive()
+        self.assertEqual(len(read_recording(self.read())), 2)
+
+    def test_write_error(self):
+        midi = MockMidiController()
+
+        printed = []
+        with patch.dict(MidiRecorder.__init__.__globals__, { "do_print": printed.append }):
+            recorder = MidiRecorder(midi, "/not/existing/path/recording.bin")
+
+        self.assertEqual(len(printed), 1)
+        self.assertTrue(printed[0].startswith("MIDI recording stopped"))
+
+        # Recording is disabled, the messages are still passed
+        recorder.send(ControlChange(1, 2))
+        recorder.flush()
+
+        self.assertEqual(recorder.num_events, 0)
+        self.assertEqual(recorder.num_bytes, 0)
+        self.assertEqual(len(midi.messages_sent), 1)
+
+    def test_forward_properties(self):
+        midi = MockMidiController()
+        recorder = MidiRecorder(midi, self.path)
+
+        self.assertEqual(recorder.filter, None)
+        self.assertEqual(recorder.transmitters, [])
+
+        midi.filter = "foo"
+        midi.transmitters = ["bar"]
+
+        self.assertEqual(recorder.filter, "foo")
+        self.assertEqual(recorder.transmitters, ["bar"])
+
+    def test_numbers(self):
+        buffer = bytearray(8)
+
+        for value in [0, 1, 0x7f, 0x80, 300, 0x3fff, 0x4000, 123456789]:
+            pos = _write_number(buffer, 0, value)
+            self.assertEqual(_read_number(buffer, 0), (value, pos))
+
+        self.assertEqual(_write_number(buffer, 0, 0x7f), 1)
+        self.assertEqual(_write_number(buffer, 0, 0x80), 2)
+
+    def test_invalid_recording(self):
+        with self.assertRaises(Exception):
+            read_recording(b"foo")
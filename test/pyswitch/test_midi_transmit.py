@@ -0,0 +1,242 @@
+import sys
+import unittest
+from unittest.mock import patch   # Necessary workaround! Needs to be separated.
+
+from .mocks_lib import *
+
+# Import subject under test
+with patch.dict(sys.modules, {
+    "micropython": MockMicropython,
+    "usb_midi": MockUsbMidi(),
+    "adafruit_midi": MockAdafruitMIDI(),
+    "adafruit_midi.control_change": MockAdafruitMIDIControlChange(),
+    "adafruit_midi.system_exclusive": MockAdafruitMIDISystemExclusive(),
+    "adafruit_midi.program_change": MockAdafruitMIDIProgramChange(),
+    "adafruit_midi.midi_message": MockAdafruitMIDIMessage(),
+    "gc": MockGC()
+}):
+    from adafruit_midi.system_exclusive import SystemExclusive
+    from adafruit_midi.control_change import ControlChange
+    from adafruit_midi.program_change import ProgramChange
+    from lib.pyswitch.controller.midi_transmit import MidiTransmitScheduler
+    from lib.pyswitch.controller.midi import MidiController, MidiRouting
+
+    from.mocks_appl import *
+
+
+class TestMidiTransmitScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.time = 1000
+        self.sent = []
+
+        self.patcher = patch.dict(MidiTransmitScheduler.__init__.__globals__, { 
+            "get_current_millis": lambda: self.time 
+        })
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_send(self):
+        tx = MidiTransmitScheduler(
+            write = self.sent.append,
+            buffer_bytes = 6
+        )
+
+        msg_1 = ControlChange(1, 1)
+        msg_2 = ControlChange(2, 1)
+        msg_3 = ProgramChange(3)
+        msg_4 = ControlChange(4, 1)
+
+        # Two messages fit into the buffer
+        tx.send(msg_1)
+        tx.send(msg_2)
+        tx.send(msg_3)
+        tx.send(msg_4)
+
+        self.assertEqual(self.sent, [msg_1, msg_2])
+        self.assertEqual(tx.num_pending, 2)
+        self.assertEqual(tx.max_depth, 2)
+
+        # Nothing transmitted yet
+        tx.process()
+        self.assertEqual(self.sent, [msg_1, msg_2])
+
+        # 1ms: 3 bytes transmitted (31250 baud)
+        self.time += 1
+        tx.process()
+        self.assertEqual(self.sent, [msg_1, msg_2, msg_3])
+
+        self.time += 1
+        tx.process()
+        self.assertEqual(self.sent, [msg_1, msg_2, msg_3, msg_4])
+        self.assertEqual(tx.num_pending, 0)
+
+        self.assertEqual(tx.num_sent, 4)
+        self.assertEqual(tx.num_queued, 2)
+        self.assertEqual(tx.wait_max_millis, 2)
+        self.assertEqual(tx.wait_average_millis, 1.5)
+
+
+    def test_order(self):
+        tx = MidiTransmitScheduler(
+            write = self.sent.append,
+            buffer_bytes = 3
+        )
+
+        msg_1 = ControlChange(1, 1)
+        msg_2 = SystemExclusive([0x00, 0x20, 0x33], [0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08])
+        msg_3 = ControlChange(3, 1)
+
+        tx.send(msg_1)
+        tx.send(msg_2)
+
+        # Would fit, but msg_2 is waiting
+        self.time += 1
+        tx.send(msg_3)
+
+        self.assertEqual(self.sent, [msg_1])
+
+        # Messages larger than the buffer are sent when nothing is in flight
+        tx.process()
+        self.assertEqual(self.sent, [msg_1, msg_2])
+
+        self.time += 5
+        tx.process()
+        self.assertEqual(self.sent, [msg_1, msg_2, msg_3])
+
+
+    def test_queue_full(self):
+        tx = MidiTransmitScheduler(
+            write = self.sent.append,
+            buffer_bytes = 3,
+            max_queue_size = 2
+        )
+
+        for i in range(5):
+            tx.send(ControlChange(i, 1))
+
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(tx.num_pending, 2)
+        self.assertEqual(tx.num_dropped, 2)
+
+        self.time += 10
+        tx.process()
+
+        self.assertEqual([m.control for m in self.sent], [0, 1])
+
+        self.time += 10
+        tx.process()
+
+        self.assertEqual([m.control for m in self.sent], [0, 1, 2])
+
+
+    def test_queue_full_merge(self):
+        tx = MidiTransmitScheduler(
+            write = self.sent.append,
+            buffer_bytes = 3,
+            max_queue_size = 3
+        )
+
+        request = SystemExclusive([0x00, 0x20, 0x33], [0x02, 0x7f, 0x41, 0x00, 0x04])
+
+        tx.send(ControlChange(0, 1))
+        tx.send(ControlChange(1, 1))
+        tx.send(SystemExclusive([0x00, 0x20, 0x33], [0x02, 0x7f, 0x41, 0x00, 0x04]))
+        tx.send(ProgramChange(1))
+
+        self.assertEqual(tx.num_pending, 3)
+
+        # Superseded waiting messages are replaced in place
+        cc = ControlChange(1, 2)
+        pc = ProgramChange(5)
+
+        tx.send(cc)
+        tx.send(request)
+        tx.send(pc)
+
+        # Nothing to replace: Dropped
+        tx.send(ControlChange(7, 1))
+
+        self.assertEqual(tx.num_pending, 3)
+        self.assertEqual(tx.num_merged, 3)
+        self.assertEqual(tx.num_dropped, 1)
+
+        for i in range(3):
+            self.time += 10
+            tx.process()
+
+        self.assertEqual(len(self.sent), 4)
+        self.assertIs(self.sent[1], cc)
+        self.assertIs(self.sent[2], request)
+        self.assertIs(self.sent[3], pc)
+
+
+    def test_written(self):
+        tx = MidiTransmitScheduler(
+            write = self.sent.append,
+            buffer_bytes = 32
+        )
+
+        tx.written(31)
+        tx.send(ControlChange(1, 1))
+
+        self.assertEqual(self.sent, [])
+
+        self.time += 1
+        tx.process()
+        self.assertEqual(len(self.sent), 1)
+
+
+    def test_slow_baudrate(self):
+        tx = MidiTransmitScheduler(
+            write = self.sent.append,
+            baudrate = 5000,           # 0.5 bytes per millisecond
+            buffer_bytes = 3
+        )
+
+        tx.send(ControlChange(1, 1))
+        tx.send(ControlChange(2, 1))
+
+        # Time passed in steps of less than one byte is not lost
+        for i in range(5):
+            self.time += 1
+            tx.process()
+
+        self.assertEqual(len(self.sent), 1)
+
+        self.time += 1
+        tx.process()
+        self.assertEqual(len(self.sent), 2)
+
+
+    def test_midi_controller(self):
+        device = MockMidiController()
+        device.transmitter = MidiTransmitScheduler(
+            write = self.sent.append,
+            buffer_bytes = 3
+        )
+
+        midi = MidiController(
+            routings = [
+                MidiRouting(
+                    source = MidiRouting.APPLICATION,
+                    target = device
+                ),
+                MidiRouting(
+                    source = device,
+                    target = MidiRouting.APPLICATION
+                )
+            ]
+        )
+
+        self.assertEqual(midi.transmitters, [device.transmitter])
+
+        device.transmitter.send(ControlChange(1, 1))
+        device.transmitter.send(ControlChange(2, 1))
+
+        self.time += 1
+        midi.receive()
+
+        self.assertEqual(len(self.sent), 2)
@@ -101,8 +101,10 @@ class MockImports:
 
     class MockMidiController:
         class MidiController:
-            def __init__(self, routings):
+            def __init__(self, routings, config = None):
                 self.routings = routings
+                self.config = config
+                self.filter = None
     
 
     class MockUiController:
@@ -131,9 +133,11 @@ class MockImports:
 
     class MockMidiBridgeWrapper:
         class MidiBridgeWrapper:
-            def __init__(self, midi, temp_file_path):
+            def __init__(self, midi, temp_file_path, max_chunk_size, window_size):
                 self.midi = midi
                 self.temp_file_path = temp_file_path
+                self.max_chunk_size = max_chunk_size
+                self.window_size = window_size
                 self.error_calls = []
     
             def error(self, e):
@@ -201,7 +205,7 @@ class TestProcessScript(unittest.TestCase):
             "pyswitch.controller.midi": MockImports.MockMidiController(),
             "pyswitch.ui.UiController": MockImports.MockUiController(),
             "communication": MockImports.MockCommunication(),
-            "pymidibridge.MidiBridgeWrapper": MockImports.MockMidiBridgeWrapper(),
+            "pyswitch.controller.midi_bridge": MockImports.MockMidiBridgeWrapper(),
             "display": MockImports.MockDisplay(),
             "inputs": MockImports.MockInputs()
         }):            
@@ -250,7 +254,7 @@ class TestProcessScript(unittest.TestCase):
             "pyswitch.controller.midi": MockImports.MockMidiController(),
             "pyswitch.ui.UiController": MockImports.MockUiController(),
             "communication": MockImports.MockCommunication(),
-            "pymidibridge.MidiBridgeWrapper": MockImports.MockMidiBridgeWrapper(),
+            "pyswitch.controller.midi_bridge": MockImports.MockMidiBridgeWrapper(),
             "display": MockImports.MockDisplay(),
             "inputs": MockImports.MockInputs()
         }):
@@ -282,6 +286,8 @@ class TestProcessScript(unittest.TestCase):
             self.assertIsInstance(controller.midi, MockImports.MockMidiBridgeWrapper.MidiBridgeWrapper)
             self.assertIsInstance(controller.midi.midi, MockImports.MockMidiController.MidiController)
             self.assertEqual(controller.midi.midi.routings, ["routing1", "routing2"])
+            self.assertEqual(controller.midi.max_chunk_size, 65)
+            self.assertEqual(controller.midi.window_size, 4)
 
             self.assertEqual(controller.config, { "enableMidiBridge": True })
             self.assertEqual(controller.inputs, ["someswitch"])            
@@ -302,7 +308,7 @@ class TestProcessScript(unittest.TestCase):
             "pyswitch.controller.midi": MockImports.MockMidiController(),
             "pyswitch.ui.UiController": MockImports.MockUiController(),
             "communication": MockImports.MockCommunication(),
-            "pymidibridge.MidiBridgeWrapper": MockImports.MockMidiBridgeWrapper(),
+            "pyswitch.controller.midi_bridge": MockImports.MockMidiBridgeWrapper(),
             "display": MockImports.MockDisplay(),
             "inputs": MockImports.MockInputs()
         }):
@@ -327,7 +333,7 @@ class TestProcessScript(unittest.TestCase):
             "pyswitch.controller.midi": MockImports.MockMidiController(),
             "pyswitch.ui.UiController": MockImports.MockUiController(),
             "communication": MockImports.MockCommunication(),
-            "pymidibridge.MidiBridgeWrapper": MockImports.MockMidiBridgeWrapper(),
+            "pyswitch.controller.midi_bridge": MockImports.MockMidiBridgeWrapper(),
             "display": MockImports.MockDisplay(),
             "inputs": MockImports.MockInputs()
         }):
@@ -171,8 +171,7 @@ class TestDisplayLabel(unittest.TestCase):
         ui = DisplayElement()
         ui.make_splash(MockFontLoader())
 
-        u = Updater()
-        u.client = MockClient()
+        u = MockController()
         u.low_memory_warning = False
 
         label.init(ui, u)
@@ -181,6 +180,7 @@ class TestDisplayLabel(unittest.TestCase):
         cb.parameter_changed(mapping_1)
 
         self.assertEqual(label.text, "foobar")
+        self.assertEqual(u.dirty_items, [label])
 
         cb.label_text = "terminated"
         cb.request_terminated(mapping_1)
@@ -7,6 +7,7 @@ class DeviceController {
     bridge = null;                // MIDI bridge handler (connects to the Controller running PyMidiBridge, and is reused for connecting to the client, too)
 
     #connection = null;           // Current connection, holding the bridge instance and ports etc.
+    #windowedUnsupported = new Set();   // Port names of devices not supporting the windowed transfer mode
 
     constructor(controller) {
         this.#controller = controller;
@@ -153,13 +154,45 @@ class DeviceController {
     }
 
     /**
-     * Saves the passed content to the passed file on the connected device
+     * Saves the passed content to the passed file on the connected device. Uses the windowed transfer 
+     * mode if the device supports it, the PyMidiBridge transfer otherwise.
      */
     async saveFile(path, content) {
         if (!this.#connection) {
             throw new Error("No controller connected");
         }
 
+        const portName = this.#connection.name;
+        if (this.#windowedUnsupported.has(portName)) {
+            return this.#saveFileLegacy(path, content);
+        }
+
+        const that = this;
+        try {
+            await this.bridge.sendWindowed(
+                this.#connection.bridge,
+                path,
+                content,
+                async function(chunk, numChunks) {
+                    that.#controller.ui.progress((chunk + 1) / numChunks, "Writing " + path);
+                }
+            );
+
+        } catch (e) {
+            if (!e.noResponse) throw e;
+
+            // Older firmware: Use the PyMidiBridge transfer from now on
+            console.log("Windowed transfer not supported by " + portName);
+            this.#windowedUnsupported.add(portName);
+
+            return this.#saveFileLegacy(path, content);
+        }
+    }
+
+    /**
+     * Saves the passed content to the passed file on the connected device, using the PyMidiBridge transfer
+     */
+    async #saveFileLegacy(path, content) {
         const bridge = this.#connection.bridge;
         const that = this;
         return new Promise(async function(resolve, reject) {
@@ -147,6 +147,19 @@ class MidiBridgeHandler {
         bridge.onReceiveFinish = async function() {};
         bridge.onError = async function() {};
         bridge.midiListener = null;
+        bridge.windowedTransfer = null;
+    }
+
+    /**
+     * Sends a file in windowed transfer mode (see MidiBridgeWindowedTransfer) over a bridge returned by connect().
+     * onProgress(chunk, numChunks) is called for every acknowledged chunk.
+     */
+    async sendWindowed(bridge, path, content, onProgress = null) {
+        if (!bridge.windowedTransfer) {
+            bridge.windowedTransfer = new MidiBridgeWindowedTransfer(bridge);
+        }
+
+        await bridge.windowedTransfer.send(path, content, onProgress);
     }
 
     /**
@@ -160,10 +173,19 @@ class MidiBridgeHandler {
                     return;
                 }
                 
+                const manufacturerId = Array.from(data).slice(1, 4);
+                const payload = Array.from(data).slice(4, data.length - 1);
+
+                // Windowed transfer messages
+                if (bridge.windowedTransfer && JSON.stringify(manufacturerId) == JSON.stringify(JMB_MANUFACTURER_ID) && MidiBridgeWindowedTransfer.isWindowedMessage(payload)) {
+                    await bridge.windowedTransfer.receive(payload);
+                    return;
+                }
+
                 // Pass it to the bridge
                 await bridge.receive({
-                    manufacturerId: Array.from(data).slice(1, 4),
-                    data: Array.from(data).slice(4, data.length - 1)
+                    manufacturerId: manufacturerId,
+                    data: payload
                 });
             })
         );
@@ -0,0 +1,275 @@
+/**
+ * Commands of the windowed transfer mode (first data byte after the manufacturer ID). These are
+ * handled by the MidiBridgeWrapper of PySwitch, the syntax is described in pyswitch/controller/midi_bridge_transfer.py.
+ */
+const BRIDGE_WINDOWED_START = 0x11;
+const BRIDGE_WINDOWED_DATA = 0x12;
+const BRIDGE_WINDOWED_ACK = 0x13;
+const BRIDGE_WINDOWED_ERROR = 0x14;
+
+/**
+ * Proposed chunk size for windowed transfers. The device answers with the chunk size it accepts
+ * (option midiBridgeChunkSize in config.py), which can be smaller.
+ */
+const BRIDGE_WINDOWED_CHUNK_SIZE = 240;
+
+/**
+ * Time without any acknowledgement after which the unacknowledged chunks are sent again
+ */
+const BRIDGE_WINDOWED_TIMEOUT_MILLIS = 1000;
+
+/**
+ * Number of timeouts in a row after which the transfer is aborted. Sending the same file again resumes
+ * the transfer at the first chunk not received by the device.
+ */
+const BRIDGE_WINDOWED_MAX_RETRIES = 5;
+
+/**
+ * Sends files to a device in windowed transfer mode: Larger chunks than PyMidiBridge uses, and a window of chunks
+ * which are sent without waiting for the acknowledgements. The device acknowledges the next chunk it expects, so
+ * lost or corrupted chunks are sent again starting from there.
+ */
+class MidiBridgeWindowedTransfer {
+
+    #bridge = null;              // JsMidiBridge instance (used for encoding and sending)
+    #chunkSize = 0;
+    #current = null;             // Current transfer
+
+    constructor(bridge, chunkSize = BRIDGE_WINDOWED_CHUNK_SIZE) {
+        this.#bridge = bridge;
+        this.#chunkSize = chunkSize;
+    }
+
+    /**
+     * Returns if the passed data (SysEx data after the manufacturer ID) belongs to the windowed transfer mode
+     */
+    static isWindowedMessage(data) {
+        return data.length > 0 && (data[0] & 0x10) != 0;
+    }
+
+    /**
+     * Sends the passed string content to the passed path. onProgress(chunk, numChunks) is called for every
+     * acknowledged chunk. The returned promise is rejected with an error having noResponse set when the device
+     * does not support the windowed transfer mode.
+     */
+    async send(path, content, onProgress = null) {
+        if (this.#current) {
+            throw new Error("Transfer of " + this.#current.path + " still running");
+        }
+
+        const bytes = new TextEncoder().encode(content);
+        const that = this;
+
+        return new Promise(async function(resolve, reject) {
+            that.#current = {
+                id: Array.from(that.#bridge.generateTransmissionId()),
+                path: path,
+                bytes: bytes,
+                fileChecksum: Array.from(that.#bridge.getChecksum(bytes)),
+                onProgress: onProgress,
+                resolve: resolve,
+                reject: reject,
+
+                started: false,
+                chunkSize: 0,
+                numChunks: 0,
+                windowSize: 1,
+                base: 0,                 // First chunk not acknowledged yet
+                next: 0,                 // Next chunk to be sent
+                rewoundAt: -1,           // Base at which the last rewind happened (only rewind once per base)
+                retries: 0,
+                timeout: null
+            };
+
+            await that.#sendStart();
+        });
+    }
+
+    /**
+     * Must be called with the data (after the manufacturer ID) of all windowed transfer messages
+     */
+    async receive(data) {
+        const transfer = this.#current;
+        if (!transfer) return;
+
+        const checksum = data.slice(1, 1 + JMB_CHECKSUM_LENGTH_HALFBYTES);
+        const payload = new Uint8Array(data.slice(1 + JMB_CHECKSUM_LENGTH_HALFBYTES));
+
+        if (!this.#compare(Array.from(this.#bridge.getChecksum(payload)), checksum)) {
+            // Corrupted: Ignore (the timeout will repeat the chunks if necessary)
+            return;
+        }
+
+        if (!this.#compare(Array.from(payload.slice(0, JMB_TRANSMISSION_ID_LENGTH_HALFBYTES)), transfer.id)) {
+            // Other (old) transfer
+            return;
+        }
+
+        const rest = payload.slice(JMB_TRANSMISSION_ID_LENGTH_HALFBYTES);
+
+        switch (data[0]) {
+            case BRIDGE_WINDOWED_ACK:
+                await this.#receiveAck(
+                    transfer,
+                    this.#bridge.bytes2number(rest.slice(0, JMB_NUMBER_SIZE_HALFBYTES)),
+                    this.#bridge.bytes2number(rest.slice(JMB_NUMBER_SIZE_HALFBYTES, 2 * JMB_NUMBER_SIZE_HALFBYTES)),
+                    this.#bridge.bytes2number(rest.slice(2 * JMB_NUMBER_SIZE_HALFBYTES, 3 * JMB_NUMBER_SIZE_HALFBYTES))
+                );
+                break;
+
+            case BRIDGE_WINDOWED_ERROR:
+                this.#finish(new Error(this.#bridge.bytes2string(rest)));
+                break;
+        }
+    }
+
+    /**
+     * Acknowledgement received: All chunks before nextChunk have been received by the device
+     */
+    async #receiveAck(transfer, nextChunk, chunkSize, windowSize) {
+        if (!transfer.started) {
+            // Answer to the start message: Use the chunk size accepted by the device, and resume
+            // at the chunk it expects
+            transfer.started = true;
+            transfer.chunkSize = chunkSize;
+            transfer.numChunks = Math.ceil(transfer.bytes.length / chunkSize);
+            transfer.windowSize = Math.max(windowSize, 1);
+            transfer.base = nextChunk;
+            transfer.next = nextChunk;
+
+        } else if (nextChunk > transfer.base) {
+            // Window moves on
+            transfer.base = nextChunk;
+            transfer.retries = 0;
+
+            if (transfer.next < transfer.base) {
+                transfer.next = transfer.base;
+            }
+
+            if (transfer.onProgress) {
+                await transfer.onProgress(nextChunk - 1, transfer.numChunks);
+            }
+
+        } else if (nextChunk == transfer.base && transfer.next > transfer.base && transfer.rewoundAt != transfer.base) {
+            // The device expects a chunk again: Go back and repeat from there
+            transfer.rewoundAt = transfer.base;
+            transfer.next = transfer.base;
+        }
+
+        if (transfer.base >= transfer.numChunks) {
+            this.#finish();
+            return;
+        }
+
+        await this.#fillWindow(transfer);
+    }
+
+    /**
+     * Sends chunks until the window is full
+     */
+    async #fillWindow(transfer) {
+        this.#restartTimeout(transfer);
+
+        while (transfer.next < transfer.numChunks && transfer.next < transfer.base + transfer.windowSize) {
+            await this.#sendChunk(transfer, transfer.next);
+            transfer.next++;
+        }
+    }
+
+    /**
+     * No acknowledgement for some time: Repeat
+     */
+    async #onTimeout(transfer) {
+        if (this.#current !== transfer) return;
+
+        transfer.retries++;
+        if (transfer.retries > BRIDGE_WINDOWED_MAX_RETRIES) {
+            const error = new Error("Transfer of " + transfer.path + " timed out");
+            error.noResponse = !transfer.started;
+
+            this.#finish(error);
+            return;
+        }
+
+        if (!transfer.started) {
+            await this.#sendStart();
+            return;
+        }
+
+        transfer.next = transfer.base;
+        await this.#fillWindow(transfer);
+    }
+
+    #restartTimeout(transfer) {
+        const that = this;
+
+        clearTimeout(transfer.timeout);
+        transfer.timeout = setTimeout(async function() {
+            await that.#onTimeout(transfer);
+        }, BRIDGE_WINDOWED_TIMEOUT_MILLIS);
+    }
+
+    /**
+     * Ends the current transfer
+     */
+    #finish(error = null) {
+        const transfer = this.#current;
+
+        clearTimeout(transfer.timeout);
+        this.#current = null;
+
+        if (error) {
+            transfer.reject(error);
+        } else {
+            transfer.resolve();
+        }
+    }
+
+    async #sendStart() {
+        const transfer = this.#current;
+        this.#restartTimeout(transfer);
+
+        await this.#sendMessage(
+            BRIDGE_WINDOWED_START,
+            [].concat(
+                transfer.id,
+                Array.from(this.#bridge.number2bytes(this.#chunkSize, JMB_NUMBER_SIZE_FULLBYTES)),
+                Array.from(this.#bridge.number2bytes(transfer.bytes.length, JMB_NUMBER_SIZE_FULLBYTES)),
+                transfer.fileChecksum,
+                Array.from(this.#bridge.string2bytes(transfer.path))
+            )
+        );
+    }
+
+    async #sendChunk(transfer, index) {
+        const chunk = transfer.bytes.slice(index * transfer.chunkSize, (index + 1) * transfer.chunkSize);
+
+        await this.#sendMessage(
+            BRIDGE_WINDOWED_DATA,
+            [].concat(
+                transfer.id,
+                Array.from(this.#bridge.number2bytes(index, JMB_NUMBER_SIZE_FULLBYTES)),
+                Array.from(this.#bridge.packBytes(chunk))
+            )
+        );
+    }
+
+    async #sendMessage(command, payload) {
+        const checksum = Array.from(this.#bridge.getChecksum(new Uint8Array(payload)));
+
+        await this.#bridge.sendSysex(
+            JMB_MANUFACTURER_ID,
+            [command].concat(checksum, payload)
+        );
+    }
+
+    #compare(a, b) {
+        if (a.length != b.length) return false;
+
+        for (let i = 0; i < a.length; ++i) {
+            if (a[i] != b[i]) return false;
+        }
+
+        return true;
+    }
+}
@@ -12,7 +12,7 @@ class ConfigFile {
 
         this.#state = new LocalState("global-settings");
         this.#defaults = {
-            maxConsecutiveMidiMessages: 10,
+            tickBudgetMicros: 15000,
             clearBuffers: true,
             maxRequestLifetimeMillis: 2000,
             memoryWarnLimitBytes: 1024 * 15,
@@ -117,14 +117,14 @@ class EmulatorSettings extends Tab {
                 await that.#setConfigFromInput($(this), "updateInterval");
             }),
 
-            // Max. consecutive MIDI messages
+            // Tick budget
             $('<div class="label" />')
-            .text("Max. consecutive MIDI messages"),
+            .text("Tick budget (us)"),
 
             $('<input type="number" min=1 />')
-            .val(this.#controller.configFile.getAttribute("maxConsecutiveMidiMessages"))
+            .val(this.#controller.configFile.getAttribute("tickBudgetMicros"))
             .on('change', async function() {
-                await that.#setConfigFromInput($(this), "maxConsecutiveMidiMessages");
+                await that.#setConfigFromInput($(this), "tickBudgetMicros");
             }),
 
             // Clear Buffers
@@ -1,4 +1,4 @@
-from time import localtime, monotonic
+from time import localtime, monotonic, monotonic_ns
 from js import externalRefs
 
 class WrapTime:
@@ -8,5 +8,11 @@ class WrapTime:
         
         return monotonic()
     
+    def monotonic_ns(self):
+        if externalRefs.hasOwnProperty("overrideMonotonic"):
+            return int(externalRefs.overrideMonotonic() * 1000000000)
+        
+        return monotonic_ns()
+
     def localtime(self, seconds):
         return localtime(seconds)
\ No newline at end of file
@@ -6,11 +6,14 @@
 
 Config = {
     
-    # Max. number of MIDI messages being parsed before the next switch state evaluation
-    # is triggered. If set to 0, only one message is parsed per tick, which leads to 
-    # flickering states sometimes. If set too high, switch states will not be read for too long.
-    # A good value is the maximum amount of switches. Default is 10.
-    %maxConsecutiveMidiMessages%,
+    # Time budget for one tick of the processing loop (microseconds). The budget is split among scanning the inputs,
+    # parsing MIDI messages and updating the displays/client. Work which does not fit (for example a flood of 
+    # incoming MIDI messages) is continued in the next tick, so the switches are scanned regularly in any case.
+    # Overruns are shown with "debugStats". Optional, default is 15000.
+    %tickBudgetMicros%,
+
+    # Shares of the tick budget (percent) for scanning inputs, parsing MIDI and updating. Optional, default is (20, 40, 40).
+    #"tickBudgetSplit": (20, 40, 40),
 
     # Clear MIDI buffer before starting processing. Default is True.
     %clearBuffers%,
@@ -28,7 +31,8 @@ Config = {
     %memoryWarnLimitBytes%,
 
     # Enables file transfer via MIDI from and to the device using PyMidiBridge (https://github.com/Tunetown/PyMidiBridge).
-    # This costs about 11kB of RAM, so if you run into memory issues, disable this.
+    # The bridge itself (about 11kB of RAM) is only loaded when the first transfer starts, other MIDI messages are
+    # passed to the application directly. If you run into memory issues, disable this.
     "enableMidiBridge": True,
 
     # Globally used dim factors for the DisplayLabels. 